@@ -1,10 +1,11 @@
 from django.contrib import admin
 
-from .models import Hull, Outfit, Outfit_details, Build
+from .models import Hull, Outfit, Outfit_details, Build, Release
 
 # Register your models here.
 
 admin.site.register(Hull)
 admin.site.register(Outfit)
 admin.site.register(Outfit_details)
-admin.site.register(Build)
\ No newline at end of file
+admin.site.register(Build)
+admin.site.register(Release)
\ No newline at end of file
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class DataApiConfig(AppConfig):
     name = 'data_api'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .sqlite import configure_connection
+
+        # Tunes every new SQLite connection, see data_api.sqlite
+        connection_created.connect(configure_connection, dispatch_uid='data_api.sqlite')
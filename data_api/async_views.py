@@ -0,0 +1,71 @@
+"""
+Async versions of the API views, used when serving through ASGI
+(settings.SERVE_ASGI).
+
+Under ASGI, Django runs every sync view in a single thread per worker,
+one request at a time. The views of this app are wrapped into coroutines
+that run the sync view in the default thread pool instead, so requests
+are handled concurrently and a slow request (e.g. a large export) does
+not hold up the others. Streaming responses hand each chunk to the
+thread pool as well (see views.stream_ndjson()).
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.urls import re_path
+
+
+def is_asgi_request(request):
+  """
+  Checks whether a (Django or DRF) request is served through ASGI
+  """
+  return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+def in_thread_pool(func):
+  """
+  Turns a sync function into a coroutine function running it in the
+  thread pool. Database connections opened by the thread are closed when
+  the function returns, as request signals do not reach pool threads (and
+  persistent connections, see CONN_MAX_AGE, would be left open in each of
+  them).
+  """
+  def run(*args, **kwargs):
+    try:
+      return func(*args, **kwargs)
+    finally:
+      connections.close_all()
+
+  return sync_to_async(run, thread_sensitive=False)
+
+
+def as_async_view(view):
+  """
+  Wraps a sync view into an async view running in the thread pool.
+  Template and DRF responses are rendered in the pool too.
+  """
+  def run_view(request, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render') and callable(response.render):
+      response.render()
+    return response
+
+  run_view = in_thread_pool(run_view)
+
+  @functools.wraps(view)
+  async def async_view(request, *args, **kwargs):
+    return await run_view(request, *args, **kwargs)
+
+  return async_view
+
+
+def as_async_urls(urlpatterns):
+  """
+  Returns a copy of a list of url patterns with all views made async
+  """
+  return [
+    re_path(url.pattern.regex.pattern, as_async_view(url.callback), url.default_args, url.name)
+    for url in urlpatterns
+  ]
@@ -0,0 +1,111 @@
+"""
+Aggregate stats of the builds of a release (see models.BuildStats).
+
+The ship builder computes the stats of a build from the stats of its hull
+and outfits (see frontend/src/components/ShipBuilder/BuildAggregates.js).
+At ingest, the same stats are computed for every build of a release and
+stored, so that hulls can be filtered and sorted by the performance of
+their default build in SQL.
+
+The stats of a hull and of the outfits of a build are summed up with the
+attribute matrices of the release (see matrices.build_matrix()): one
+matrix product for all builds instead of a query per build.
+"""
+import logging
+import numpy as np
+
+from .matrices import build_matrix
+from .models import Build, BuildStats, Hull, Outfit, Outfit_details
+
+logger = logging.getLogger(__name__)
+
+
+def ratio(numerator, denominator):
+    """
+    Divides element-wise, with 0 where the denominator is 0
+    """
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+
+
+def build_totals(release: str):
+    """
+    Sums up the numeric stats of the hull and the outfits of every build of a release
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+
+    Returns:
+        tuple: (build ids, totals), where totals maps each stat to an array
+               with the totals of the builds
+    """
+    hull_ids, _, hull_columns, hull_values = build_matrix(Hull, release)
+    outfit_ids, _, outfit_columns, outfit_values = build_matrix(Outfit, release)
+
+    builds = list(Build.objects.filter(hull__release=release).order_by('pk').values_list('pk', 'hull_id'))
+    build_ids = np.array([pk for pk, _ in builds], dtype=np.int64)
+    amounts = np.zeros((len(builds), len(outfit_ids)), dtype=np.float64)
+    details = list(Outfit_details.objects.filter(build__hull__release=release).values_list('build_id', 'outfit_id', 'amount'))
+    if details:
+        build_rows, outfit_rows, counts = zip(*details)
+        np.add.at(amounts, (np.searchsorted(build_ids, build_rows), np.searchsorted(outfit_ids, outfit_rows)), counts)
+
+    outfit_totals = amounts @ outfit_values
+    hull_rows = hull_values[np.searchsorted(hull_ids, np.array([hull_id for _, hull_id in builds], dtype=np.int64))]
+    # Stats of outfits that hulls do not have count from 0 (and the other way around)
+    totals = {stat: outfit_totals[:, position] for position, stat in enumerate(outfit_columns)}
+    for position, stat in enumerate(hull_columns):
+        totals[stat] = totals[stat] + hull_rows[:, position] if stat in totals else hull_rows[:, position]
+    return build_ids, totals
+
+
+def compute_build_stats(totals: dict):
+    """
+    Computes the aggregate stats of builds from the totals of their stats,
+    the way the ship builder does
+
+    Args:
+        totals (dict): {stat: array of totals}, see build_totals()
+
+    Returns:
+        dict: {BuildStats field name: array of values}
+    """
+    mass = totals['mass']
+    cooling_inefficiency = totals['cooling_inefficiency']
+    cooling_efficiency = 2 + 2 / (1 + np.exp(cooling_inefficiency / -2)) - 4 / (1 + np.exp(cooling_inefficiency / -4))
+    idle_heat = totals['heat_generation'] - (totals['cooling'] + totals['active_cooling']) * cooling_efficiency
+    moving_heat = np.maximum(totals['thrusting_heat'], totals['reverse_thrusting_heat']) + totals['turning_heat'] + totals['afterburner_heat']
+    idle_energy = totals['energy_generation'] + totals['solar_collection'] - totals['energy_consumption'] - totals['cooling_energy']
+    moving_energy = np.maximum(totals['thrusting_energy'], totals['reverse_thrusting_energy']) + totals['turning_energy'] + totals['afterburner_energy']
+
+    return {
+        'max_speed': ratio(totals['thrust'], totals['drag'] * 60),
+        'acceleration': ratio(totals['thrust'], mass),
+        'turn': ratio(totals['turn'], mass),
+        'idle_heat': idle_heat,
+        'action_heat': idle_heat + moving_heat + totals['heat_per_second'] + totals['shield_heat'] + totals['hull_heat'],
+        'idle_energy': idle_energy,
+        'action_energy': idle_energy - moving_energy - totals['energy_per_second'] - totals['shield_energy'] - totals['hull_energy'],
+        'average_dps': (totals['shield_dps'] + totals['hull_dps']) / 2,
+        'free_outfit_space': totals['outfit_space'],
+        'free_engine_capacity': totals['engine_capacity'],
+        'free_weapon_capacity': totals['weapon_capacity'],
+    }
+
+
+def write_build_stats(release: str):
+    """
+    Replaces the aggregate stats of the builds of a release. Run at ingest,
+    once all outfits, hulls and builds of the release are saved.
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+    """
+    build_ids, totals = build_totals(release)
+    stats = compute_build_stats(totals)
+
+    BuildStats.objects.filter(build__hull__release=release).delete()
+    BuildStats.objects.bulk_create([
+        BuildStats(build_id=build_id, **{name: float(values[row]) for name, values in stats.items()})
+        for row, build_id in enumerate(build_ids.tolist())
+    ], batch_size=500)
+    logger.info(f"Computed the stats of {len(build_ids)} builds of release '{release}'")
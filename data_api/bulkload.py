@@ -0,0 +1,249 @@
+"""
+Bulk ingest of releases.
+
+Parsing a release (see data.parse_raw()) saves every outfit, hull and
+build on its own and looks up the ones saved before, one round trip per
+query. A release is therefore parsed into a scratch SQLite shard (see
+shards.staging_shard()) and then merged into the default database in
+bulk:
+
+- Parsed rows are matched to the stored rows of the release by their
+  natural keys (see NATURAL_KEYS and the unique constraints of the
+  models). Only new and changed rows are written, with bulk upserts:
+  COPY into a temporary table and INSERT ... ON CONFLICT on PostgreSQL,
+  bulk_create(update_conflicts=True) on other databases. Stored rows
+  that are not in the release anymore are deleted.
+- Foreign keys are mapped to the primary keys of the stored rows. Those
+  pointing at rows merged later (Hull.default_build) or at rows of the
+  same table (e.g. Outfit.ammo) are set once all rows are stored.
+- Attribute sets are shared across releases (see models.AttributeSet),
+  so they are only added if no set with the same content hash exists.
+  The sets of hull variants are added after the sets they are based on.
+
+The merge runs in a single transaction. Re-ingesting an unchanged
+release writes nothing, and readers see the old rows until it commits.
+"""
+import contextlib
+import logging
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import AttributeSet, Build, BuildStats, Hull, Outfit, Outfit_details, prune_attribute_sets
+from .shards import staging_shard
+from .sqlite import optimize
+
+logger = logging.getLogger(__name__)
+
+# Models merged (in this order) with their natural keys and the lookup of the rows of a release
+NATURAL_KEYS = {
+    Outfit: (['release', 'name'], 'release'),
+    Hull: (['release', 'name'], 'release'),
+    Build: (['hull_id', 'name'], 'hull__release'),
+    Outfit_details: (['build_id', 'outfit_id'], 'build__hull__release'),
+    BuildStats: (['build_id'], 'build__hull__release'),
+}
+
+BATCH_SIZE = 500
+
+
+def uses_staged_ingest():
+    """
+    Whether releases are parsed into a scratch shard and merged (unless releases are sharded)
+    """
+    return not settings.RELEASE_SHARDS
+
+
+@contextlib.contextmanager
+def staged_ingest(release: str):
+    """
+    Routes the queries made within the block to a scratch shard and
+    merges its rows into the default database once the block completes
+    without errors, then optimizes the default database (no-op unless
+    uses_staged_ingest())
+    """
+    if not uses_staged_ingest():
+        yield
+        return
+
+    with staging_shard(release) as (alias, _):
+        yield
+        merge_release(alias, release)
+    optimize(DEFAULT_DB_ALIAS)
+
+
+def merge_release(source: str, release: str):
+    """
+    Makes the outfits, hulls and builds of a release in the default
+    database match those in another database, writing only what changed
+
+    Args:
+        source (str): Alias of the database to merge from (e.g. a scratch shard)
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+
+    Returns:
+        dict: {model: (number of rows written, number of rows deleted)}
+    """
+    written = {}
+    stale = {}
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        ids = {AttributeSet: merge_attribute_sets(source)}
+        deferred = {}
+        for model, (natural_key, lookup) in NATURAL_KEYS.items():
+            ids[model], deferred[model], written[model], stored = merge_rows(source, model, natural_key, {lookup: release}, ids)
+            stale[model] = stored - set(ids[model].values())
+
+        for model, rows in deferred.items():
+            set_deferred_keys(model, rows, {NATURAL_KEYS[model][1]: release}, ids)
+
+        # Deleted after the foreign keys pointing at them are updated, dependent rows first
+        for model in reversed(NATURAL_KEYS):
+            model.objects.using(DEFAULT_DB_ALIAS).filter(pk__in=stale[model]).delete()
+
+        prune_attribute_sets(using=DEFAULT_DB_ALIAS)
+
+    counts = {model: (written[model], len(stale[model])) for model in NATURAL_KEYS}
+    logger.info(f"Merged release '{release}': " + ', '.join(
+        f"{model.__name__} {rows_written} written, {rows_deleted} deleted" for model, (rows_written, rows_deleted) in counts.items()
+    ))
+    return counts
+
+
+def merge_attribute_sets(source: str):
+    """
+    Adds the attribute sets of the source database that are missing, base
+    sets (see models.AttributeSet) before the sets on top of them
+
+    Returns:
+        dict: {primary key in the source database: primary key}
+    """
+    staged = {pk: (content_hash, data, base_id) for pk, content_hash, data, base_id in
+              AttributeSet.objects.using(source).values_list('pk', 'content_hash', 'data', 'base_id')}
+    stored = dict(AttributeSet.objects.using(DEFAULT_DB_ALIAS).values_list('content_hash', 'pk'))
+    ids = {pk: stored[content_hash] for pk, (content_hash, _, _) in staged.items() if content_hash in stored}
+    while len(ids) < len(staged):
+        # Sets whose base set (if any) is stored
+        missing = {pk: (content_hash, data, base_id) for pk, (content_hash, data, base_id) in staged.items()
+                   if pk not in ids and (base_id is None or base_id in ids)}
+        AttributeSet.objects.using(DEFAULT_DB_ALIAS).bulk_create([
+            AttributeSet(content_hash=content_hash, data=data, base_id=ids.get(base_id)) for content_hash, data, base_id in missing.values()
+        ], batch_size=BATCH_SIZE, ignore_conflicts=True)
+        stored = dict(AttributeSet.objects.using(DEFAULT_DB_ALIAS).filter(
+            content_hash__in=[content_hash for content_hash, _, _ in missing.values()]
+        ).values_list('content_hash', 'pk'))
+        ids.update({pk: stored[content_hash] for pk, (content_hash, _, _) in missing.items()})
+    return ids
+
+
+def merge_rows(source: str, model, natural_key: list, release_filter: dict, ids: dict):
+    """
+    Upserts the rows of a model (of a release) that are new or changed
+
+    Args:
+        source (str): Alias of the database to merge from
+        model (Model): Model to merge
+        natural_key (list): Attribute names of the natural key
+        release_filter (dict): Lookup of the rows of the release
+        ids (dict): {model: {primary key in the source database: primary key}} of the models merged before
+
+    Returns:
+        tuple: (ids, deferred, written, stored), where ids maps the primary
+               keys of the source database to those of the merged rows,
+               deferred holds {primary key: values} of the foreign keys to
+               set later, written is the number of rows written and stored
+               the set of primary keys of the rows stored before the merge
+    """
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    # Foreign keys to models not merged yet are set after the merge
+    deferred_fields = [field for field in fields if field.is_relation and field.related_model not in ids]
+    fields = [field for field in fields if field not in deferred_fields]
+    attnames = [field.attname for field in fields]
+    key_positions = [attnames.index(name) for name in natural_key]
+
+    def natural(values):
+        return tuple(values[position] for position in key_positions)
+
+    staged = {}
+    deferred = {}
+    for pk, *values in model.objects.using(source).values_list('pk', *attnames, *[field.attname for field in deferred_fields]):
+        values, deferred_values = values[:len(fields)], values[len(fields):]
+        for position, field in enumerate(fields):
+            if field.is_relation and values[position] is not None:
+                values[position] = ids[field.related_model][values[position]]
+        staged[pk] = tuple(values)
+        deferred[pk] = dict(zip(deferred_fields, deferred_values))
+
+    stored = {natural(values): (pk, tuple(values)) for pk, *values in
+              model.objects.using(DEFAULT_DB_ALIAS).filter(**release_filter).values_list('pk', *attnames)}
+    changed = [values for values in staged.values() if stored.get(natural(values), (None, None))[1] != values]
+    if changed:
+        upsert(model, fields, natural_key, changed)
+
+    merged = {tuple(key): pk for *key, pk in model.objects.using(DEFAULT_DB_ALIAS).filter(**release_filter).values_list(*natural_key, 'pk')}
+    return {pk: merged[natural(values)] for pk, values in staged.items()}, deferred, len(changed), {pk for pk, _ in stored.values()}
+
+
+def upsert(model, fields: list, natural_key: list, rows: list):
+    """
+    Inserts rows, updating those with the same natural key
+
+    Args:
+        model (Model): Model of the rows
+        fields (list): Fields of the values of each row
+        natural_key (list): Attribute names of the natural key
+        rows (list): Values of the rows
+    """
+    attnames = [field.attname for field in fields]
+    update_fields = [name for name in attnames if name not in natural_key]
+    if connections[DEFAULT_DB_ALIAS].vendor != 'postgresql':
+        # Rows without any other fields (e.g. builds) are only ever inserted
+        conflicts = {'update_conflicts': True, 'unique_fields': natural_key, 'update_fields': update_fields} \
+            if update_fields else {'ignore_conflicts': True}
+        model.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+            [model(**dict(zip(attnames, values))) for values in rows], batch_size=BATCH_SIZE, **conflicts
+        )
+        return
+
+    quote = connections[DEFAULT_DB_ALIAS].ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = [quote(field.column) for field in fields]
+    key_columns = [quote(model._meta.get_field(name).column) for name in natural_key]
+    updates = ', '.join(f"{quote(model._meta.get_field(name).column)} = EXCLUDED.{quote(model._meta.get_field(name).column)}" for name in update_fields)
+    on_conflict = f"DO UPDATE SET {updates}" if update_fields else "DO NOTHING"
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(f"CREATE TEMPORARY TABLE ingest_rows AS SELECT {', '.join(columns)} FROM {table} WITH NO DATA")
+        with cursor.copy(f"COPY ingest_rows ({', '.join(columns)}) FROM STDIN") as copy:
+            for values in rows:
+                copy.write_row(values)
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM ingest_rows "
+            f"ON CONFLICT ({', '.join(key_columns)}) {on_conflict}"
+        )
+        cursor.execute("DROP TABLE ingest_rows")
+
+
+def set_deferred_keys(model, rows: dict, release_filter: dict, ids: dict):
+    """
+    Sets the foreign keys of merged rows that point at rows of their own
+    table or of models merged after them
+
+    Args:
+        model (Model): Model of the rows
+        rows (dict): {primary key in the source database: {field: primary key in the source database}}
+        release_filter (dict): Lookup of the rows of the release
+        ids (dict): {model: {primary key in the source database: primary key}}
+    """
+    fields = list(next(iter(rows.values()), {}))
+    if not fields:
+        return
+    attnames = [field.attname for field in fields]
+    stored = {pk: values for pk, *values in
+              model.objects.using(DEFAULT_DB_ALIAS).filter(**release_filter).values_list('pk', *attnames)}
+
+    changed = []
+    for pk, values in rows.items():
+        values = [ids[field.related_model][value] if value is not None else None for field, value in values.items()]
+        if stored[ids[model][pk]] != values:
+            changed.append(model(pk=ids[model][pk], **dict(zip(attnames, values))))
+    if changed:
+        model.objects.using(DEFAULT_DB_ALIAS).bulk_update(changed, attnames, batch_size=BATCH_SIZE)
@@ -0,0 +1,133 @@
+"""
+Builds and serves the bootstrap bundle of a release: a single document
+containing the release options, hulls, outfits and builds that the
+frontend needs before it can be used.
+
+Bundles are written whenever a release is ingested (see write_bundles()
+and data.publish_release()) as plain and gzipped JSON files in
+settings.RELEASE_DATA_DIR and kept in memory once read.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+
+from .catalog import ready_releases, release_options
+from .models import Hull, Outfit, Build
+from .renderers import ORJSONRenderer
+from .serializers import HullSerializer, OutfitSerializer, BuildSerializer
+from .shards import use_release
+from .snapshots import current_hash, is_release_name
+
+logger = logging.getLogger(__name__)
+
+# Bundles read from disk, by release: (mtime, etag, body, gzipped body)
+_bundle_cache = {}
+
+
+def bundle_path(release: str):
+    """
+    Path of the (uncompressed) bundle file of a release
+    """
+    return settings.RELEASE_DATA_DIR / release / 'bundle.json'
+
+
+def build_bundle(release: str):
+    """
+    Serializes everything the frontend needs for a release
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+
+    Returns:
+        bytes: JSON document with the keys 'Releases', 'content_hash', 'hulls', 'outfits' and 'builds'
+    """
+    bundle = {
+        "Releases": release_options(),
+        "content_hash": current_hash(release),
+        "hulls": HullSerializer(Hull.objects.filter(release=release).order_by('pk'), many=True).data,
+        "outfits": OutfitSerializer(Outfit.objects.filter(release=release).order_by('pk'), many=True).data,
+        "builds": BuildSerializer(Build.objects.filter(hull__release=release).order_by('pk').prefetch_related('outfit_details'), many=True).data,
+    }
+    return ORJSONRenderer().render(bundle)
+
+
+def write_atomic(path, content: bytes):
+    """
+    Writes a file through a temporary file in the same directory, so that
+    readers (other workers) see either the old or the new file, never a
+    partly written one
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as file:
+        file.write(content)
+    try:
+        os.replace(file.name, path)
+    except OSError:
+        os.unlink(file.name)
+        raise
+
+
+def write_bundle(release: str):
+    """
+    Builds the bundle of a release and writes it to disk, uncompressed and gzipped
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+    """
+    path = bundle_path(release)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with use_release(release):
+        body = build_bundle(release)
+    # Write the compressed file first, the uncompressed file's mtime marks the bundle as complete
+    write_atomic(path.with_suffix('.json.gz'), gzip.compress(body, compresslevel=9))
+    write_atomic(path, body)
+    _bundle_cache.pop(release, None)
+    logger.info(f"Wrote bootstrap bundle for release '{release}' ({len(body)} bytes)")
+
+
+def write_bundles():
+    """
+    (Re-)writes the bundles of all releases. Run after ingest, as every bundle
+    contains the list of available releases.
+    """
+    for option in release_options():
+        write_bundle(option["value"])
+
+
+def get_bundle(release: str):
+    """
+    Returns the bundle of a release, building it first if it has not been
+    written yet.
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+
+    Returns:
+        tuple: (etag, body, gzipped body) or None if the release does not exist
+    """
+    # Release names end up in a file path
+    if not is_release_name(release):
+        return None
+
+    path = bundle_path(release)
+    if not path.exists():
+        if release not in [entry.name for entry in ready_releases()]:
+            return None
+        write_bundle(release)
+
+    mtime = path.stat().st_mtime
+    cached = _bundle_cache.get(release)
+    if cached and cached[0] == mtime:
+        return cached[1:]
+
+    body = path.read_bytes()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    gzipped = path.with_suffix('.json.gz').read_bytes()
+    # Either file may have been replaced by a concurrent write in between
+    if gzip.decompress(gzipped) != body:
+        gzipped = gzip.compress(body, compresslevel=9)
+    _bundle_cache[release] = (mtime, etag, body, gzipped)
+    return etag, body, gzipped
@@ -0,0 +1,121 @@
+"""
+Release catalog: the Release table, maintained by ingest, and an
+in-memory cache of it for the API.
+
+Ingest marks a release as ingesting before parsing it and as ready (with
+its content hash and row counts) once it is complete, see data.parse_raw().
+Only ready releases are listed. A ready release that is ingested again
+keeps being listed, with its last content hash, while the ingest runs and
+if it fails: its rows are only replaced once the ingest completes (see
+bulkload.staged_ingest() and shards.ingest_shard()). Its ingest_status
+records the ingest meanwhile. The cache is cleared whenever a release is
+saved in this process and expires after CATALOG_TTL seconds, so workers
+pick up releases ingested by another process.
+"""
+import logging
+import threading
+import time
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Build, Hull, Outfit, Release, release_sort_key
+from .shards import use_release
+
+logger = logging.getLogger(__name__)
+
+# Seconds the catalog is cached for
+CATALOG_TTL = 60
+
+# Ready releases, newest first, and the time they were loaded at
+_cache = {'releases': None, 'loaded_at': 0.0}
+_lock = threading.Lock()
+
+
+def ready_releases():
+    """
+    Returns the ready releases, newest first (cached)
+
+    Returns:
+        list: Release objects
+    """
+    releases = _cache['releases']
+    if releases is not None and time.monotonic() - _cache['loaded_at'] < CATALOG_TTL:
+        return releases
+    with _lock:
+        releases = list(Release.objects.filter(status=Release.READY))
+        _cache.update(releases=releases, loaded_at=time.monotonic())
+    return releases
+
+
+def release_options():
+    """
+    Returns the available releases as options for the react-select module
+
+    Returns:
+        list: [{"value": release, "label": label}, ...], newest first
+    """
+    return [{"value": release.name, "label": release.name.capitalize()} for release in ready_releases()]
+
+
+@receiver([post_save, post_delete], sender=Release)
+def invalidate(**kwargs):
+    _cache['releases'] = None
+
+
+def mark_ingesting(release: str):
+    """
+    Adds a release to the catalog before it is ingested, or records that a
+    release in the catalog is ingested again (ready releases stay listed)
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+    """
+    entry, created = Release.objects.get_or_create(
+        name=release,
+        defaults={'sort_key': release_sort_key(release), 'status': Release.INGESTING, 'ingest_status': Release.INGESTING},
+    )
+    if not created:
+        if entry.status != Release.READY:
+            entry.status = Release.INGESTING
+        entry.ingest_status = Release.INGESTING
+        entry.save(update_fields=['status', 'ingest_status'])
+
+
+def mark_ready(release: str, content_hash: str):
+    """
+    Records the content hash and row counts of an ingested release and lists it
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+        content_hash (str): Content hash of the release (see snapshots.record_snapshot())
+    """
+    with use_release(release):
+        counts = {
+            'hull_count': Hull.objects.filter(release=release).count(),
+            'outfit_count': Outfit.objects.filter(release=release).count(),
+            'build_count': Build.objects.filter(hull__release=release).count(),
+        }
+    Release.objects.update_or_create(
+        name=release,
+        defaults={
+            'sort_key': release_sort_key(release),
+            'status': Release.READY,
+            'ingest_status': '',
+            'ingested_at': timezone.now(),
+            'content_hash': content_hash,
+            **counts,
+        },
+    )
+    logger.info(f"Release '{release}' is ready")
+
+
+def mark_failed(release: str):
+    """
+    Records that the ingest of a release failed. A release that was ready
+    before stays listed as it was, others are not listed.
+    """
+    Release.objects.filter(name=release).exclude(status=Release.READY).update(status=Release.FAILED)
+    Release.objects.filter(name=release).update(ingest_status=Release.FAILED)
+    invalidate()
@@ -4,6 +4,8 @@ the relevant models) the raw data of the different
 Endless Sky releases
 
 The hierarchy of functions is:
+has_upstream_changed()
+    upstream_commit()
 get_release()
 parse_raw()
     parse_outfits()
@@ -15,20 +17,36 @@ parse_raw()
             if necessary: parse_build()
         parse_outfit_variant()
             parse_build()
+    write_build_stats()
+    publish_release()
+        record_snapshot()
+        write_matrices()
+        mark_ready()
+        write_bundles()
 """
-import decimal
 import logging
 import re
 import requests
 import shutil
 
 from django.conf import settings
+from django.db import models
 from pathlib import Path
 
-from .models import Hull, Outfit, Build
+from .bulkload import staged_ingest
+from .bundles import write_bundles
+from .buildstats import write_build_stats
+from .catalog import mark_failed, mark_ingesting, mark_ready
+from .matrices import write_matrices
+from .models import Hull, Outfit, Build, Outfit_details, prune_attribute_sets, stat_field
+from .shards import ingest_shard
+from .snapshots import record_snapshot
 
 logger = logging.getLogger(__name__)
 
+# GitHub API endpoint of the commit a tag or branch of Endless Sky points at
+COMMIT_URL = 'https://api.github.com/repos/endless-sky/endless-sky/commits/'
+
 def get_release(release: str):
     """
     Downloads the specified release, unzips it, copies ship/outfit text files 
@@ -126,6 +144,55 @@ def get_release(release: str):
     logger.info("Deleted unnecessary raw data")
 
 
+def upstream_commit(release: str):
+    """
+    Looks up the commit of the Endless Sky repository a release currently
+    points at (e.g. the moving 'continuous' tag)
+
+    Args:
+        release (str): Release name (e.g. '0.9.12' or 'continuous')
+
+    Returns:
+        str: Commit SHA, or None if GitHub cannot be reached
+    """
+    version = 'v' + release if release[0].isdigit() else release
+    try:
+        response = requests.get(COMMIT_URL + version, headers={'Accept': 'application/vnd.github.sha'}, timeout=10)
+        response.raise_for_status()
+    except requests.RequestException as error:
+        logger.warning(f"Could not look up the commit of release '{release}': {error}")
+        return None
+    return response.text.strip()
+
+
+def commit_path(release: str):
+    return settings.RELEASE_DATA_DIR / release / 'upstream_commit'
+
+
+def record_commit(release: str, commit: str):
+    """
+    Records the upstream commit a release was ingested from (see
+    has_upstream_changed())
+    """
+    if commit:
+        commit_path(release).parent.mkdir(parents=True, exist_ok=True)
+        commit_path(release).write_text(commit)
+
+
+def has_upstream_changed(release: str):
+    """
+    Checks whether a release points at another upstream commit than the
+    one it was last ingested from. A release that was never recorded has
+    changed, one that cannot be looked up (GitHub unreachable) has not, so
+    that it keeps being served as it is.
+    """
+    commit = upstream_commit(release)
+    if commit is None:
+        return False
+    path = commit_path(release)
+    return not path.exists() or path.read_text() != commit
+
+
 def parse_raw(release: str):
     """
     Parses the raw data of a given release,
@@ -156,15 +223,64 @@ def parse_raw(release: str):
                   if any(substring in file.stem for substring in \
                   ['kestrel', 'marauders', 'nanotbots', 'pug', 'ships'])]
 
-    # Parse outfit files
-    for file in outfit_files:
-        logger.info(f"Parsing outfit file '{file.name}'")
-        parse_outfits(file, release)
+    mark_ingesting(release)
+    try:
+        # Parse into a new shard of the release (if releases are sharded)
+        # or into a scratch shard merged into the database in bulk
+        with ingest_shard(release), staged_ingest(release):
+            # Parse outfit files
+            for file in outfit_files:
+                logger.info(f"Parsing outfit file '{file.name}'")
+                parse_outfits(file, release)
+
+            # Parse ship files
+            for file in ship_files:
+                logger.info(f"Parsing ship file '{file.name}'")
+                parse_ships(file, release)
 
-    # Parse ship files
-    for file in ship_files:
-        logger.info(f"Parsing ship file '{file.name}'")
-        parse_ships(file, release)
+            # Compute the stats of the builds, e.g. to sort hulls by those of their default build
+            write_build_stats(release)
+
+            # Drop attribute sets only used by deleted rows
+            prune_attribute_sets()
+    except Exception:
+        mark_failed(release)
+        raise
+
+    publish_release(release)
+
+
+def publish_release(release: str):
+    """
+    Records the content hashes of an ingested release (for delta syncs),
+    writes its attribute matrices, lists it and rewrites the bootstrap
+    bundles, those of the other releases included, as every bundle lists
+    the available releases
+
+    Args:
+        release (str): Name of the release (e.g. '0.9.12' or 'continuous')
+    """
+    release_hash = record_snapshot(release)
+    write_matrices(release, release_hash)
+    mark_ready(release, release_hash)
+    write_bundles()
+
+
+def replace_existing(instance: models.Model, **natural_key):
+    """
+    Points an unsaved outfit, hull or build at the row with the same
+    natural key, if any, so that saving it overwrites that row (a later
+    definition replaces an earlier one)
+
+    Args:
+        instance (Model): Unsaved model instance
+        **natural_key: Natural key of the instance (e.g. release and name)
+
+    Returns:
+        bool: Whether there is a row to overwrite
+    """
+    instance.pk = type(instance).objects.filter(**natural_key).values_list('pk', flat=True).first()
+    return instance.pk is not None
 
 
 def parse_outfits(filename: Path, release: str):
@@ -420,6 +536,7 @@ def create_outfit(filename: Path, outfit_string: str, release: str):
     for key in fields:
         logger.debug(f"{key}: {fields[key]}")
 
+    replace_existing(outfit, release=release, name=outfit.name)
     outfit.save()
     logger.info("Created outfit '" + outfit.name + "'")
 
@@ -870,6 +987,7 @@ def parse_full_ship(filename: Path, full_ship: str, release: str):
     # Calculate aggregarte values for hull
     hull = calc_hull_aggregates(hull)
 
+    replace_existing(hull, release=release, name=hull.name)
     hull.save()
     logger.info(f"Created hull '{hull.name}'")
     
@@ -910,6 +1028,8 @@ def parse_build(hull: Hull, outfits_list: str, default=False):
 
     build.hull = hull
 
+    if replace_existing(build, hull=hull, name=build.name):
+        build.outfits.clear()
     build.save()
 
     for outfit_group in re.findall('^\t{2}["`]?([\w"][^`\t$]+?)["`]? ?(\d+)?$', outfits_list, re.M):
@@ -982,12 +1102,9 @@ def parse_hull_variant(filename: Path, hull_variant: str, release: str):
     
     # Reset primary key, so that a new hull is created on save
     hull.pk = None
-    
-    # Buffer default build and outfits
-    default_build = hull.default_build
-    default_outfits = default_build.outfits.all()
 
-    # Remove default build to satisfy unique requirement
+    # Buffer the default build of the base model, the variant gets a build of its own
+    base_build = hull.default_build
     hull.default_build = None
 
     # Make necessary changes:
@@ -1019,13 +1136,14 @@ def parse_hull_variant(filename: Path, hull_variant: str, release: str):
             else:
                 field_value = getattr(hull, field_name)
                 logger.debug(f"Field value is {field_value}")
-            # Set new value, depending on variable type
-            if isinstance(field_value, int):
+            # Set new value, depending on field type
+            field = stat_field(Hull, field_name)
+            if isinstance(field, models.IntegerField):
                 setattr(hull, field_name, field_value + int(attr[1]))
-            elif isinstance(field_value, decimal.Decimal):
-                setattr(hull, field_name, field_value + decimal.Decimal(attr[1]))
+            elif isinstance(field, models.FloatField):
+                setattr(hull, field_name, field_value + float(attr[1]))
             else:
-                logger.error(f"Field '{field_name}' has unexpected (non-numerical) type '{type(field_value)}''.")
+                logger.error(f"Field '{field_name}' has unexpected (non-numerical) type '{type(field).__name__}''.")
 
     # Count number of [guns, turrets, fighers, drones, spinal mounts], if any
     gun_ports = len(re.findall('^\t+?gun ', hull_variant, re.M))
@@ -1051,6 +1169,7 @@ def parse_hull_variant(filename: Path, hull_variant: str, release: str):
     # Calculate aggregate values
     hull = calc_hull_aggregates(hull)
 
+    replace_existing(hull, release=release, name=hull.name)
     hull.save()
     logger.info(f"Created hull variant '{hull.name}'")
 
@@ -1061,16 +1180,33 @@ def parse_hull_variant(filename: Path, hull_variant: str, release: str):
         hull.default_build = parse_build(hull, outfits_list[1], True)
         hull.save()
         logger.info(f"Added '{hull.default_build}' to '{hull.name}'")
-    else:
-        default_build.pk = None
-        default_build.name = hull.name + " Default Build"
-        default_build.hull = hull
-        default_build.save()
-        default_build.outfits.set(default_outfits)
-        logger.info(f"Cloned '{default_build.name}' from parent default build")
-        hull.default_build = default_build
+    elif base_build:
+        hull.default_build = copy_build(base_build, hull)
         hull.save()
-        logger.info(f"Added '{hull.default_build}' to '{hull.name}'")
+        logger.info(f"Copied '{base_build}' to '{hull.name}'")
+
+
+def copy_build(build: Build, hull: Hull):
+    """
+    Copies a build, with the amounts of its outfits, as the default build
+    of another hull (e.g. of a hull variant without outfits of its own)
+
+    Args:
+        build (Build): Build to copy
+        hull (Hull): Hull of the copy
+
+    Returns:
+        Build: The copy
+    """
+    copy = Build(name=hull.name + " Default Build", hull=hull)
+    if replace_existing(copy, hull=hull, name=copy.name):
+        copy.outfits.clear()
+    copy.save()
+    Outfit_details.objects.bulk_create([
+        Outfit_details(build=copy, outfit_id=details.outfit_id, amount=details.amount)
+        for details in build.outfit_details.all()
+    ])
+    return copy
 
 
 def parse_outfit_variant(outfit_variant: str, release: str):
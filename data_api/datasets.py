@@ -0,0 +1,134 @@
+"""
+In-process, immutable snapshots of the hulls and outfits of a release,
+used to serve the list endpoints without going through the database.
+
+The data of a release only changes at ingest, so each worker keeps one
+column-oriented dataset per model and release. The columns that can be
+filtered on are numpy arrays, filters are vectorized masks over them, and
+every row is encoded to JSON once, when the dataset is built. A list
+response is then a mask and a join of pre-encoded rows.
+
+A dataset is built on first use and tied to the content hash of the
+release recorded at ingest (see snapshots.record_snapshot()): once the
+release is re-ingested, the next request rebuilds it. Releases without a
+recorded content hash are not served from datasets.
+"""
+import logging
+import numpy as np
+import threading
+
+from .models import Hull, Outfit
+from .renderers import ORJSONRenderer
+from .serializers import HullSerializer, OutfitSerializer
+from .shards import use_release
+from .snapshots import current_hash, is_release_name
+
+logger = logging.getLogger(__name__)
+
+SERIALIZERS = {Hull: HullSerializer, Outfit: OutfitSerializer}
+
+# Datasets by (model, release)
+_datasets = {}
+_lock = threading.Lock()
+
+
+def encode_categories(values: list):
+    """
+    Dictionary-encodes a column of strings
+
+    Returns:
+        tuple: ({value: code}, numpy array of codes)
+    """
+    codes = {}
+    column = np.array([codes.setdefault(value, len(codes)) for value in values], dtype=np.int32)
+    return codes, column
+
+
+class ReleaseDataset:
+    """
+    Immutable, column-oriented snapshot of the hulls or outfits of a release
+
+    Attributes:
+        content_hash (str): Content hash of the release the dataset was built from
+        ids, spoiler (ndarray): Numeric columns
+        factions, categories (dict): Codes of the faction and category values
+        faction, category (ndarray): Dictionary-encoded string columns
+        rows (list): JSON encoded rows, in primary key order
+        body (bytes): JSON encoded list of all rows
+    """
+    def __init__(self, model, release: str, content_hash: str):
+        queryset = model.objects.filter(release=release).order_by('pk')
+        data = SERIALIZERS[model](queryset, many=True).data
+        renderer = ORJSONRenderer()
+
+        self.content_hash = content_hash
+        self.ids = np.array([row['id'] for row in data], dtype=np.int64)
+        self.spoiler = np.array([row['spoiler'] for row in data], dtype=np.int64)
+        self.factions, self.faction = encode_categories([row['faction'] for row in data])
+        self.categories, self.category = encode_categories([row['category'] for row in data])
+        self.rows = [renderer.render(row) for row in data]
+        self.body = b'[' + b','.join(self.rows) + b']'
+
+    def __len__(self):
+        return len(self.rows)
+
+    def select(self, spoiler=None, faction=None, category=None, ids=None):
+        """
+        Filters the dataset like the list views filter their querysets
+
+        Args:
+            spoiler (int) (optional): Maximum spoiler level
+            faction (str) (optional): Faction
+            category (str) (optional): Category
+            ids (list) (optional): Primary keys
+
+        Returns:
+            bytes: JSON encoded list of the matching rows
+        """
+        if spoiler is None and faction is None and category is None and ids is None:
+            return self.body
+
+        mask = np.ones(len(self), dtype=bool)
+        if spoiler is not None:
+            mask &= self.spoiler <= spoiler
+        if faction is not None:
+            mask &= self.faction == self.factions.get(faction, -1)
+        if category is not None:
+            mask &= self.category == self.categories.get(category, -1)
+        if ids is not None:
+            mask &= np.isin(self.ids, ids)
+        if mask.all():
+            return self.body
+        return b'[' + b','.join([self.rows[index] for index in np.flatnonzero(mask)]) + b']'
+
+
+def get_dataset(model, release: str):
+    """
+    Returns the dataset of the hulls or outfits of a release, building it
+    if there is none yet or if the release has been re-ingested since
+
+    Args:
+        model (Model): Hull or Outfit
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+
+    Returns:
+        ReleaseDataset: Dataset or None if the release has no recorded content hash
+    """
+    if not is_release_name(release):
+        return None
+    release_hash = current_hash(release)
+    if release_hash is None:
+        return None
+
+    dataset = _datasets.get((model, release))
+    if dataset is not None and dataset.content_hash == release_hash:
+        return dataset
+
+    with _lock:
+        dataset = _datasets.get((model, release))
+        if dataset is None or dataset.content_hash != release_hash:
+            with use_release(release):
+                dataset = ReleaseDataset(model, release, release_hash)
+            _datasets[(model, release)] = dataset
+            logger.info(f"Loaded {model.__name__.lower()} dataset of release '{release}' ({len(dataset)} rows)")
+    return dataset
@@ -0,0 +1,39 @@
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from data_api.models import Hull, Outfit
+from data_api.renderers import ORJSONRenderer
+from data_api.serializers import HullSerializer, OutfitSerializer
+
+
+class Command(BaseCommand):
+  help = "Compares DRF's JSONRenderer with the orjson renderer on the hull and outfit lists of a release"
+
+  def add_arguments(self, parser):
+    parser.add_argument('--release', default='0.9.14', help="Release to render (default: 0.9.14)")
+    parser.add_argument('--repeat', type=int, default=20, help="Number of runs per measurement (default: 20)")
+
+  def handle(self, *args, **options):
+    release = options['release']
+    repeat = options['repeat']
+
+    for model, serializer_class in [(Hull, HullSerializer), (Outfit, OutfitSerializer)]:
+      queryset = model.objects.filter(release=release)
+      rows = list(queryset)
+      if not rows:
+        raise CommandError(f"No {model.__name__.lower()}s found for release '{release}'")
+
+      self.stdout.write(f"{model.__name__} list, release '{release}' ({len(rows)} rows, best of {repeat} runs):")
+      for mode, context in [('decimal strings', {}), ('native numbers', {'native_numbers': True})]:
+        data = serializer_class(rows, many=True, context=context).data
+        serialize = self.best(lambda: serializer_class(rows, many=True, context=context).data, repeat)
+        self.stdout.write(f"  {mode}: serializer {serialize * 1000:.2f} ms")
+        for renderer in [JSONRenderer(), ORJSONRenderer()]:
+          size = len(renderer.render(data))
+          render = self.best(lambda: renderer.render(data), repeat)
+          self.stdout.write(f"    {type(renderer).__name__:<16} {render * 1000:8.2f} ms  {size / 1024:8.1f} KiB")
+
+  def best(self, func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
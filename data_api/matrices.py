@@ -0,0 +1,228 @@
+"""
+Dense attribute matrices of the hulls and outfits of a release, for
+numerical work over the catalog (ranking, comparing, summing up builds)
+without going through the ORM row by row.
+
+At ingest, the hulls and the outfits of a release are each written as a
+float matrix with one row per entity, in primary key order, and one
+column per numeric stat (columns and sparse stats alike, booleans as 0
+and 1). The matrix and the row ids are .npy files, the column and row
+names a JSON index next to them, all in a directory of
+settings.RELEASE_DATA_DIR named after the content hash of the release
+(see snapshots.record_snapshot()).
+
+Workers memory-map the .npy files read-only, so all of them share a
+single copy of each matrix in the page cache. A re-ingested release gets
+a new directory, the directories of older content hashes are removed.
+"""
+import logging
+import numpy as np
+import orjson
+import os
+import shutil
+import threading
+
+from django.conf import settings
+from django.db import models
+
+from .models import AttributeSet, Hull, Outfit
+from .shards import use_release
+from .snapshots import current_hash, is_release_name
+
+logger = logging.getLogger(__name__)
+
+MATRIX_NAMES = {Hull: 'hulls', Outfit: 'outfits'}
+
+# Matrices by (model, release)
+_matrices = {}
+_lock = threading.Lock()
+
+
+def matrix_dir(release: str, content_hash: str):
+    return settings.RELEASE_DATA_DIR / release / 'matrices' / content_hash
+
+
+def stat_columns(model):
+    """
+    Returns the names of the numeric stats of a model, in declaration order
+    """
+    fields = [
+        field for field in [*model._meta.concrete_fields, *getattr(model, 'sparse_fields', {}).values()]
+        if isinstance(field, (models.IntegerField, models.FloatField, models.BooleanField)) and not field.primary_key
+    ]
+    return [field.name for field in sorted(fields, key=lambda field: field.creation_counter)]
+
+
+def build_matrix(model, release: str):
+    """
+    Collects the numeric stats of all hulls or outfits of a release
+
+    Args:
+        model (Model): Hull or Outfit
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+
+    Returns:
+        tuple: (ids, names, columns, values), where values is a
+               len(ids) x len(columns) float matrix
+    """
+    columns = stat_columns(model)
+    sparse_fields = getattr(model, 'sparse_fields', {})
+    column_fields = [name for name in columns if name not in sparse_fields]
+    rows = model.objects.filter(release=release).order_by('pk').values_list('pk', 'name', 'attribute_set', *column_fields)
+    # Resolved once per set, the sets of hull variants are deltas on their base sets
+    attribute_sets = {
+        attribute_set.pk: attribute_set.resolve()
+        for attribute_set in AttributeSet.objects.filter(**{f"{model._meta.model_name}s__release": release}).select_related('base').distinct()
+    }
+
+    ids = np.empty(len(rows), dtype=np.int64)
+    names = []
+    values = np.zeros((len(rows), len(columns)), dtype=np.float64)
+    positions = {name: position for position, name in enumerate(columns)}
+    column_positions = [positions[name] for name in column_fields]
+    for index, (pk, name, attribute_set, *stats) in enumerate(rows):
+        ids[index] = pk
+        names.append(name)
+        values[index, column_positions] = stats
+        for stat, value in attribute_sets.get(attribute_set, {}).items():
+            if stat in positions:
+                values[index, positions[stat]] = value
+    return ids, names, columns, values
+
+
+def write_matrices(release: str, content_hash: str):
+    """
+    Writes the attribute matrices of the hulls and outfits of a release.
+    Run at ingest, once the content hash of the release is recorded.
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+        content_hash (str): Content hash of the release (see snapshots.record_snapshot())
+    """
+    directory = matrix_dir(release, content_hash)
+    if not directory.exists():
+        # Write to a temporary directory first, readers only see complete matrices
+        staging = directory.with_name(f"{content_hash}.{os.getpid()}.tmp")
+        staging.mkdir(parents=True)
+        for model, name in MATRIX_NAMES.items():
+            with use_release(release):
+                ids, names, columns, values = build_matrix(model, release)
+            np.save(staging / f"{name}.npy", values)
+            np.save(staging / f"{name}.ids.npy", ids)
+            (staging / f"{name}.json").write_bytes(orjson.dumps({'columns': columns, 'names': names}))
+        try:
+            os.replace(staging, directory)
+            logger.info(f"Wrote attribute matrices of release '{release}'")
+        except OSError:
+            # Another process wrote the same matrices in the meantime
+            shutil.rmtree(staging, ignore_errors=True)
+
+    # Workers still mapping the files of a removed directory keep reading them
+    for path in directory.parent.iterdir():
+        if path != directory and not path.name.endswith('.tmp'):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class AttributeMatrix:
+    """
+    Read-only, memory-mapped numeric stats of the hulls or outfits of a release
+
+    Attributes:
+        content_hash (str): Content hash of the release the matrix was written for
+        columns (list): Stat names
+        ids (ndarray): Primary keys of the rows, ascending
+        names (list): Names of the rows
+        values (ndarray): len(ids) x len(columns) float matrix
+    """
+    def __init__(self, directory, name: str, content_hash: str):
+        index = orjson.loads((directory / f"{name}.json").read_bytes())
+        self.content_hash = content_hash
+        self.columns = index['columns']
+        self.names = index['names']
+        self.ids = np.load(directory / f"{name}.ids.npy", mmap_mode='r')
+        self.values = np.load(directory / f"{name}.npy", mmap_mode='r')
+        self.positions = {column: position for position, column in enumerate(self.columns)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def column(self, stat: str):
+        """
+        Returns the values of a stat for all rows
+        """
+        return self.values[:, self.positions[stat]]
+
+    def rows(self, ids):
+        """
+        Returns the row numbers of the given primary keys
+
+        Raises:
+            KeyError: If any of the primary keys is not in the matrix
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = np.searchsorted(self.ids, ids)
+        if len(self) == 0 or np.any(rows >= len(self)) or np.any(self.ids[np.minimum(rows, len(self) - 1)] != ids):
+            raise KeyError(f"Unknown ids: {sorted(set(ids.tolist()) - set(self.ids.tolist()))}")
+        return rows
+
+    def totals(self, amounts: dict):
+        """
+        Sums up the stats of a set of rows, each counted a number of times
+        (e.g. the outfits of a build)
+
+        Args:
+            amounts (dict): {primary key: amount}
+
+        Returns:
+            dict: {stat: total}
+        """
+        if not amounts:
+            return dict.fromkeys(self.columns, 0.0)
+        rows = self.rows(list(amounts))
+        totals = np.asarray(list(amounts.values()), dtype=np.float64) @ self.values[rows]
+        return dict(zip(self.columns, totals.tolist()))
+
+    def rank(self, stat: str, count: int = 10, descending: bool = True):
+        """
+        Returns the rows with the highest (or lowest) values of a stat
+
+        Returns:
+            list: [(primary key, name, value), ...]
+        """
+        column = self.column(stat)
+        order = np.argsort(-column if descending else column, kind='stable')[:count]
+        return [(int(self.ids[row]), self.names[row], float(column[row])) for row in order]
+
+
+def get_matrix(model, release: str):
+    """
+    Returns the attribute matrix of the hulls or outfits of a release,
+    writing the matrices first if they have not been written for the
+    current content hash of the release
+
+    Args:
+        model (Model): Hull or Outfit
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+
+    Returns:
+        AttributeMatrix: Matrix or None if the release has no recorded content hash
+    """
+    if not is_release_name(release):
+        return None
+    release_hash = current_hash(release)
+    if release_hash is None:
+        return None
+
+    matrix = _matrices.get((model, release))
+    if matrix is not None and matrix.content_hash == release_hash:
+        return matrix
+
+    with _lock:
+        matrix = _matrices.get((model, release))
+        if matrix is None or matrix.content_hash != release_hash:
+            directory = matrix_dir(release, release_hash)
+            if not directory.exists():
+                write_matrices(release, release_hash)
+            matrix = AttributeMatrix(directory, MATRIX_NAMES[model], release_hash)
+            _matrices[(model, release)] = matrix
+    return matrix
@@ -0,0 +1,283 @@
+"""
+Middleware protecting the API from traffic spikes (e.g. when a new release
+goes live and every client asks for the same lists at once).
+
+LoadSheddingMiddleware turns API requests away with a 503 before the
+workers saturate. CoalescingMiddleware lets concurrent identical API
+requests share a single response. Both work under WSGI (threads) and
+ASGI (event loop).
+
+HealthCheckMiddleware answers the liveness (/healthz) and readiness
+(/readyz) probes of the container and of nginx.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+from .warmup import is_ready
+
+logger = logging.getLogger(__name__)
+
+# Only requests below this path are shed or coalesced
+API_PREFIX = '/api/'
+
+# Seconds a coalesced request waits for the shared response before computing its own
+COALESCE_TIMEOUT = 30
+
+# Paths of the liveness and readiness probes
+HEALTH_PATH = '/healthz'
+READY_PATH = '/readyz'
+
+# Request headers that change the response of an API endpoint
+COALESCE_HEADERS = ['Accept', 'Accept-Encoding', 'If-None-Match']
+
+
+def request_queue_time(request):
+  """
+  Returns the seconds a request spent waiting for a worker, from the
+  'X-Request-Start: t=<epoch seconds>' header set by nginx, or None
+  """
+  header = request.headers.get('X-Request-Start', '')
+  if header.startswith('t='):
+    header = header[2:]
+  try:
+    started = float(header)
+  except ValueError:
+    return None
+  return max(0.0, time.time() - started)
+
+
+class LoadSheddingMiddleware:
+  """
+  Answers API requests with '503 Service Unavailable' and a Retry-After
+  header when the worker is saturated, i.e. when it is already handling
+  settings.SHED_MAX_IN_FLIGHT requests, or when the request has been
+  queued for longer than settings.SHED_MAX_QUEUE_TIME seconds before
+  reaching the worker (once all its threads are busy, requests queue up
+  in front of it).
+
+  The in-flight limit applies to the requests a worker handles at once:
+  those of its threads under WSGI (gunicorn's gthread workers, see
+  es_outfitter.gunicorn_conf) or of its event loop under ASGI. A worker
+  handling one request at a time (e.g. gunicorn's sync worker) is only
+  ever shed by queue time.
+  """
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+    self.in_flight = 0
+    self.lock = threading.Lock()
+    if iscoroutinefunction(self.get_response):
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    if not request.path.startswith(API_PREFIX):
+      return self.get_response(request)
+    if self.queued_too_long(request) or not self.enter():
+      return self.busy_response(request)
+    try:
+      return self.get_response(request)
+    finally:
+      self.leave()
+
+  async def __acall__(self, request):
+    if not request.path.startswith(API_PREFIX):
+      return await self.get_response(request)
+    if self.queued_too_long(request) or not self.enter():
+      return self.busy_response(request)
+    try:
+      return await self.get_response(request)
+    finally:
+      self.leave()
+
+  def enter(self):
+    """
+    Counts a request in flight, unless the worker is saturated already
+    (checked and counted at once, so that concurrent requests cannot
+    both take the last slot)
+
+    Returns:
+      bool: Whether the request may be handled
+    """
+    with self.lock:
+      if self.in_flight >= settings.SHED_MAX_IN_FLIGHT:
+        return False
+      self.in_flight += 1
+      return True
+
+  def leave(self):
+    with self.lock:
+      self.in_flight -= 1
+
+  def queued_too_long(self, request):
+    queue_time = request_queue_time(request)
+    return queue_time is not None and queue_time > settings.SHED_MAX_QUEUE_TIME
+
+  def busy_response(self, request):
+    logger.warning(f"Shedding request to {request.path} ({self.in_flight} in flight)")
+    response = JsonResponse({"detail": "The server is busy, please retry later."}, status=503)
+    response['Retry-After'] = str(settings.SHED_RETRY_AFTER)
+    return response
+
+
+def coalescing_key(request):
+  """
+  Normalizes a request into a key shared by all requests that get the same
+  response: path, sorted query parameters and content negotiation headers.
+  Returns None for requests that are not coalesced.
+  """
+  if request.method != 'GET' or not request.path.startswith(API_PREFIX):
+    return None
+  params = tuple(sorted((key, tuple(values)) for key, values in request.GET.lists()))
+  headers = tuple(request.headers.get(header, '') for header in COALESCE_HEADERS)
+  return request.path, params, headers
+
+
+def freeze(response):
+  """
+  Takes a copy of a response that can be shared with other requests, or
+  returns None if the response cannot be shared (streamed, sets cookies)
+  """
+  if response.streaming or response.cookies:
+    return None
+  return response.status_code, dict(response.headers), response.content
+
+
+def thaw(frozen):
+  status, headers, content = frozen
+  return HttpResponse(content, status=status, headers=headers)
+
+
+class _Flight:
+  """
+  A response being computed in a thread, waited for by identical requests
+  """
+  def __init__(self):
+    self.done = threading.Event()
+    self.response = None
+
+
+class CoalescingMiddleware:
+  """
+  Single-flight for API requests: while a request is being handled, any
+  identical request (see coalescing_key()) waits for it and is sent a copy
+  of its response instead of running the same query and serialization.
+
+  Coalescing happens within a worker process, across its threads (WSGI)
+  or its event loop (ASGI). It needs workers that handle several requests
+  at once: gunicorn runs threaded WSGI workers for it (see
+  es_outfitter.gunicorn_conf), with a sync worker it would never apply.
+  Streamed responses are not shared, waiting requests then compute their
+  own response.
+  """
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+    self.flights = {}
+    self.lock = threading.Lock()
+    if iscoroutinefunction(self.get_response):
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    key = coalescing_key(request)
+    if key is None:
+      return self.get_response(request)
+
+    with self.lock:
+      flight = self.flights.get(key)
+      leader = flight is None
+      if leader:
+        flight = self.flights[key] = _Flight()
+
+    if not leader:
+      if flight.done.wait(COALESCE_TIMEOUT) and flight.response is not None:
+        return thaw(flight.response)
+      return self.get_response(request)
+
+    try:
+      response = self.get_response(request)
+      flight.response = freeze(response)
+      return response
+    finally:
+      with self.lock:
+        del self.flights[key]
+      flight.done.set()
+
+  async def __acall__(self, request):
+    key = coalescing_key(request)
+    if key is None:
+      return await self.get_response(request)
+
+    # All coroutines of a worker run in the same event loop, no locking needed
+    flight = self.flights.get(key)
+    if flight is not None:
+      try:
+        frozen = await asyncio.wait_for(asyncio.shield(flight), COALESCE_TIMEOUT)
+      except asyncio.TimeoutError:
+        frozen = None
+      if frozen is not None:
+        return thaw(frozen)
+      return await self.get_response(request)
+
+    flight = self.flights[key] = asyncio.get_running_loop().create_future()
+    frozen = None
+    try:
+      response = await self.get_response(request)
+      frozen = freeze(response)
+      return response
+    finally:
+      del self.flights[key]
+      flight.set_result(frozen)
+
+
+class HealthCheckMiddleware:
+  """
+  Answers the probes before any other middleware, whatever the Host
+  header (the probes are sent to the container directly) and however
+  busy the worker is:
+
+  - /healthz: 200 as long as the worker handles requests (liveness)
+  - /readyz: 200 once the worker has been warmed up (see
+    warmup.warm_worker()), 503 until then (readiness)
+  """
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+    if iscoroutinefunction(self.get_response):
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    return self.probe_response(request) or self.get_response(request)
+
+  async def __acall__(self, request):
+    return self.probe_response(request) or await self.get_response(request)
+
+  def probe_response(self, request):
+    if request.path == HEALTH_PATH:
+      response = JsonResponse({"status": "ok"})
+    elif request.path == READY_PATH:
+      ready = is_ready()
+      response = JsonResponse({"status": "ready" if ready else "warming up"}, status=200 if ready else 503)
+      # Not logged as a server error by Django's request handler
+      response._has_been_logged = True
+    else:
+      return None
+    response['Cache-Control'] = 'no-store'
+    return response
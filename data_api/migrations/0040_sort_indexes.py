@@ -0,0 +1,99 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0039_auto_20221125_2046'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hull',
+            index=models.Index(fields=['release', 'name', 'id'], name='hull_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hull',
+            index=models.Index(fields=['release', 'cost', 'id'], name='hull_cost_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hull',
+            index=models.Index(fields=['release', 'mass', 'id'], name='hull_mass_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hull',
+            index=models.Index(fields=['release', 'shields', 'id'], name='hull_shields_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hull',
+            index=models.Index(fields=['release', 'hull', 'id'], name='hull_hull_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hull',
+            index=models.Index(fields=['release', 'total_hp', 'id'], name='hull_total_hp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hull',
+            index=models.Index(fields=['release', 'speed_rating', 'id'], name='hull_speed_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hull',
+            index=models.Index(fields=['release', 'agility_rating', 'id'], name='hull_agility_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hull',
+            index=models.Index(fields=['release', 'outfit_space', 'id'], name='hull_outfit_space_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hull',
+            index=models.Index(fields=['release', 'cargo_space', 'id'], name='hull_cargo_space_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'name', 'id'], name='outfit_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'cost', 'id'], name='outfit_cost_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'mass', 'id'], name='outfit_mass_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'outfit_space', 'id'], name='outfit_outfit_space_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'shield_dps', 'id'], name='outfit_shield_dps_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'hull_dps', 'id'], name='outfit_hull_dps_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'average_dps', 'id'], name='outfit_average_dps_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'range', 'id'], name='outfit_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'thrust', 'id'], name='outfit_thrust_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'turn', 'id'], name='outfit_turn_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'energy_capacity', 'id'], name='outfit_energy_capacity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['release', 'shield_generation', 'id'], name='outfit_shield_generation_idx'),
+        ),
+    ]
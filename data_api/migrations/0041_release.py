@@ -0,0 +1,67 @@
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def release_sort_key(name):
+    """
+    Sort key of a release name: a frozen copy of models.release_sort_key()
+    as of this migration
+    """
+    if name == 'continuous':
+        return 2 ** 62
+    parts = re.findall(r'\d+', name)[:3]
+    key = 0
+    for part in parts + ['0'] * (3 - len(parts)):
+        key = key * 100000 + int(part)
+    return key
+
+
+def catalog_existing_releases(apps, schema_editor):
+    """
+    Lists the releases already in the database as ready
+    """
+    Hull = apps.get_model('data_api', 'Hull')
+    Outfit = apps.get_model('data_api', 'Outfit')
+    Build = apps.get_model('data_api', 'Build')
+    Release = apps.get_model('data_api', 'Release')
+    for name in Hull.objects.values_list('release', flat=True).distinct():
+        hash_file = settings.RELEASE_DATA_DIR / name / 'content_hash'
+        Release.objects.create(
+            name=name,
+            sort_key=release_sort_key(name),
+            status='ready',
+            content_hash=hash_file.read_text() if hash_file.exists() else '',
+            hull_count=Hull.objects.filter(release=name).count(),
+            outfit_count=Outfit.objects.filter(release=name).count(),
+            build_count=Build.objects.filter(hull__release=name).count(),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0040_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Release',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20, unique=True)),
+                ('sort_key', models.BigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('ingesting', 'Ingesting'), ('ready', 'Ready'), ('failed', 'Failed')], default='ingesting', max_length=10)),
+                ('ingested_at', models.DateTimeField(blank=True, null=True)),
+                ('content_hash', models.CharField(blank=True, max_length=64)),
+                ('hull_count', models.IntegerField(default=0)),
+                ('outfit_count', models.IntegerField(default=0)),
+                ('build_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-sort_key'],
+            },
+        ),
+        migrations.RunPython(catalog_existing_releases, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,697 @@
+import data_api.models
+from django.db import migrations
+
+
+def quantize_stats(apps, schema_editor):
+    """
+    Rounds stored stats to their decimal places, as DecimalField did when
+    reading them, so every stat is served with the same digits as before
+    """
+    for model_name in ['Hull', 'Outfit']:
+        model = apps.get_model('data_api', model_name)
+        fields = [field for field in model._meta.fields if isinstance(field, data_api.models.QuantizedFloatField)]
+        names = [field.name for field in fields]
+        changed = []
+        for row in model.objects.only('pk', *names):
+            quantized = {field.name: field.get_prep_value(getattr(row, field.name)) for field in fields}
+            if any(getattr(row, name) != value for name, value in quantized.items()):
+                for name, value in quantized.items():
+                    setattr(row, name, value)
+                changed.append(row)
+        model.objects.bulk_update(changed, names, batch_size=100)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0041_release'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='hull',
+            name='active_cooling',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='agility_rating',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='burn_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='cloak',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='cloaking_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='cloaking_fuel',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='cooling',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='cooling_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='corrosion_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='discharge_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='disruption_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='drag',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='energy_generation',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='energy_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='force_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='fuel_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='heat_dissipation',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='heat_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='hull_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='hull_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='hull_repair_rate',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='ion_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='ion_resistance',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='leak_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='piercing_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='reverse_thrust',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='reverse_thrusting_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='reverse_thrusting_heat',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='shield_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='shield_generation',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='shield_heat',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='shield_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='slowing_protection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='slowing_resistance',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='speed_rating',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='thrust',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='turn',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='acceleration',
+            field=data_api.models.QuantizedFloatField(decimal_places=5, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='active_cooling',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='active_cooling_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='afterburner_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='afterburner_fuel',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='afterburner_heat',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='afterburner_thrust',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=9),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='afterburner_thrust_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='anti_missile_dps',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='anti_missile_dps_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='average_damage',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='average_dps',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='average_dps_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='capture_attack',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=4),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='capture_defense',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='cloak',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='cloaking_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='cloaking_fuel',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='combined_cooling',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='combined_cooling_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='cooling',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='cooling_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='cooling_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='disruption_damage',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='disruption_dps',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='disruption_dps_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='drag',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=4),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='energy_capacity_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='energy_consumption',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='energy_generation',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='energy_per_second',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='firing_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='firing_fuel',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='firing_heat',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='fuel_per_second',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='heat_damage',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='heat_dissipation',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='heat_dps',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='heat_dps_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='heat_generation',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='heat_per_second',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='hit_force',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='hit_force_per_second',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='hull_damage',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='hull_dps',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='hull_dps_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='hull_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='hull_heat',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='hull_repair_rate',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='hull_repair_rate_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='inaccuracy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='infrared_tracking',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=3),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='ion_damage',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='ion_dps',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=9),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='ion_dps_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='ion_resistance',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=4),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='mass',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='optical_tracking',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=3),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='piercing',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=4),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='radar_tracking',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=3),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='ramscoop',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=4),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='ramscoop_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=4),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='range',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='reload',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='reverse_thrust',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='reverse_thrust_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='reverse_thrusting_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='reverse_thrusting_heat',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='scan_interference',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=4),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='shield_damage',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='shield_dps',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='shield_dps_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='shield_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='shield_generation',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='shield_generation_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='shield_heat',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='shots_per_second',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='slowing_damage',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='slowing_dps',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='slowing_dps_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='slowing_resistance',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=4),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='solar_collection',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='thrust',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='thrust_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='thrusting_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='thrusting_heat',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='total_energy_generation',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=9),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='total_energy_generation_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='tracking',
+            field=data_api.models.QuantizedFloatField(decimal_places=1, default=0, max_digits=2),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='turn',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='turn_per_space',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='turning_energy',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='turning_heat',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=8),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='turret_turn',
+            field=data_api.models.QuantizedFloatField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='velocity',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=7),
+        ),
+        migrations.AlterField(
+            model_name='outfit',
+            name='velocity_override',
+            field=data_api.models.QuantizedFloatField(decimal_places=3, default=0, max_digits=7),
+        ),
+        migrations.RunPython(quantize_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,93 @@
+from django.db import migrations, models
+
+# Stats moved from columns to the 'attributes' column, by model
+SPARSE_STATS = {
+    'Hull': [
+        'automaton', 'uncapturable', 'required_crew', 'bunks', 'drag', 'heat_dissipation',
+        'fuel_capacity', 'weapon_capacity', 'engine_capacity', 'ramscoop', 'energy_capacity',
+        'energy_generation', 'heat_generation', 'hull_repair_rate', 'hull_energy', 'hull_delay',
+        'shield_generation', 'shield_energy', 'shield_heat', 'cooling', 'active_cooling',
+        'cooling_energy', 'cloak', 'cloaking_energy', 'cloaking_fuel', 'thrust', 'turn',
+        'reverse_thrust', 'reverse_thrusting_energy', 'reverse_thrusting_heat', 'outfit_scan_power',
+        'outfit_scan_speed', 'tactical_scan_power', 'asteroid_scan_power', 'atmosphere_scan',
+        'burn_protection', 'corrosion_protection', 'discharge_protection', 'disruption_protection',
+        'energy_protection', 'force_protection', 'fuel_protection', 'heat_protection',
+        'hull_protection', 'ion_protection', 'leak_protection', 'piercing_protection',
+        'shield_protection', 'slowing_protection', 'ion_resistance', 'slowing_resistance', 'gaslining',
+        'remnant_node', 'gun_ports', 'turret_mounts', 'fighter_bays', 'drone_bays', 'spinal_mount',
+    ],
+    'Outfit': [
+        'automaton', 'unplunderable', 'engine_capacity', 'weapon_capacity', 'cargo_space', 'gun_ports',
+        'turret_mounts', 'spinal_mounts', 'fuel_capacity', 'bunks', 'required_crew', 'cooling',
+        'cooling_per_space', 'active_cooling', 'active_cooling_per_space', 'combined_cooling',
+        'combined_cooling_per_space', 'cooling_energy', 'cooling_inefficiency', 'heat_dissipation',
+        'depleted_shield_delay', 'energy_capacity_per_space', 'solar_collection', 'energy_generation',
+        'total_energy_generation', 'total_energy_generation_per_space', 'heat_generation',
+        'energy_consumption', 'shield_generation_per_space', 'shield_energy', 'shield_heat',
+        'hull_repair_rate', 'hull_repair_rate_per_space', 'hull_energy', 'hull_heat', 'radar_jamming',
+        'ramscoop', 'ramscoop_per_space', 'jump_fuel', 'hyperdrive', 'jumpdrive', 'cargo_scan_power',
+        'cargo_scan_speed', 'outfit_scan_power', 'outfit_scan_speed', 'asteroid_scan_power',
+        'tactical_scan_power', 'atmosphere_scan', 'scan_interference', 'cloak', 'cloaking_energy',
+        'cloaking_fuel', 'capture_attack', 'capture_defense', 'thrust_per_space', 'thrusting_energy',
+        'thrusting_heat', 'turn_per_space', 'turning_energy', 'turning_heat', 'reverse_thrust',
+        'reverse_thrust_per_space', 'reverse_thrusting_energy', 'reverse_thrusting_heat',
+        'afterburner_thrust', 'afterburner_thrust_per_space', 'afterburner_fuel', 'afterburner_heat',
+        'afterburner_energy', 'illegal', 'inaccuracy', 'velocity', 'lifetime', 'range_override',
+        'velocity_override', 'reload', 'firing_energy', 'firing_heat', 'firing_fuel', 'firing_force',
+        'shield_damage', 'hull_damage', 'average_damage', 'heat_damage', 'ion_damage',
+        'slowing_damage', 'disruption_damage', 'hit_force', 'piercing', 'shots_per_second', 'heat_dps',
+        'ion_dps', 'slowing_dps', 'disruption_dps', 'hit_force_per_second', 'anti_missile_dps',
+        'energy_per_second', 'heat_per_second', 'fuel_per_second', 'shield_dps_per_space',
+        'hull_dps_per_space', 'average_dps_per_space', 'heat_dps_per_space', 'ion_dps_per_space',
+        'slowing_dps_per_space', 'disruption_dps_per_space', 'anti_missile_dps_per_space',
+        'ammo_capacity', 'missile_strength', 'acceleration', 'drag', 'homing', 'tracking',
+        'infrared_tracking', 'radar_tracking', 'optical_tracking', 'trigger_radius', 'blast_radius',
+        'burst_count', 'burst_reload', 'cluster', 'submunition_count', 'stream', 'anti_missile',
+        'turret_turn', 'ion_resistance', 'slowing_resistance',
+    ],
+}
+
+
+def pack_stats(apps, schema_editor):
+    """
+    Moves the stats that are not zero into the 'attributes' column
+    """
+    for model_name, names in SPARSE_STATS.items():
+        model = apps.get_model('data_api', model_name)
+        rows = list(model.objects.only('pk', *names))
+        for row in rows:
+            row.attributes = {name: getattr(row, name) for name in names if getattr(row, name)}
+        model.objects.bulk_update(rows, ['attributes'], batch_size=100)
+
+
+def unpack_stats(apps, schema_editor):
+    for model_name, names in SPARSE_STATS.items():
+        model = apps.get_model('data_api', model_name)
+        rows = list(model.objects.only('pk', 'attributes', *names))
+        for row in rows:
+            for name in names:
+                if name in row.attributes:
+                    setattr(row, name, row.attributes[name])
+        model.objects.bulk_update(rows, names, batch_size=100)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0042_quantized_float_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hull',
+            name='attributes',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='outfit',
+            name='attributes',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(pack_stats, unpack_stats),
+        *[migrations.RemoveField(model_name=model_name.lower(), name=name) for model_name, names in SPARSE_STATS.items() for name in names],
+    ]
@@ -0,0 +1,84 @@
+import hashlib
+import orjson
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Text columns moved into the attribute sets, by model
+TEXT_ATTRIBUTES = {
+    'Hull': ['plural', 'description', 'license', 'sprite', 'thumbnail'],
+    'Outfit': ['plural', 'description', 'license', 'thumbnail'],
+}
+
+
+def share_attributes(apps, schema_editor):
+    """
+    Moves the attributes and text columns of every hull and outfit into
+    attribute sets, one per distinct content
+    """
+    AttributeSet = apps.get_model('data_api', 'AttributeSet')
+    attribute_sets = {}
+    for model_name, names in TEXT_ATTRIBUTES.items():
+        model = apps.get_model('data_api', model_name)
+        rows = list(model.objects.only('pk', 'attributes', *names))
+        for row in rows:
+            data = {**{name: getattr(row, name) for name in names if getattr(row, name)}, **row.attributes}
+            content_hash = hashlib.sha1(orjson.dumps(data, option=orjson.OPT_SORT_KEYS)).hexdigest()
+            if content_hash not in attribute_sets:
+                attribute_sets[content_hash] = AttributeSet.objects.create(content_hash=content_hash, data=data)
+            row.attribute_set = attribute_sets[content_hash]
+        model.objects.bulk_update(rows, ['attribute_set'], batch_size=100)
+
+
+def unshare_attributes(apps, schema_editor):
+    for model_name, names in TEXT_ATTRIBUTES.items():
+        model = apps.get_model('data_api', model_name)
+        rows = list(model.objects.select_related('attribute_set'))
+        for row in rows:
+            data = dict(row.attribute_set.data) if row.attribute_set else {}
+            for name in names:
+                setattr(row, name, data.pop(name, ''))
+            row.attributes = data
+        model.objects.bulk_update(rows, ['attributes', *names], batch_size=100)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0043_sparse_attributes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttributeSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=40, unique=True)),
+                ('data', models.JSONField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='hull',
+            name='attribute_set',
+            field=models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)ss', to='data_api.attributeset'),
+        ),
+        migrations.AddField(
+            model_name='outfit',
+            name='attribute_set',
+            field=models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)ss', to='data_api.attributeset'),
+        ),
+        # With a default, the text columns can be added back when unapplying
+        *[
+            migrations.AlterField(model_name='hull', name=name, field=models.CharField(default='', max_length=max_length))
+            for name, max_length in [('plural', 40), ('description', 1000), ('license', 80), ('sprite', 40), ('thumbnail', 40)]
+        ],
+        *[
+            migrations.AlterField(model_name='outfit', name=name, field=models.CharField(default='', max_length=max_length, blank=blank))
+            for name, max_length, blank in [('plural', 40, True), ('description', 1400, False), ('license', 80, False), ('thumbnail', 40, False)]
+        ],
+        migrations.RunPython(share_attributes, unshare_attributes),
+        *[
+            migrations.RemoveField(model_name=model_name.lower(), name=name)
+            for model_name, names in TEXT_ATTRIBUTES.items() for name in ['attributes', *names]
+        ],
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+# Natural keys, by model (duplicates are deleted in this order)
+NATURAL_KEYS = {
+    'Outfit': ['release', 'name'],
+    'Hull': ['release', 'name'],
+    'Build': ['hull', 'name'],
+    'Outfit_details': ['build', 'outfit'],
+}
+
+
+def delete_duplicates(apps, schema_editor):
+    """
+    Keeps only the latest row with each natural key, as a later definition
+    of an outfit or hull replaces an earlier one
+    """
+    for model_name, natural_key in NATURAL_KEYS.items():
+        model = apps.get_model('data_api', model_name)
+        for duplicate in model.objects.values(*natural_key).annotate(count=Count('pk'), latest=Max('pk')).filter(count__gt=1):
+            model.objects.filter(**{name: duplicate[name] for name in natural_key}).exclude(pk=duplicate['latest']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0044_shared_attribute_sets'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='build',
+            constraint=models.UniqueConstraint(fields=('hull', 'name'), name='build_natural_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='hull',
+            constraint=models.UniqueConstraint(fields=('release', 'name'), name='hull_natural_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='outfit',
+            constraint=models.UniqueConstraint(fields=('release', 'name'), name='outfit_natural_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='outfit_details',
+            constraint=models.UniqueConstraint(fields=('build', 'outfit'), name='outfit_details_natural_key'),
+        ),
+    ]
@@ -0,0 +1,110 @@
+import hashlib
+import orjson
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def content_hash(data, base=None):
+    content = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha1(base.content_hash.encode() + content if base else content).hexdigest()
+
+
+def get_attribute_set(AttributeSet, data, base=None):
+    attribute_set, _ = AttributeSet.objects.get_or_create(content_hash=content_hash(data, base), defaults={'data': data, 'base': base})
+    return attribute_set
+
+
+def prune(AttributeSet):
+    while AttributeSet.objects.filter(hulls=None, outfits=None, variants=None).delete()[0]:
+        pass
+
+
+def chain_depth(hull, hulls):
+    depth = 0
+    while hull.base_model_id in hulls:
+        hull = hulls[hull.base_model_id]
+        depth += 1
+    return depth
+
+
+def store_deltas(apps, schema_editor):
+    """
+    Stores the attribute sets of hull variants as deltas on the attribute
+    sets of their base models
+    """
+    AttributeSet = apps.get_model('data_api', 'AttributeSet')
+    Hull = apps.get_model('data_api', 'Hull')
+    hulls = {hull.pk: hull for hull in Hull.objects.select_related('attribute_set')}
+    # Full attributes, by hull, before any of them is replaced by a delta
+    attributes = {pk: dict(hull.attribute_set.data) if hull.attribute_set else {} for pk, hull in hulls.items()}
+    variants = sorted((hull for hull in hulls.values() if hull.base_model_id in hulls), key=lambda hull: chain_depth(hull, hulls))
+    for hull in variants:
+        base = attributes[hull.base_model_id]
+        data = attributes[hull.pk]
+        delta = {name: value for name, value in data.items() if base.get(name) != value}
+        delta.update({name: None for name in base if name not in data})
+        hull.attribute_set = get_attribute_set(AttributeSet, delta, hulls[hull.base_model_id].attribute_set)
+    Hull.objects.bulk_update(variants, ['attribute_set'], batch_size=100)
+    prune(AttributeSet)
+
+
+def store_full_sets(apps, schema_editor):
+    """
+    Stores the full attributes of hull variants again, and gives variants
+    sharing the default build of their base model a copy of their own
+    """
+    AttributeSet = apps.get_model('data_api', 'AttributeSet')
+    Hull = apps.get_model('data_api', 'Hull')
+    Build = apps.get_model('data_api', 'Build')
+    Outfit_details = apps.get_model('data_api', 'Outfit_details')
+
+    resolved = {}
+
+    def resolve(attribute_set):
+        if attribute_set.base_id is None:
+            return attribute_set.data
+        if attribute_set.pk not in resolved:
+            base = resolve(attribute_set.base)
+            attributes = {name: value for name, value in base.items() if name not in attribute_set.data}
+            attributes.update({name: value for name, value in attribute_set.data.items() if value is not None})
+            resolved[attribute_set.pk] = attributes
+        return resolved[attribute_set.pk]
+
+    variants = list(Hull.objects.filter(attribute_set__base__isnull=False).select_related('attribute_set'))
+    for hull in variants:
+        hull.attribute_set = get_attribute_set(AttributeSet, resolve(hull.attribute_set))
+    Hull.objects.bulk_update(variants, ['attribute_set'], batch_size=100)
+
+    for hull in Hull.objects.filter(default_build__isnull=False).exclude(default_build__hull=models.F('pk')).select_related('default_build'):
+        build = Build.objects.create(name=f"{hull.name} Default Build", hull=hull)
+        Outfit_details.objects.bulk_create([
+            Outfit_details(build=build, outfit_id=details.outfit_id, amount=details.amount)
+            for details in Outfit_details.objects.filter(build=hull.default_build)
+        ])
+        hull.default_build = build
+        hull.save(update_fields=['default_build'])
+
+    AttributeSet.objects.update(base=None)
+    prune(AttributeSet)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0045_natural_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attributeset',
+            name='base',
+            field=models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='variants', to='data_api.attributeset'),
+        ),
+        migrations.AlterField(
+            model_name='hull',
+            name='default_build',
+            field=models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='default_for', to='data_api.build'),
+        ),
+        migrations.RunPython(store_deltas, store_full_sets),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0046_variant_deltas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuildStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_speed', models.FloatField(default=0)),
+                ('acceleration', models.FloatField(default=0)),
+                ('turn', models.FloatField(default=0)),
+                ('idle_heat', models.FloatField(default=0)),
+                ('action_heat', models.FloatField(default=0)),
+                ('idle_energy', models.FloatField(default=0)),
+                ('action_energy', models.FloatField(default=0)),
+                ('average_dps', models.FloatField(default=0)),
+                ('free_outfit_space', models.FloatField(default=0)),
+                ('free_engine_capacity', models.FloatField(default=0)),
+                ('free_weapon_capacity', models.FloatField(default=0)),
+                ('build', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='data_api.build')),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_shared_builds(apps, schema_editor):
+    """
+    Gives hull variants sharing the default build of their base model a
+    copy of their own, with the amounts of its outfits
+    """
+    Hull = apps.get_model('data_api', 'Hull')
+    Build = apps.get_model('data_api', 'Build')
+    Outfit_details = apps.get_model('data_api', 'Outfit_details')
+
+    for hull in Hull.objects.filter(default_build__isnull=False).exclude(default_build__hull=models.F('pk')):
+        build = Build.objects.create(name=f"{hull.name} Default Build", hull=hull)
+        Outfit_details.objects.bulk_create([
+            Outfit_details(build=build, outfit_id=details.outfit_id, amount=details.amount)
+            for details in Outfit_details.objects.filter(build_id=hull.default_build_id)
+        ])
+        hull.default_build = build
+        hull.save(update_fields=['default_build'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0047_build_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_shared_builds, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='hull',
+            name='default_build',
+            field=models.OneToOneField(blank=True, default=None, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='is_default', to='data_api.build'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0048_variant_default_builds'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='build',
+            name='name',
+            field=models.CharField(max_length=60),
+        ),
+    ]
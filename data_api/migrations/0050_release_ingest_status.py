@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_api', '0049_build_name_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='release',
+            name='ingest_status',
+            field=models.CharField(blank=True, choices=[('ingesting', 'Ingesting'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=10),
+        ),
+    ]
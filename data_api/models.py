@@ -1,6 +1,281 @@
-from django.db import models
+import decimal
+import hashlib
+import orjson
+import re
 
-class Hull(models.Model):
+from django.db import models
+from django.db.backends.utils import format_number
+
+# Attributes the hull and outfit lists are most commonly sorted by. Each
+# gets a (release, attribute, id) index for keyset pagination.
+HULL_SORT_INDEXES = ['name', 'cost', 'mass', 'shields', 'hull', 'total_hp', 'speed_rating', 'agility_rating', 'outfit_space', 'cargo_space']
+OUTFIT_SORT_INDEXES = ['name', 'cost', 'mass', 'outfit_space', 'shield_dps', 'hull_dps', 'average_dps', 'range', 'thrust', 'turn', 'energy_capacity', 'shield_generation']
+
+class QuantizedFloatField(models.FloatField):
+    """
+    Float column for stats with a fixed number of decimal places, in place
+    of a DecimalField.
+
+    Values are rounded to decimal_places on save exactly like DecimalField
+    rounds them, but are stored and read back as floats, so reading a row
+    does not construct any decimal.Decimal. As max_digits is limited to 15
+    (the digits a double holds exactly), formatting a value with
+    decimal_places gives back the same digits a DecimalField would have
+    held (see serializers.QuantizedFloatSerializerField).
+    """
+    def __init__(self, *args, max_digits=None, decimal_places=None, **kwargs):
+        if max_digits is None or decimal_places is None or not 0 < max_digits <= 15:
+            raise ValueError("QuantizedFloatField needs max_digits (at most 15) and decimal_places")
+        self.max_digits = max_digits
+        self.decimal_places = decimal_places
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['max_digits'] = self.max_digits
+        kwargs['decimal_places'] = self.decimal_places
+        return name, path, args, kwargs
+
+    def get_prep_value(self, value):
+        value = super(models.FloatField, self).get_prep_value(value)
+        if value is None:
+            return None
+        if isinstance(value, float):
+            value = decimal.Context(prec=self.max_digits).create_decimal_from_float(value)
+        else:
+            value = decimal.Decimal(value)
+        return float(format_number(value, self.max_digits, self.decimal_places))
+
+
+def pack_attributes(model, attributes: dict):
+    """
+    Packs the attributes of a row for its AttributeSet: each value of a
+    declared attribute (see sparse()) is rounded and typed like its field
+    would store it, and empty values are dropped. Attributes that are not
+    declared are kept as they are.
+
+    Args:
+        model (Model): Hull or Outfit
+        attributes (dict): Attribute values by name
+
+    Returns:
+        dict: Packed attributes
+    """
+    declared = getattr(model, 'sparse_fields', {})
+    packed = {}
+    for name, field in declared.items():
+        if attributes.get(name):
+            value = field.get_prep_value(attributes[name])
+            if value:
+                packed[name] = value
+    for name, value in attributes.items():
+        if name not in declared and value:
+            packed[name] = value
+    return packed
+
+
+def attribute_delta(base: dict, attributes: dict):
+    """
+    Returns how (packed) attributes differ from those of a base: the
+    attributes that are new or changed, and None for those that are unset
+
+    Args:
+        base (dict): Attributes of the base
+        attributes (dict): Attributes
+
+    Returns:
+        dict: Delta, see apply_delta()
+    """
+    delta = {name: value for name, value in attributes.items() if base.get(name) != value}
+    delta.update({name: None for name in base if name not in attributes})
+    return delta
+
+
+def apply_delta(base: dict, delta: dict):
+    """
+    Returns the attributes of a base with a delta (see attribute_delta()) applied
+    """
+    attributes = {name: value for name, value in base.items() if name not in delta}
+    attributes.update({name: value for name, value in delta.items() if value is not None})
+    return attributes
+
+
+# Resolved attributes of the attribute sets with a base, by content hash
+_resolved = {}
+
+
+class AttributeSet(models.Model):
+    """
+    Everything about a hull or outfit that is neither used to identify nor
+    to filter or sort it (descriptions, sprites and the sparse stats, see
+    sparse()), as a JSON map of the attributes that are set.
+
+    Attribute sets are content-addressed and shared by all rows with the
+    same attributes, so a hull or outfit that is unchanged between releases
+    stores them once. Rows of a release only hold their identity and
+    filter columns (see SharedAttributesModel).
+
+    The attribute set of a hull variant only holds how its attributes
+    differ from those of its base model, on top of the attribute set of the
+    base model ('base'). Variant chains are resolved with resolve().
+    """
+    content_hash = models.CharField(max_length=40, unique=True)
+    data = models.JSONField()
+    base = models.ForeignKey('self',
+                             null=True,
+                             blank=True,
+                             default=None,
+                             on_delete=models.PROTECT,
+                             related_name='variants')
+
+    @classmethod
+    def for_data(cls, data: dict, base: 'AttributeSet' = None):
+        """
+        Returns the attribute set with the given (packed) attributes, creating it if needed
+
+        Args:
+            data (dict): Attributes, or a delta on the attributes of the base set
+            base (AttributeSet) (optional): Base set
+        """
+        content = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+        content_hash = hashlib.sha1(base.content_hash.encode() + content if base else content).hexdigest()
+        attribute_set, _ = cls.objects.get_or_create(content_hash=content_hash, defaults={'data': data, 'base': base})
+        return attribute_set
+
+    def resolve(self):
+        """
+        Returns the attributes of the set, applied to those of its base set
+        (if any). Attribute sets never change, so the attributes resolved
+        for a content hash are cached.
+
+        Returns:
+            dict: Attributes (not to be modified)
+        """
+        if self.base_id is None:
+            return self.data
+        attributes = _resolved.get(self.content_hash)
+        if attributes is None:
+            attributes = _resolved[self.content_hash] = apply_delta(self.base.resolve(), self.data)
+        return attributes
+
+
+def prune_attribute_sets(using: str = None):
+    """
+    Deletes the attribute sets no hull, outfit or other attribute set uses anymore
+
+    Args:
+        using (str) (optional): Database alias (default: routed like any other query)
+    """
+    # Deleting a variant set can leave its base set unused
+    while AttributeSet.objects.using(using).filter(hulls=None, outfits=None, variants=None).delete()[0]:
+        pass
+
+
+class SharedAttributesManager(models.Manager):
+    def get_queryset(self):
+        # The base set of a hull variant (see AttributeSet.resolve())
+        return super().get_queryset().select_related('attribute_set__base')
+
+
+class SharedAttributesModel(models.Model):
+    """
+    Base of Hull and Outfit, keeping their sparse attributes in a shared
+    AttributeSet.
+
+    The attributes of a row are read into a dictionary ('attributes'),
+    which the attributes declared with sparse() read and write. On save,
+    the dictionary is packed and the row is pointed at the attribute set
+    with the same content, as a delta on the attribute set returned by
+    base_attribute_set() (if any).
+    """
+    attribute_set = models.ForeignKey(AttributeSet,
+                                      null=True,
+                                      blank=True,
+                                      default=None,
+                                      on_delete=models.PROTECT,
+                                      related_name='%(class)ss')
+
+    objects = SharedAttributesManager()
+
+    class Meta:
+        abstract = True
+
+    @property
+    def attributes(self):
+        if '_attributes' not in self.__dict__:
+            self._attributes = dict(self.attribute_set.resolve()) if self.attribute_set_id else {}
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, value):
+        self._attributes = value
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.__dict__.pop('_attributes', None)
+
+    def base_attribute_set(self):
+        """
+        Returns the attribute set the attributes of the row are stored as a
+        delta on, if any (see Hull)
+        """
+        return None
+
+    def save(self, *args, **kwargs):
+        data = pack_attributes(type(self), self.attributes)
+        base = self.base_attribute_set()
+        if base is not None:
+            data = attribute_delta(base.resolve(), data)
+        if self.attribute_set_id is None or self.attribute_set.data != data or self.attribute_set.base_id != getattr(base, 'pk', None):
+            self.attribute_set = AttributeSet.for_data(data, base)
+        super().save(*args, **kwargs)
+
+
+class sparse(property):
+    """
+    Declares an attribute stored in the attribute set of a row (see
+    AttributeSet) instead of a column of its own. Most stats are zero for
+    most hulls and outfits, so attribute sets only hold the ones that are
+    set, and adding an attribute does not need a schema migration.
+
+    The attribute reads and writes like a field, it defaults to the default
+    of the wrapped field (which is not a column itself, but describes the
+    type and rounding of the attribute). Attributes are not indexed and
+    cannot be filtered or ordered by in the database.
+
+    Args:
+        field (Field): QuantizedFloatField, IntegerField, BooleanField or CharField
+    """
+    def __init__(self, field):
+        self.field = field
+        self.default = field.get_default()
+        super().__init__(self.get_stat, self.set_stat)
+
+    def contribute_to_class(self, cls, name):
+        self.name = name
+        self.field.set_attributes_from_name(name)
+        self.field.model = cls
+        if 'sparse_fields' not in cls.__dict__:
+            cls.sparse_fields = {}
+        cls.sparse_fields[name] = self.field
+        setattr(cls, name, self)
+
+    def get_stat(self, instance):
+        return instance.attributes.get(self.name, self.default)
+
+    def set_stat(self, instance, value):
+        instance.attributes[self.name] = value
+
+
+def stat_field(model, name: str):
+    """
+    Returns the field of a stat of a model, whether it is a column or sparse
+    """
+    sparse_fields = getattr(model, 'sparse_fields', {})
+    return sparse_fields[name] if name in sparse_fields else model._meta.get_field(name)
+
+
+class Hull(SharedAttributesModel):
     release = models.CharField(max_length=20)
     spoiler = models.IntegerField(default=0)
     base_model = models.ForeignKey("self",
@@ -17,17 +292,17 @@ class Hull(models.Model):
                                          related_name='is_default')
 
     name = models.CharField(max_length=40)
-    plural = models.CharField(max_length=40)
+    plural = sparse(models.CharField(max_length=40))
     faction = models.CharField(max_length=40)
-    description = models.CharField(max_length=1000)
+    description = sparse(models.CharField(max_length=1000))
     category = models.CharField(max_length=40, blank=True)
-    license = models.CharField(max_length=80)
+    license = sparse(models.CharField(max_length=80))
     
-    sprite = models.CharField(max_length=40)
-    thumbnail = models.CharField(max_length=40)
+    sprite = sparse(models.CharField(max_length=40))
+    thumbnail = sparse(models.CharField(max_length=40))
 
-    automaton = models.BooleanField(default=False)
-    uncapturable = models.BooleanField(default=False)
+    automaton = sparse(models.BooleanField(default=False))
+    uncapturable = sparse(models.BooleanField(default=False))
     
     cost = models.IntegerField(default=0)
     shields = models.IntegerField(default=0)
@@ -35,276 +310,284 @@ class Hull(models.Model):
 
     # some aggregates
     total_hp = models.IntegerField(default=0)
-    speed_rating = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    agility_rating = models.DecimalField(default=0, max_digits=6, decimal_places=2)
+    speed_rating = QuantizedFloatField(default=0, max_digits=6, decimal_places=2)
+    agility_rating = QuantizedFloatField(default=0, max_digits=6, decimal_places=2)
 
-    required_crew = models.IntegerField(default=0)
-    bunks = models.IntegerField(default=0)
+    required_crew = sparse(models.IntegerField(default=0))
+    bunks = sparse(models.IntegerField(default=0))
 
     mass = models.IntegerField(default=0)
-    drag = models.DecimalField(default=0, max_digits=6, decimal_places=2)
+    drag = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
 
-    heat_dissipation = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    fuel_capacity = models.IntegerField(default=0)
+    heat_dissipation = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    fuel_capacity = sparse(models.IntegerField(default=0))
 
     cargo_space = models.IntegerField(default=0)
     outfit_space = models.IntegerField(default=0)
-    weapon_capacity = models.IntegerField(default=0)
-    engine_capacity = models.IntegerField(default=0)
-    ramscoop = models.IntegerField(default=0)
-
-    energy_capacity = models.IntegerField(default=0)
-    energy_generation = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    heat_generation = models.IntegerField(default=0)
-    
-    hull_repair_rate = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    hull_energy = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    hull_delay = models.IntegerField(default=0)
-    
-    shield_generation = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    shield_energy = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    shield_heat = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    
-    cooling = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    active_cooling = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    cooling_energy = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    
-    cloak = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    cloaking_energy = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    cloaking_fuel = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    
-    thrust = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    turn = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    reverse_thrust = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    reverse_thrusting_energy = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    reverse_thrusting_heat = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-
-    outfit_scan_power = models.IntegerField(default=0)
-    outfit_scan_speed = models.IntegerField(default=0)
-    tactical_scan_power = models.IntegerField(default=0)
-    asteroid_scan_power = models.IntegerField(default=0)
-    atmosphere_scan = models.IntegerField(default=0)
-
-    burn_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    corrosion_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    discharge_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    disruption_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    energy_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    force_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    fuel_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    heat_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    hull_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    ion_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    leak_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    piercing_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    shield_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    slowing_protection = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-
-
-    ion_resistance = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    slowing_resistance = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-
-    gaslining = models.BooleanField(default=False)
-    remnant_node = models.IntegerField(default=0)
-
-    gun_ports = models.IntegerField(default=0)
-    turret_mounts = models.IntegerField(default=0)
-    fighter_bays = models.IntegerField(default=0)
-    drone_bays = models.IntegerField(default=0)
-    spinal_mount = models.IntegerField(default=0)
+    weapon_capacity = sparse(models.IntegerField(default=0))
+    engine_capacity = sparse(models.IntegerField(default=0))
+    ramscoop = sparse(models.IntegerField(default=0))
+
+    energy_capacity = sparse(models.IntegerField(default=0))
+    energy_generation = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    heat_generation = sparse(models.IntegerField(default=0))
+    
+    hull_repair_rate = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    hull_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    hull_delay = sparse(models.IntegerField(default=0))
+    
+    shield_generation = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    shield_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    shield_heat = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    
+    cooling = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    active_cooling = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    cooling_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    
+    cloak = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    cloaking_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    cloaking_fuel = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    
+    thrust = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    turn = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    reverse_thrust = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    reverse_thrusting_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    reverse_thrusting_heat = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+
+    outfit_scan_power = sparse(models.IntegerField(default=0))
+    outfit_scan_speed = sparse(models.IntegerField(default=0))
+    tactical_scan_power = sparse(models.IntegerField(default=0))
+    asteroid_scan_power = sparse(models.IntegerField(default=0))
+    atmosphere_scan = sparse(models.IntegerField(default=0))
+
+    burn_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    corrosion_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    discharge_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    disruption_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    energy_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    force_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    fuel_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    heat_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    hull_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    ion_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    leak_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    piercing_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    shield_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    slowing_protection = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+
+
+    ion_resistance = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    slowing_resistance = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+
+    gaslining = sparse(models.BooleanField(default=False))
+    remnant_node = sparse(models.IntegerField(default=0))
+
+    gun_ports = sparse(models.IntegerField(default=0))
+    turret_mounts = sparse(models.IntegerField(default=0))
+    fighter_bays = sparse(models.IntegerField(default=0))
+    drone_bays = sparse(models.IntegerField(default=0))
+    spinal_mount = sparse(models.IntegerField(default=0))
+
+    class Meta:
+        indexes = [models.Index(fields=['release', field, 'id'], name=f'hull_{field}_idx') for field in HULL_SORT_INDEXES]
+        constraints = [models.UniqueConstraint(fields=['release', 'name'], name='hull_natural_key')]
+
+    def base_attribute_set(self):
+        # Variants store how they differ from their base model
+        return self.base_model.attribute_set if self.base_model_id else None
 
     def __str__(self):
         return self.name
     
 
-class Outfit(models.Model):
+class Outfit(SharedAttributesModel):
     release = models.CharField(max_length=20)
     spoiler = models.IntegerField(default=0)
     
     name = models.CharField(max_length=40)
-    plural = models.CharField(max_length=40, blank=True)
+    plural = sparse(models.CharField(max_length=40, blank=True))
     faction = models.CharField(max_length=40)
-    description = models.CharField(max_length=1400)
+    description = sparse(models.CharField(max_length=1400))
     category = models.CharField(max_length=40)
-    license = models.CharField(max_length=80)
+    license = sparse(models.CharField(max_length=80))
 
-    thumbnail = models.CharField(max_length=40)
+    thumbnail = sparse(models.CharField(max_length=40))
     
-    automaton = models.BooleanField(default=False)
-    unplunderable = models.BooleanField(default=False)
+    automaton = sparse(models.BooleanField(default=False))
+    unplunderable = sparse(models.BooleanField(default=False))
 
     cost = models.IntegerField(default=0)
     
-    mass = models.DecimalField(default=0, max_digits=7, decimal_places=3)
+    mass = QuantizedFloatField(default=0, max_digits=7, decimal_places=3)
     outfit_space = models.IntegerField(default=0)
-    engine_capacity = models.IntegerField(default=0)
-    weapon_capacity = models.IntegerField(default=0)
-    cargo_space = models.IntegerField(default=0)
-    gun_ports = models.IntegerField(default=0)
-    turret_mounts = models.IntegerField(default=0)
-    spinal_mounts = models.IntegerField(default=0)
-    fuel_capacity = models.IntegerField(default=0)
-    
-    bunks = models.IntegerField(default=0)
-    required_crew = models.IntegerField(default=0)
-    
-    cooling = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    cooling_per_space = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    active_cooling = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    active_cooling_per_space = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    combined_cooling = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    combined_cooling_per_space = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    cooling_energy = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    cooling_inefficiency = models.IntegerField(default=0)
-    heat_dissipation = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    depleted_shield_delay = models.IntegerField(default=0)
+    engine_capacity = sparse(models.IntegerField(default=0))
+    weapon_capacity = sparse(models.IntegerField(default=0))
+    cargo_space = sparse(models.IntegerField(default=0))
+    gun_ports = sparse(models.IntegerField(default=0))
+    turret_mounts = sparse(models.IntegerField(default=0))
+    spinal_mounts = sparse(models.IntegerField(default=0))
+    fuel_capacity = sparse(models.IntegerField(default=0))
+    
+    bunks = sparse(models.IntegerField(default=0))
+    required_crew = sparse(models.IntegerField(default=0))
+    
+    cooling = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    cooling_per_space = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    active_cooling = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    active_cooling_per_space = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    combined_cooling = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    combined_cooling_per_space = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    cooling_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    cooling_inefficiency = sparse(models.IntegerField(default=0))
+    heat_dissipation = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    depleted_shield_delay = sparse(models.IntegerField(default=0))
 
     energy_capacity = models.IntegerField(default=0)
-    energy_capacity_per_space = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    solar_collection = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    energy_generation = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    total_energy_generation = models.DecimalField(default=0, max_digits=9, decimal_places=2)
-    total_energy_generation_per_space = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    heat_generation = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    energy_consumption = models.DecimalField(default=0, max_digits=8, decimal_places=3)
+    energy_capacity_per_space = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    solar_collection = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    energy_generation = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    total_energy_generation = sparse(QuantizedFloatField(default=0, max_digits=9, decimal_places=2))
+    total_energy_generation_per_space = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    heat_generation = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    energy_consumption = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=3))
 
-    shield_generation = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    shield_generation_per_space = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    shield_energy = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    shield_heat = models.DecimalField(default=0, max_digits=8, decimal_places=2)
+    shield_generation = QuantizedFloatField(default=0, max_digits=8, decimal_places=2)
+    shield_generation_per_space = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    shield_energy = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    shield_heat = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
 
-    hull_repair_rate = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    hull_repair_rate_per_space = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    hull_energy = models.DecimalField(default=0, max_digits=5, decimal_places=2)
-    hull_heat = models.DecimalField(default=0, max_digits=5, decimal_places=2)
+    hull_repair_rate = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    hull_repair_rate_per_space = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    hull_energy = sparse(QuantizedFloatField(default=0, max_digits=5, decimal_places=2))
+    hull_heat = sparse(QuantizedFloatField(default=0, max_digits=5, decimal_places=2))
 
-    radar_jamming = models.IntegerField(default=0)
+    radar_jamming = sparse(models.IntegerField(default=0))
     
-    ramscoop = models.DecimalField(default=0, max_digits=4, decimal_places=2)
-    ramscoop_per_space = models.DecimalField(default=0, max_digits=4, decimal_places=2)
+    ramscoop = sparse(QuantizedFloatField(default=0, max_digits=4, decimal_places=2))
+    ramscoop_per_space = sparse(QuantizedFloatField(default=0, max_digits=4, decimal_places=2))
     
-    jump_fuel = models.IntegerField(default=0)
-    hyperdrive = models.IntegerField(default=0)
-    jumpdrive = models.IntegerField(default=0)    
+    jump_fuel = sparse(models.IntegerField(default=0))
+    hyperdrive = sparse(models.IntegerField(default=0))
+    jumpdrive = sparse(models.IntegerField(default=0))
     
-    cargo_scan_power = models.IntegerField(default=0)
-    cargo_scan_speed = models.IntegerField(default=0)
+    cargo_scan_power = sparse(models.IntegerField(default=0))
+    cargo_scan_speed = sparse(models.IntegerField(default=0))
     
-    outfit_scan_power = models.IntegerField(default=0)
-    outfit_scan_speed = models.IntegerField(default=0)
+    outfit_scan_power = sparse(models.IntegerField(default=0))
+    outfit_scan_speed = sparse(models.IntegerField(default=0))
 
-    asteroid_scan_power = models.IntegerField(default=0)
+    asteroid_scan_power = sparse(models.IntegerField(default=0))
 
-    tactical_scan_power = models.IntegerField(default=0)
+    tactical_scan_power = sparse(models.IntegerField(default=0))
 
-    atmosphere_scan = models.IntegerField(default=0)
+    atmosphere_scan = sparse(models.IntegerField(default=0))
 
-    scan_interference = models.DecimalField(default=0, max_digits=4, decimal_places=2)
+    scan_interference = sparse(QuantizedFloatField(default=0, max_digits=4, decimal_places=2))
 
-    cloak = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    cloaking_energy = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    cloaking_fuel = models.DecimalField(default=0, max_digits=8, decimal_places=2)
+    cloak = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    cloaking_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    cloaking_fuel = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
 
-    capture_attack = models.DecimalField(default=0, max_digits=4, decimal_places=2)
-    capture_defense = models.DecimalField(default=0, max_digits=5, decimal_places=2)
+    capture_attack = sparse(QuantizedFloatField(default=0, max_digits=4, decimal_places=2))
+    capture_defense = sparse(QuantizedFloatField(default=0, max_digits=5, decimal_places=2))
     
-    thrust = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    thrust_per_space = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    thrusting_energy = models.DecimalField(default=0, max_digits=8, decimal_places=3)
-    thrusting_heat = models.DecimalField(default=0, max_digits=8, decimal_places=2)
+    thrust = QuantizedFloatField(default=0, max_digits=8, decimal_places=2)
+    thrust_per_space = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    thrusting_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=3))
+    thrusting_heat = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
     
-    turn = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    turn_per_space = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    turning_energy = models.DecimalField(default=0, max_digits=8, decimal_places=3)
-    turning_heat = models.DecimalField(default=0, max_digits=8, decimal_places=3)
+    turn = QuantizedFloatField(default=0, max_digits=8, decimal_places=2)
+    turn_per_space = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    turning_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=3))
+    turning_heat = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=3))
     
-    reverse_thrust = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    reverse_thrust_per_space = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    reverse_thrusting_energy = models.DecimalField(default=0, max_digits=8, decimal_places=3)
-    reverse_thrusting_heat = models.DecimalField(default=0, max_digits=8, decimal_places=2)
+    reverse_thrust = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    reverse_thrust_per_space = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    reverse_thrusting_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=3))
+    reverse_thrusting_heat = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
     
-    afterburner_thrust = models.DecimalField(default=0, max_digits=9, decimal_places=2)
-    afterburner_thrust_per_space = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    afterburner_fuel = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    afterburner_heat = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    afterburner_energy = models.DecimalField(default=0, max_digits=8, decimal_places=2)
+    afterburner_thrust = sparse(QuantizedFloatField(default=0, max_digits=9, decimal_places=2))
+    afterburner_thrust_per_space = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    afterburner_fuel = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    afterburner_heat = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    afterburner_energy = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
     
-    illegal = models.IntegerField(default=0)
+    illegal = sparse(models.IntegerField(default=0))
 
-    inaccuracy = models.DecimalField(default=0, max_digits=5, decimal_places=2)
+    inaccuracy = sparse(QuantizedFloatField(default=0, max_digits=5, decimal_places=2))
     
-    velocity = models.DecimalField(default=0, max_digits=7, decimal_places=3)
-    lifetime = models.IntegerField(default=0)    
-    range_override = models.IntegerField(default=0)   
-    velocity_override = models.DecimalField(default=0, max_digits=7, decimal_places=3)
-    reload = models.DecimalField(default=0, max_digits=8, decimal_places=2)
+    velocity = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=3))
+    lifetime = sparse(models.IntegerField(default=0))
+    range_override = sparse(models.IntegerField(default=0))
+    velocity_override = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=3))
+    reload = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
     
-    firing_energy = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    firing_heat = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    firing_fuel = models.DecimalField(default=0, max_digits=5, decimal_places=2)
-    firing_force = models.IntegerField(default=0)
+    firing_energy = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    firing_heat = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    firing_fuel = sparse(QuantizedFloatField(default=0, max_digits=5, decimal_places=2))
+    firing_force = sparse(models.IntegerField(default=0))
     
-    shield_damage = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    hull_damage = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    average_damage = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    heat_damage = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    ion_damage = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    slowing_damage = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    disruption_damage = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    hit_force = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    piercing = models.DecimalField(default=0, max_digits=4, decimal_places=2)
+    shield_damage = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    hull_damage = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    average_damage = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    heat_damage = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    ion_damage = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    slowing_damage = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    disruption_damage = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    hit_force = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    piercing = sparse(QuantizedFloatField(default=0, max_digits=4, decimal_places=2))
 
     # Aggregate values
-    range = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    shots_per_second = models.DecimalField(default=0, max_digits=5, decimal_places=2)
+    range = QuantizedFloatField(default=0, max_digits=7, decimal_places=2)
+    shots_per_second = sparse(QuantizedFloatField(default=0, max_digits=5, decimal_places=2))
     # DPS values
-    shield_dps = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    hull_dps = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    average_dps = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    heat_dps = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    ion_dps = models.DecimalField(default=0, max_digits=9, decimal_places=2)
-    slowing_dps = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    disruption_dps = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    hit_force_per_second = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    anti_missile_dps = models.DecimalField(default=0, max_digits=7, decimal_places=2)
+    shield_dps = QuantizedFloatField(default=0, max_digits=8, decimal_places=2)
+    hull_dps = QuantizedFloatField(default=0, max_digits=8, decimal_places=2)
+    average_dps = QuantizedFloatField(default=0, max_digits=8, decimal_places=2)
+    heat_dps = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    ion_dps = sparse(QuantizedFloatField(default=0, max_digits=9, decimal_places=2))
+    slowing_dps = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    disruption_dps = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    hit_force_per_second = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    anti_missile_dps = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
     # Resource use per second
-    energy_per_second = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    heat_per_second = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    fuel_per_second = models.DecimalField(default=0, max_digits=8, decimal_places=2)
+    energy_per_second = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    heat_per_second = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    fuel_per_second = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
     # DPS per outfit space
-    shield_dps_per_space = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    hull_dps_per_space = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    average_dps_per_space = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    heat_dps_per_space = models.DecimalField(default=0, max_digits=7, decimal_places=2)
-    ion_dps_per_space = models.DecimalField(default=0, max_digits=8, decimal_places=2)
-    slowing_dps_per_space = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    disruption_dps_per_space = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    anti_missile_dps_per_space = models.DecimalField(default=0, max_digits=6, decimal_places=2)
-    
-    ammo_capacity = models.IntegerField(default=0)
-    missile_strength = models.IntegerField(default=0)
+    shield_dps_per_space = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    hull_dps_per_space = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    average_dps_per_space = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    heat_dps_per_space = sparse(QuantizedFloatField(default=0, max_digits=7, decimal_places=2))
+    ion_dps_per_space = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=2))
+    slowing_dps_per_space = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    disruption_dps_per_space = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    anti_missile_dps_per_space = sparse(QuantizedFloatField(default=0, max_digits=6, decimal_places=2))
+    
+    ammo_capacity = sparse(models.IntegerField(default=0))
+    missile_strength = sparse(models.IntegerField(default=0))
     ammo = models.ForeignKey("self",
                              null=True,
                              blank=True,
                              default=None,
                              on_delete=models.CASCADE,
                              related_name='launcher')
-    acceleration = models.DecimalField(default=0, max_digits=8, decimal_places=5)
-    drag = models.DecimalField(default=0, max_digits=4, decimal_places=3)
-    homing = models.IntegerField(default=0)
-    tracking = models.DecimalField(default=0, max_digits=2, decimal_places=1)
+    acceleration = sparse(QuantizedFloatField(default=0, max_digits=8, decimal_places=5))
+    drag = sparse(QuantizedFloatField(default=0, max_digits=4, decimal_places=3))
+    homing = sparse(models.IntegerField(default=0))
+    tracking = sparse(QuantizedFloatField(default=0, max_digits=2, decimal_places=1))
     
-    infrared_tracking = models.DecimalField(default=0, max_digits=3, decimal_places=2)
-    radar_tracking = models.DecimalField(default=0, max_digits=3, decimal_places=2)
-    optical_tracking = models.DecimalField(default=0, max_digits=3, decimal_places=2)
+    infrared_tracking = sparse(QuantizedFloatField(default=0, max_digits=3, decimal_places=2))
+    radar_tracking = sparse(QuantizedFloatField(default=0, max_digits=3, decimal_places=2))
+    optical_tracking = sparse(QuantizedFloatField(default=0, max_digits=3, decimal_places=2))
 
-    trigger_radius = models.IntegerField(default=0)
-    blast_radius = models.IntegerField(default=0)
+    trigger_radius = sparse(models.IntegerField(default=0))
+    blast_radius = sparse(models.IntegerField(default=0))
 
-    burst_count = models.IntegerField(default=0)
-    burst_reload = models.IntegerField(default=0)
+    burst_count = sparse(models.IntegerField(default=0))
+    burst_reload = sparse(models.IntegerField(default=0))
     
-    cluster = models.BooleanField(default=False)
+    cluster = sparse(models.BooleanField(default=False))
     
     submunition_type = models.ForeignKey("self",
                                          null=True,
@@ -312,34 +595,122 @@ class Outfit(models.Model):
                                          default=None,
                                          on_delete=models.CASCADE,
                                          related_name='main_ammo')
-    submunition_count = models.IntegerField(default=0)
+    submunition_count = sparse(models.IntegerField(default=0))
     
-    stream = models.BooleanField(default=False)
+    stream = sparse(models.BooleanField(default=False))
 
     # korath mine submunition
     # arfecta gridfire turret
         # phasing
 
-    anti_missile = models.IntegerField(default=0)
+    anti_missile = sparse(models.IntegerField(default=0))
+
+    turret_turn = sparse(QuantizedFloatField(default=0, max_digits=5, decimal_places=2))
 
-    turret_turn = models.DecimalField(default=0, max_digits=5, decimal_places=2)
+    ion_resistance = sparse(QuantizedFloatField(default=0, max_digits=4, decimal_places=3))
+    slowing_resistance = sparse(QuantizedFloatField(default=0, max_digits=4, decimal_places=3))
 
-    ion_resistance = models.DecimalField(default=0, max_digits=4, decimal_places=3)
-    slowing_resistance = models.DecimalField(default=0, max_digits=4, decimal_places=3)
+    class Meta:
+        indexes = [models.Index(fields=['release', field, 'id'], name=f'outfit_{field}_idx') for field in OUTFIT_SORT_INDEXES]
+        constraints = [models.UniqueConstraint(fields=['release', 'name'], name='outfit_natural_key')]
     
     def __str__(self):
         return self.name
     
 
 class Build(models.Model):
-    name = models.CharField(max_length=40)
+    # Hull name (40 characters) and ' Default Build' or 'Build variant ' and a ship name
+    name = models.CharField(max_length=60)
     hull = models.ForeignKey(Hull, on_delete=models.CASCADE, related_name='builds')
     outfits = models.ManyToManyField(Outfit, through='Outfit_details')
 
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['hull', 'name'], name='build_natural_key')]
+
     def __str__(self):
         return self.name
 
+class Release(models.Model):
+    """
+    Catalog of the releases in the database, maintained by ingest
+    (see data.parse_raw()). The status says whether a release is served,
+    the ingest status whether it is being (or failed to be) ingested
+    again: a ready release stays ready, with the rows and content hash of
+    its last ingest, until another ingest of it completes.
+    """
+    INGESTING = 'ingesting'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(INGESTING, 'Ingesting'), (READY, 'Ready'), (FAILED, 'Failed')]
+
+    name = models.CharField(max_length=20, unique=True)
+    # Version ordering, see release_sort_key()
+    sort_key = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=INGESTING)
+    # Ingesting or failed while ready, blank once the last ingest completed
+    ingest_status = models.CharField(max_length=10, choices=STATUS_CHOICES, blank=True)
+    ingested_at = models.DateTimeField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)
+    hull_count = models.IntegerField(default=0)
+    outfit_count = models.IntegerField(default=0)
+    build_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-sort_key']
+
+    def __str__(self):
+        return self.name
+
+
+def release_sort_key(name: str):
+    """
+    Sort key of a release name, ordering versions numerically
+    ('0.9.9' < '0.9.16') and 'continuous' after all versions
+    """
+    if name == 'continuous':
+        return 2 ** 62
+    parts = re.findall(r'\d+', name)[:3]
+    key = 0
+    for part in parts + ['0'] * (3 - len(parts)):
+        key = key * 100000 + int(part)
+    return key
+
+
+def is_release_name(release: str):
+    """
+    Checks that a (user provided) release name is safe to use in a file path
+    """
+    return bool(re.fullmatch(r'\w[\w.-]*', release))
+
+
 class Outfit_details(models.Model):
     outfit = models.ForeignKey(Outfit, on_delete=models.CASCADE)
     build = models.ForeignKey(Build, on_delete=models.CASCADE, related_name='outfit_details')
-    amount = models.IntegerField(default=1)
\ No newline at end of file
+    amount = models.IntegerField(default=1)
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['build', 'outfit'], name='outfit_details_natural_key')]
+
+
+class BuildStats(models.Model):
+    """
+    Aggregate stats of a build, as shown by the ship builder (see
+    frontend/src/components/ShipBuilder/BuildAggregates.js). Computed at
+    ingest for every build of a release (see buildstats.write_build_stats()),
+    so hulls can be filtered and sorted by the stats of their default build.
+    """
+    build = models.OneToOneField(Build, on_delete=models.CASCADE, related_name='stats')
+    max_speed = models.FloatField(default=0)
+    acceleration = models.FloatField(default=0)
+    turn = models.FloatField(default=0)
+    # Heat and energy balances per second, when idle and in action (moving and firing)
+    idle_heat = models.FloatField(default=0)
+    action_heat = models.FloatField(default=0)
+    idle_energy = models.FloatField(default=0)
+    action_energy = models.FloatField(default=0)
+    average_dps = models.FloatField(default=0)
+    free_outfit_space = models.FloatField(default=0)
+    free_engine_capacity = models.FloatField(default=0)
+    free_weapon_capacity = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"Stats of {self.build}"
@@ -0,0 +1,110 @@
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+  """
+  Keyset (cursor) pagination, ordered by id or by one of the attributes
+  with a (release, attribute, id) index (see HULL_SORT_INDEXES and
+  OUTFIT_SORT_INDEXES in models), with ties broken by id. The attributes the
+  lists are commonly sorted by are kept as indexed columns for this; other
+  columns and sparse stats (see models.sparse()) cannot be ordered by.
+
+  Each cursor encodes the (value, id) pair of the last row of a page, and
+  the next page is selected with a range condition on that pair instead of
+  an OFFSET, so deep pages cost the same as the first one. Paired with the
+  (release, attribute, id) indexes on Hull and Outfit, a page is a
+  short index range scan.
+
+  Query parameters:
+      ordering: Attribute to order by, prefixed with '-' for descending order (default: 'id')
+      page_size: Number of results per page (default: 12, max: 500)
+      cursor: Opaque cursor taken from the 'next' link of the previous page
+  """
+  ordering_query_param = 'ordering'
+  page_size_query_param = 'page_size'
+  cursor_query_param = 'cursor'
+  page_size = 12
+  max_page_size = 500
+
+  def __init__(self, model, annotations=()):
+    # Numeric annotations of the queryset can be ordered by as well
+    self.orderable_fields = {'id', *annotations} | {
+      index.fields[1] for index in model._meta.indexes
+      if len(index.fields) == 3 and index.fields[0] == 'release' and index.fields[2] == 'id'
+    }
+
+  def is_requested(self, request):
+    """
+    Pagination is opt-in, without any of its parameters the full list is returned
+    """
+    params = request.query_params
+    return any(param in params for param in [self.ordering_query_param, self.page_size_query_param, self.cursor_query_param])
+
+  def paginate_queryset(self, queryset, request, view=None):
+    self.request = request
+    self.ordering = self.get_ordering(request)
+    self.page_size = self.get_page_size(request)
+
+    field = self.ordering.lstrip('-')
+    descending = self.ordering.startswith('-')
+    order = [f'-{field}', '-id'] if descending else [field, 'id']
+    queryset = queryset.order_by(*order)
+
+    cursor = self.decode_cursor(request)
+    if cursor is not None:
+      value, last_id = cursor
+      if descending:
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': last_id}))
+      else:
+        queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': last_id}))
+
+    # Fetch one more row than needed to find out whether there is a next page
+    results = list(queryset[:self.page_size + 1])
+    self.has_next = len(results) > self.page_size
+    self.page = results[:self.page_size]
+    return self.page
+
+  def get_paginated_response(self, data):
+    return Response({
+      'next': self.get_next_link(),
+      'results': data,
+    })
+
+  def get_next_link(self):
+    if not self.has_next:
+      return None
+    last = self.page[-1]
+    value = getattr(last, self.ordering.lstrip('-'))
+    cursor = base64.urlsafe_b64encode(json.dumps([str(value), last.id]).encode()).decode()
+    url = self.request.build_absolute_uri()
+    return replace_query_param(url, self.cursor_query_param, cursor)
+
+  def get_ordering(self, request):
+    ordering = request.query_params.get(self.ordering_query_param, 'id')
+    if ordering.lstrip('-') not in self.orderable_fields:
+      raise ValidationError({self.ordering_query_param: f"Cannot order by '{ordering}'."})
+    return ordering
+
+  def get_page_size(self, request):
+    try:
+      page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+    except ValueError:
+      raise ValidationError({self.page_size_query_param: "Must be an integer."})
+    return max(1, min(page_size, self.max_page_size))
+
+  def decode_cursor(self, request):
+    encoded = request.query_params.get(self.cursor_query_param)
+    if not encoded:
+      return None
+    try:
+      value, last_id = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+      return value, int(last_id)
+    except (TypeError, ValueError, UnicodeDecodeError):
+      raise NotFound("Invalid cursor")
@@ -0,0 +1,121 @@
+import decimal
+import msgpack
+import orjson
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Fallback for types orjson does not handle natively (Decimal, lazy strings, ...)
+_json_default = JSONEncoder().default
+
+
+def encode_ndjson(rows):
+  """
+  Encodes an iterable of serialized rows as newline-delimited JSON
+
+  Args:
+      rows (iterable): Serialized rows (dicts)
+
+  Returns:
+      bytes: One JSON object per line, each line terminated by '\\n'
+  """
+  return b''.join(
+    orjson.dumps(row, default=_json_default, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    for row in rows
+  )
+
+
+class NDJSONRenderer(BaseRenderer):
+  """
+  Renders data as newline-delimited JSON (one object per line).
+
+  List views do not go through this renderer for the actual export, they
+  stream the rows themselves (see views.stream_ndjson()). It is registered
+  with the viewsets so that content negotiation accepts
+  'Accept: application/x-ndjson' and '?format=ndjson', and it renders
+  single objects and error responses.
+  """
+  media_type = 'application/x-ndjson'
+  format = 'ndjson'
+  charset = None
+
+  def render(self, data, accepted_media_type=None, renderer_context=None):
+    if data is None:
+      return b''
+    rows = data if isinstance(data, list) else [data]
+    return encode_ndjson(rows)
+
+
+class ORJSONRenderer(JSONRenderer):
+  """
+  Drop-in replacement for DRF's JSONRenderer that encodes with orjson.
+
+  Enabled through REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']. Output is
+  compact, unless an indent is requested (e.g. by the browsable API), in
+  which case it is indented by two spaces.
+  """
+  def render(self, data, accepted_media_type=None, renderer_context=None):
+    if data is None:
+      return b''
+
+    option = orjson.OPT_NON_STR_KEYS
+    if self.get_indent(accepted_media_type, renderer_context or {}):
+      option |= orjson.OPT_INDENT_2
+
+    ret = orjson.dumps(data, default=_json_default, option=option)
+
+    # Escape \u2028 and \u2029 like DRF does, to keep the output a strict
+    # javascript subset
+    return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ColumnarJSONRenderer(ORJSONRenderer):
+  """
+  Renders lists column-oriented: every field name is sent once, together
+  with an array holding the values of that field for all rows, e.g.
+
+  {"count": 2, "columns": {"id": [1, 2], "name": ["Shuttle", "Scout"]}}
+
+  Decimal fields are sent as numbers. For paginated responses, only the
+  results are converted. Single objects (retrieve, errors) are rendered
+  as plain JSON.
+  """
+  media_type = 'application/vnd.es-outfitter.columns+json'
+  format = 'columns'
+  native_numbers = True
+
+  def render(self, data, accepted_media_type=None, renderer_context=None):
+    if isinstance(data, list):
+      data = self.to_columns(data)
+    elif isinstance(data, dict) and isinstance(data.get('results'), list):
+      data = {**data, 'results': self.to_columns(data['results'])}
+    return super().render(data, accepted_media_type, renderer_context)
+
+  def to_columns(self, rows):
+    fields = list(rows[0].keys()) if rows else []
+    return {
+      'count': len(rows),
+      'columns': {field: [row[field] for row in rows] for field in fields},
+    }
+
+
+def _msgpack_default(obj):
+  if isinstance(obj, decimal.Decimal):
+    return float(obj)
+  return str(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+  """
+  Renders data as MessagePack, with decimal fields sent as native numbers
+  """
+  media_type = 'application/msgpack'
+  format = 'msgpack'
+  charset = None
+  render_style = 'binary'
+  native_numbers = True
+
+  def render(self, data, accepted_media_type=None, renderer_context=None):
+    if data is None:
+      return b''
+    return msgpack.packb(data, default=_msgpack_default)
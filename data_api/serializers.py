@@ -2,7 +2,7 @@ import copy
 import re
 from rest_framework import serializers
 
-from .models import Hull, Outfit, Build, Outfit_details
+from .models import Hull, Outfit, Build, Outfit_details, QuantizedFloatField
 
 
 class NonEmptySerializer(serializers.ModelSerializer):
@@ -16,12 +16,65 @@ class NonEmptySerializer(serializers.ModelSerializer):
                 non_null_ret.pop(key)
         return non_null_ret
 
-class HullSerializer(serializers.ModelSerializer):
+class QuantizedFloatSerializerField(serializers.FloatField):
+  """
+  Serializes a QuantizedFloatField as a string with a fixed number of
+  decimal places, the way DRF serializes a DecimalField
+  """
+  def __init__(self, max_digits, decimal_places, **kwargs):
+    self.max_digits = max_digits
+    self.decimal_places = decimal_places
+    super().__init__(**kwargs)
+
+  def to_representation(self, value):
+    return f'{value:.{self.decimal_places}f}'
+
+def declaration_order(model, name):
+  """
+  Sort key putting the fields of a model serializer in the order the model
+  declares them (columns and sparse stats alike), relations last
+  """
+  if name in model.sparse_fields:
+    return False, model.sparse_fields[name].creation_counter
+  field = model._meta.get_field(name)
+  return field.is_relation, field.creation_counter
+
+class NativeNumberSerializer(serializers.ModelSerializer):
+  """
+  Serializes decimal stats as floats instead of strings if the
+  serializer context contains 'native_numbers'.
+
+  Sparse attributes (see models.sparse()) are expanded into fields of their
+  own, in place of the attribute set holding them.
+  """
+  def build_standard_field(self, field_name, model_field):
+    field_class, field_kwargs = super().build_standard_field(field_name, model_field)
+    if isinstance(model_field, QuantizedFloatField):
+      # The field kwargs already hold max_digits and decimal_places
+      field_class = QuantizedFloatSerializerField
+    return field_class, field_kwargs
+
+  def get_fields(self):
+    fields = super().get_fields()
+    model = self.Meta.model
+    if 'attribute_set' in fields and hasattr(model, 'sparse_fields'):
+      del fields['attribute_set']
+      for name, model_field in model.sparse_fields.items():
+        field_class, field_kwargs = self.build_standard_field(name, model_field)
+        fields[name] = field_class(**field_kwargs)
+      fields = dict(sorted(fields.items(), key=lambda item: declaration_order(model, item[0])))
+    if self.context.get('native_numbers'):
+      for name, field in fields.items():
+        if isinstance(field, (serializers.DecimalField, QuantizedFloatSerializerField)):
+          fields[name] = serializers.FloatField(read_only=True)
+    return fields
+
+class HullSerializer(NativeNumberSerializer):
   class Meta:
     model = Hull
     fields = '__all__'
 
-class OutfitSerializer(serializers.ModelSerializer):
+class OutfitSerializer(NativeNumberSerializer):
   class Meta:
     model = Outfit
     fields = '__all__'
@@ -0,0 +1,238 @@
+"""
+Per-release SQLite shards (settings.RELEASE_SHARDS).
+
+With sharding enabled, the hulls, outfits and builds of every release are
+stored in a database file of their own in settings.RELEASE_SHARD_DIR,
+while the default database keeps the release catalog and everything else.
+Queries are routed to a shard by the release they are made for (see
+use_release()): the API sets it from the 'release' parameter of a request
+(see ReleaseShardMiddleware), ingest and the per-release artifacts
+(snapshots, datasets, bundles, matrices) from the release they work on.
+
+A release is ingested into a new shard file (see ingest_shard()), which
+then replaces the published one. Published shards are never written to,
+so they are opened read-only and immutable: SQLite skips all locking and
+change detection for them, and refreshing a release (e.g. 'continuous')
+never blocks readers of any release. Connections to a shard are set up
+lazily, on the first query for its release.
+
+As the API finds the shard by the 'release' parameter, in sharded mode
+the entity endpoints need it, including the detail views (e.g.
+'/api/hulls/5?release=0.9.14'), and answer requests without one with a
+400 (see views.ReleaseViewSet).
+"""
+import contextlib
+import contextvars
+import logging
+import os
+import re
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .models import AttributeSet, Build, BuildStats, Hull, Outfit, Outfit_details, is_release_name
+from .sqlite import optimize
+
+logger = logging.getLogger(__name__)
+
+# Models (of this app) stored in the release shards
+SHARDED_MODELS = {'attributeset', 'hull', 'outfit', 'build', 'outfit_details', 'buildstats'}
+
+# (release, database alias) the current queries are made for
+_current = contextvars.ContextVar('release_shard', default=None)
+_lock = threading.Lock()
+
+
+def shard_alias(release: str):
+    return 'release_' + re.sub(r'\W', '_', release)
+
+
+def shard_path(release: str):
+    return settings.RELEASE_SHARD_DIR / f"{release}.sqlite3"
+
+
+def attach(alias: str, name: str, profile: str):
+    """
+    Adds a database connection (SQLite, named by a path or URI) to the
+    connection settings, unless it is there already
+
+    Args:
+        alias (str): Database alias
+        name (str): Path or URI of the database file
+        profile (str): Tuning of its connections, see sqlite.PROFILES
+    """
+    if alias in connections.settings:
+        return
+    with _lock:
+        if alias in connections.settings:
+            return
+        config = {
+            **connections.settings[DEFAULT_DB_ALIAS],
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': name,
+            'OPTIONS': {},
+            'SQLITE_PROFILE': profile,
+        }
+        # Replaced as a whole, other threads may be iterating over the old settings
+        connections.settings = {**connections.settings, alias: config}
+
+
+def detach(alias: str):
+    """
+    Closes the connection of the current thread to a database and removes
+    it from the connection settings (e.g. the new shard of an ingest)
+    """
+    with _lock:
+        if alias not in connections.settings:
+            return
+        close_connection(alias)
+        if alias in [connection.alias for connection in connections.all(initialized_only=True)]:
+            # Dropped as well, a connection object keeps the settings it was created with
+            del connections[alias]
+        connections.settings = {key: value for key, value in connections.settings.items() if key != alias}
+
+
+def close_connection(alias: str):
+    """
+    Closes the connection of the current thread to a database, if it is open
+    """
+    for connection in connections.all(initialized_only=True):
+        if connection.alias == alias:
+            connection.close()
+
+
+def attach_shard(release: str):
+    """
+    Returns the alias of the published shard of a release, attaching it
+    read-only and immutable on first use
+    """
+    alias = shard_alias(release)
+    attach(alias, shard_path(release).as_uri() + '?mode=ro&immutable=1', 'read_only')
+    return alias
+
+
+@contextlib.contextmanager
+def use_release(release: str):
+    """
+    Routes the queries made within the block to the shard of a release
+    (no-op unless settings.RELEASE_SHARDS). Within ingest_shard(), queries
+    for the release being ingested keep going to the new shard.
+    """
+    current = _current.get()
+    if not settings.RELEASE_SHARDS or not is_release_name(release or '') or (current and current[0] == release) \
+            or not shard_path(release).exists():
+        yield
+        return
+    token = _current.set((release, attach_shard(release)))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def create_tables(alias: str):
+    """
+    Creates the tables of the sharded models in a new shard. Shards are
+    rebuilt on every ingest, so they are created from the current models
+    instead of being migrated.
+    """
+    with connections[alias].schema_editor() as schema_editor:
+        for model in [AttributeSet, Hull, Outfit, Build, Outfit_details, BuildStats]:
+            schema_editor.create_model(model)
+
+
+@contextlib.contextmanager
+def staging_shard(release: str):
+    """
+    Routes the queries made within the block to a new, empty shard of a
+    release, next to its published shard. The new shard is detached when
+    the block exits and deleted unless it was moved (i.e. published).
+
+    Yields:
+        tuple: (alias, path) of the new shard
+    """
+    path = shard_path(release)
+    staging = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging.unlink(missing_ok=True)
+    alias = shard_alias(release) + '_ingest'
+    attach(alias, str(staging), 'ingest')
+    token = _current.set((release, alias))
+    try:
+        create_tables(alias)
+        yield alias, staging
+    finally:
+        _current.reset(token)
+        detach(alias)
+        staging.unlink(missing_ok=True)
+
+
+@contextlib.contextmanager
+def ingest_shard(release: str):
+    """
+    Routes the queries made within the block to a new, empty shard of a
+    release, which is optimized and replaces the published shard of the
+    release once the block completes without errors (no-op unless
+    settings.RELEASE_SHARDS)
+    """
+    if not settings.RELEASE_SHARDS:
+        yield
+        return
+
+    with staging_shard(release) as (alias, staging):
+        yield
+        optimize(alias, vacuum=True)
+        close_connection(alias)
+        # Other connections to the old shard keep reading the old file until they are closed
+        close_connection(shard_alias(release))
+        os.replace(staging, shard_path(release))
+    logger.info(f"Published shard of release '{release}'")
+
+
+class ReleaseShardRouter:
+    """
+    Routes the sharded models to the shard of the current release (see
+    use_release() and staging_shard()) and keeps their shards free of any
+    other table
+    """
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != 'data_api' or model._meta.model_name not in SHARDED_MODELS:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        current = _current.get()
+        return current[1] if current else None
+
+    db_for_write = db_for_read
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if not db.startswith('release_'):
+            return None
+        return app_label == 'data_api' and model_name in SHARDED_MODELS
+
+
+class ReleaseShardMiddleware:
+    """
+    Routes the queries of a request to the shard of the release named by
+    its 'release' parameter
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with use_release(request.GET.get('release')):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with use_release(request.GET.get('release')):
+            return await self.get_response(request)
@@ -0,0 +1,240 @@
+"""
+Content hashes and snapshots of a release, used for delta syncs.
+
+At ingest, every hull, outfit and build of a release is hashed by its
+content (ids of the entity itself and of related entities are replaced
+by names, as they change whenever a release is re-ingested). The map of
+entity hashes is saved as a snapshot in settings.RELEASE_DATA_DIR, named
+after the content hash of the whole release, which the release catalog
+records once the ingest is complete. A client holding an older
+content hash can then be sent only the entities that changed since.
+
+The snapshot also records the id of every entity, as the entities a client
+keeps refer to each other by id. Ids are kept by the merge of a staged
+ingest, but reassigned when a release shard is rebuilt: a client whose
+snapshot has other ids for the same entities is sent all of them (see
+release_delta()).
+"""
+import hashlib
+import logging
+import orjson
+import re
+
+from django.conf import settings
+
+from .catalog import ready_releases
+from .models import Hull, Outfit, Build, is_release_name
+from .serializers import HullSerializer, OutfitSerializer, BuildSerializer
+from .shards import use_release
+
+logger = logging.getLogger(__name__)
+
+# Number of snapshots kept per release (older ones can no longer be synced from)
+SNAPSHOT_HISTORY = 20
+
+ENTITY_TYPES = ['hulls', 'outfits', 'builds']
+
+
+def snapshot_dir(release: str):
+    return settings.RELEASE_DATA_DIR / release / 'snapshots'
+
+
+def hash_row(row: dict):
+    return hashlib.sha1(orjson.dumps(row, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def build_key(hull_name: str, build_name: str):
+    """
+    Builds are identified by the name of their hull and their own name
+    """
+    return f"{hull_name}/{build_name}"
+
+
+def entity_hashes(release: str):
+    """
+    Hashes the content of every hull, outfit and build of a release
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+
+    Returns:
+        dict: {"hulls": {name: hash}, "outfits": {name: hash}, "builds": {build key: hash}}
+    """
+    hulls = Hull.objects.filter(release=release)
+    outfits = Outfit.objects.filter(release=release)
+    builds = Build.objects.filter(hull__release=release).prefetch_related('outfit_details')
+
+    hull_names = dict(hulls.values_list('id', 'name'))
+    outfit_names = dict(outfits.values_list('id', 'name'))
+    build_names = dict(builds.values_list('id', 'name'))
+
+    hashes = {entity_type: {} for entity_type in ENTITY_TYPES}
+
+    for row in HullSerializer(hulls, many=True).data:
+        row.pop('id')
+        row['base_model'] = hull_names.get(row['base_model'])
+        row['default_build'] = build_names.get(row['default_build'])
+        hashes['hulls'][row['name']] = hash_row(row)
+
+    for row in OutfitSerializer(outfits, many=True).data:
+        row.pop('id')
+        row['ammo'] = outfit_names.get(row['ammo'])
+        row['submunition_type'] = outfit_names.get(row['submunition_type'])
+        hashes['outfits'][row['name']] = hash_row(row)
+
+    for row in BuildSerializer(builds, many=True).data:
+        row.pop('id')
+        row['hull'] = hull_names.get(row['hull'])
+        row['outfits'] = sorted([outfit_names.get(item['outfit']), item['amount']] for item in row['outfits'])
+        hashes['builds'][build_key(row['hull'], row['name'])] = hash_row(row)
+
+    return hashes
+
+
+def entity_ids(release: str):
+    """
+    Returns the ids of the hulls, outfits and builds of a release
+
+    Returns:
+        dict: {"hulls": {name: id}, "outfits": {name: id}, "builds": {build key: id}}
+    """
+    return {
+        'hulls': dict(Hull.objects.filter(release=release).values_list('name', 'id')),
+        'outfits': dict(Outfit.objects.filter(release=release).values_list('name', 'id')),
+        'builds': {
+            build_key(hull_name, name): pk
+            for pk, hull_name, name in Build.objects.filter(hull__release=release).values_list('id', 'hull__name', 'name')
+        },
+    }
+
+
+def content_hash(hashes: dict):
+    """
+    Combines the entity hashes (and ids) of a release into a single content hash
+    """
+    return hashlib.sha256(orjson.dumps(hashes, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def record_snapshot(release: str):
+    """
+    Hashes the current content of a release and saves it as the release's
+    latest snapshot. Run at the end of ingest.
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+
+    Returns:
+        str: Content hash of the release
+    """
+    with use_release(release):
+        hashes = {**entity_hashes(release), 'ids': entity_ids(release)}
+    release_hash = content_hash(hashes)
+
+    directory = snapshot_dir(release)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{release_hash}.json").write_bytes(orjson.dumps(hashes))
+    logger.info(f"Recorded snapshot {release_hash} of release '{release}'")
+
+    # Prune old snapshots
+    snapshots = sorted(directory.glob('*.json'), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in snapshots[SNAPSHOT_HISTORY:]:
+        path.unlink()
+
+    return release_hash
+
+
+def current_hash(release: str):
+    """
+    Returns the content hash a ready release is served with, or None.
+
+    The hash is read from the cached release catalog (see
+    catalog.ready_releases()), so that it costs no query or file read per
+    request. It changes once a re-ingest of the release is complete.
+    """
+    return next((entry.content_hash or None for entry in ready_releases() if entry.name == release), None)
+
+
+def load_snapshot(release: str, release_hash: str):
+    """
+    Returns the entity hashes saved for a content hash of a release, or None
+    """
+    if not re.fullmatch('[0-9a-f]{64}', release_hash):
+        return None
+    path = snapshot_dir(release) / f"{release_hash}.json"
+    return orjson.loads(path.read_bytes()) if path.exists() else None
+
+
+def ids_stable(old: dict, new: dict):
+    """
+    Whether the entities of two snapshots of a release that are in both
+    have the same ids (False for snapshots recorded without ids)
+    """
+    if 'ids' not in old or 'ids' not in new:
+        return False
+    for entity_type in ENTITY_TYPES:
+        old_ids = old['ids'].get(entity_type, {})
+        new_ids = new['ids'].get(entity_type, {})
+        if any(old_ids[key] != pk for key, pk in new_ids.items() if key in old_ids):
+            return False
+    return True
+
+
+def diff_snapshots(old: dict, new: dict):
+    """
+    Compares two snapshots of a release
+
+    Returns:
+        dict: For each entity type, the keys that were added or changed
+              ('upserted') and the keys that were removed ('removed')
+    """
+    delta = {}
+    for entity_type in ENTITY_TYPES:
+        old_hashes = old.get(entity_type, {})
+        new_hashes = new.get(entity_type, {})
+        delta[entity_type] = {
+            'upserted': [key for key, value in new_hashes.items() if old_hashes.get(key) != value],
+            'removed': [key for key in old_hashes if key not in new_hashes],
+        }
+    return delta
+
+
+def release_delta(release: str, since: str):
+    """
+    Collects the hulls, outfits and builds of a release that were added,
+    changed or removed since the snapshot with the content hash 'since'
+
+    Args:
+        release (str): Release name (e.g. '0.9.14' or 'continuous')
+        since (str): Content hash of the release held by the client
+
+    Returns:
+        dict: Serialized upserted entities and removed keys per entity type,
+              and whether all entities are sent ('full', when ids were
+              reassigned since), or None if there is no snapshot for 'since'
+    """
+    old = load_snapshot(release, since)
+    new = load_snapshot(release, current_hash(release))
+    if old is None or new is None:
+        return None
+    changes = diff_snapshots(old, new)
+    # The unchanged entities the client keeps would refer to ids that no longer exist
+    full = not ids_stable(old, new)
+    if full:
+        for entity_type in ENTITY_TYPES:
+            changes[entity_type]['upserted'] = list(new[entity_type])
+
+    hulls = Hull.objects.filter(release=release, name__in=changes['hulls']['upserted'])
+    outfits = Outfit.objects.filter(release=release, name__in=changes['outfits']['upserted'])
+    upserted_builds = set(changes['builds']['upserted'])
+    build_ids = [
+        pk for pk, hull_name, name in Build.objects.filter(hull__release=release).values_list('id', 'hull__name', 'name')
+        if build_key(hull_name, name) in upserted_builds
+    ]
+    builds = Build.objects.filter(pk__in=build_ids).prefetch_related('outfit_details')
+
+    return {
+        'full': full,
+        'hulls': {'upserted': HullSerializer(hulls, many=True).data, 'removed': changes['hulls']['removed']},
+        'outfits': {'upserted': OutfitSerializer(outfits, many=True).data, 'removed': changes['outfits']['removed']},
+        'builds': {'upserted': BuildSerializer(builds, many=True).data, 'removed': changes['builds']['removed']},
+    }
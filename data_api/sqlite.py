@@ -0,0 +1,91 @@
+"""
+Tuning of SQLite connections, by what a database is used for.
+
+Every new SQLite connection is set up with the PRAGMAs of a profile (see
+configure_connection()), named by the 'SQLITE_PROFILE' key of its database
+settings:
+
+- 'serve' (default): the default database. WAL journal, so that readers
+  never block the writer of an ingest (and the other way around), with a
+  large page cache and memory-mapped reads.
+- 'read_only': the published release shards, which are never written to
+  (see shards.attach_shard()). Like 'serve', and query only.
+- 'ingest': the scratch shards releases are parsed into (see
+  shards.staging_shard()). Only the ingest uses them, and they are
+  rebuilt from scratch if it fails, so they skip syncing to disk, keep
+  their rollback journal in memory and hold an exclusive lock.
+
+The tables an ingest wrote to are analyzed when it finishes (see
+optimize()), so that the query planner has statistics for them. Release
+shards are also vacuumed before they are published, so that their files
+stay compact. The default database is not, as VACUUM rewrites the whole
+file and locks out the requests served from it meanwhile.
+"""
+import logging
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Page cache per connection (negative sizes are in KiB)
+CACHE_SIZE = -64 * 1024
+INGEST_CACHE_SIZE = -256 * 1024
+MMAP_SIZE = 256 * 1024 * 1024
+
+PROFILES = {
+    'serve': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': CACHE_SIZE,
+        'mmap_size': MMAP_SIZE,
+        'temp_store': 'MEMORY',
+    },
+    'read_only': {
+        'cache_size': CACHE_SIZE,
+        'mmap_size': MMAP_SIZE,
+        'temp_store': 'MEMORY',
+        'query_only': 'ON',
+    },
+    'ingest': {
+        'journal_mode': 'MEMORY',
+        'synchronous': 'OFF',
+        'locking_mode': 'EXCLUSIVE',
+        'cache_size': INGEST_CACHE_SIZE,
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    Sets the PRAGMAs of the profile of a new SQLite connection (receiver
+    of the connection_created signal)
+    """
+    if connection.vendor != 'sqlite':
+        return
+    profile = PROFILES[connection.settings_dict.get('SQLITE_PROFILE', 'serve')]
+    with connection.cursor() as cursor:
+        for pragma, value in profile.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+def optimize(alias: str, vacuum: bool = False):
+    """
+    Updates the query planner statistics of a SQLite database and, if
+    asked to, rebuilds the database file without free pages (no-op for
+    other databases). Run once an ingest finished writing to the database.
+
+    Args:
+        alias (str): Database alias
+        vacuum (bool): Whether to vacuum the database, only for databases
+                       that no request reads from (e.g. a staging shard)
+    """
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+        # VACUUM cannot run within a transaction (e.g. in tests)
+        if vacuum and not connection.in_atomic_block:
+            cursor.execute("VACUUM")
+    logger.info(f"Optimized database '{alias}'")
@@ -1,17 +1,70 @@
 import decimal
+import gzip
+import json
 import logging
+import msgpack
+import numpy as np
+import os
+import requests
+import runpy
+import tempfile
+import threading
+import time
 
 from django.conf import settings
-from django.test import TestCase
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, OperationalError, close_old_connections, connection, connections, models
+from django.db.backends.utils import format_number
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from es_outfitter.storage import IncrementalManifestStaticFilesStorage
 from pathlib import Path
+from unittest import mock, skipUnless
 
-from .data import get_release, parse_hull_variant, parse_raw, parse_outfits, create_outfit, parse_ships
-from .models import Hull, Outfit, Build, Outfit_details
+from .async_views import as_async_view
+from .buildstats import write_build_stats
+from .bundles import bundle_path, write_bundle
+from .bulkload import merge_release, staged_ingest, upsert
+from .catalog import invalidate, mark_failed, mark_ingesting, mark_ready
+from .data import get_release, has_upstream_changed, parse_hull_variant, publish_release, parse_raw, parse_outfits, create_outfit, parse_ships, record_commit
+from .matrices import get_matrix, write_matrices
+from .middleware import CoalescingMiddleware, LoadSheddingMiddleware
+from .models import HULL_SORT_INDEXES, OUTFIT_SORT_INDEXES, AttributeSet, Hull, Outfit, Build, Outfit_details, Release, prune_attribute_sets
+from .pagination import KeysetPagination
+from .serializers import OutfitSerializer
+from .shards import detach, ingest_shard, shard_alias, staging_shard, use_release
+from .snapshots import record_snapshot
+from .sqlite import optimize
+from .views import HullViewSet
+from .warmup import warm_up, warm_worker
 
 logger = logging.getLogger(__name__)
 
 release = '0.9.14'
 
+
+class TempDirMixin:
+  def temp_dir(self, *setting_names):
+    """
+    Creates a temporary directory, removed after the test, and points the
+    given settings (e.g. 'RELEASE_DATA_DIR') at it for the test
+
+    Returns:
+      Path: Path of the directory
+    """
+    directory = tempfile.TemporaryDirectory()
+    self.addCleanup(directory.cleanup)
+    path = Path(directory.name)
+    if setting_names:
+      settings_override = override_settings(**{name: path for name in setting_names})
+      settings_override.enable()
+      self.addCleanup(settings_override.disable)
+    return path
+
+
 class ParseOutfitsTest(TestCase):
   @classmethod
   def setUpTestData(cls):
@@ -68,19 +121,1008 @@ class ParseOutfitsTest(TestCase):
 
   def test_flamethrower_damage(self):
     flamethrower = Outfit.objects.get(name="Flamethrower")
-    self.assertEqual(flamethrower.shield_damage, decimal.Decimal('0.8'))
-    self.assertEqual(flamethrower.shield_dps, decimal.Decimal('48'))
-    self.assertEqual(flamethrower.hull_damage, decimal.Decimal('0.7'))
-    self.assertEqual(flamethrower.hull_dps, decimal.Decimal('42'))
-    self.assertEqual(flamethrower.heat_damage, decimal.Decimal('200'))
-    self.assertEqual(flamethrower.heat_dps, decimal.Decimal('12000'))
+    self.assertAlmostEqual(flamethrower.shield_damage, 0.8)
+    self.assertAlmostEqual(flamethrower.shield_dps, 48)
+    self.assertAlmostEqual(flamethrower.hull_damage, 0.7)
+    self.assertAlmostEqual(flamethrower.hull_dps, 42)
+    self.assertAlmostEqual(flamethrower.heat_damage, 200)
+    self.assertAlmostEqual(flamethrower.heat_dps, 12000)
 
   def test_bullfrog_aggregates(self):
     bullfrog = Outfit.objects.get(name="Bullfrog Anti-Missile")
-    self.assertEqual(bullfrog.shots_per_second, decimal.Decimal('3'))
-    self.assertEqual(bullfrog.anti_missile_dps, decimal.Decimal('36'))
+    self.assertAlmostEqual(bullfrog.shots_per_second, 3)
+    self.assertAlmostEqual(bullfrog.anti_missile_dps, 36)
 
   def test_hull_variant_aggregates(self):
     marauder_arrow_engines = Hull.objects.get(name="Marauder Arrow (Engines)")
-    self.assertEqual(marauder_arrow_engines.speed_rating, decimal.Decimal('57.5'))
-    self.assertEqual(marauder_arrow_engines.agility_rating, decimal.Decimal('31.94'))
+    self.assertAlmostEqual(marauder_arrow_engines.speed_rating, 57.5)
+    self.assertAlmostEqual(marauder_arrow_engines.agility_rating, 31.94)
+
+
+class NDJSONExportTest(TestCase):
+  @classmethod
+  def setUpTestData(cls):
+    for release in ['0.9.14', 'continuous']:
+      hull = Hull.objects.create(release=release, name='Shuttle', faction='Human')
+      outfit = Outfit.objects.create(release=release, name='Hyperdrive', faction='Human', category='Hyperdrive')
+      build = Build.objects.create(name='Shuttle Default Build', hull=hull)
+      build.outfits.add(outfit, through_defaults={'amount': 2})
+
+  def read_rows(self, response):
+    self.assertTrue(response.streaming)
+    self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+    return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+  def test_export_covers_all_releases(self):
+    rows = self.read_rows(self.client.get('/api/hulls', {'format': 'ndjson'}))
+    self.assertEqual(sorted(row['release'] for row in rows), ['0.9.14', 'continuous'])
+
+  def test_export_negotiated_by_accept_header(self):
+    rows = self.read_rows(self.client.get('/api/outfits', {'release': 'continuous'}, HTTP_ACCEPT='application/x-ndjson'))
+    self.assertEqual([row['name'] for row in rows], ['Hyperdrive'])
+
+  def test_export_builds_with_outfits(self):
+    rows = self.read_rows(self.client.get('/api/builds', {'format': 'ndjson'}))
+    self.assertEqual(len(rows), 2)
+    self.assertEqual(rows[0]['outfits'][0]['amount'], 2)
+
+
+# Thread pool threads use their own database connections, so the data has to be committed
+class AsyncViewTest(TransactionTestCase):
+  def setUp(self):
+    hull = Hull.objects.create(release='0.9.14', name='Shuttle', faction='Human')
+    outfit = Outfit.objects.create(release='0.9.14', name='Hyperdrive', faction='Human', category='Hyperdrive')
+    build = Build.objects.create(name='Shuttle Default Build', hull=hull)
+    build.outfits.add(outfit, through_defaults={'amount': 2})
+
+  async def test_async_list_and_retrieve(self):
+    factory = AsyncRequestFactory()
+    list_view = as_async_view(HullViewSet.as_view({'get': 'list'}))
+    retrieve_view = as_async_view(HullViewSet.as_view({'get': 'retrieve'}))
+
+    response = await list_view(factory.get('/api/hulls', {'release': '0.9.14'}))
+    rows = json.loads(response.content)
+    self.assertEqual([row['name'] for row in rows], ['Shuttle'])
+
+    response = await retrieve_view(factory.get(f"/api/hulls/{rows[0]['id']}"), pk=rows[0]['id'])
+    self.assertEqual(json.loads(response.content)['name'], 'Shuttle')
+
+  async def test_asgi_export_streams_asynchronously(self):
+    response = await self.async_client.get('/api/builds', {'format': 'ndjson'})
+    self.assertTrue(response.is_async)
+    rows = [json.loads(line) for line in b''.join([chunk async for chunk in response.streaming_content]).splitlines()]
+    self.assertEqual(rows[0]['outfits'][0]['amount'], 2)
+
+
+class QuantizedFloatStorageTest(TestCase):
+  def test_values_round_trip_like_decimals(self):
+    values = [decimal.Decimal('49.5'), '0.285', 2.835, 1 / 3, -12.005, 999999.99, 0]
+    field = Outfit._meta.get_field('shield_dps')
+    # What a DecimalField stored for the same value
+    decimal_field = models.DecimalField(max_digits=field.max_digits, decimal_places=field.decimal_places)
+    for value in values:
+      outfit = Outfit.objects.create(release='0.9.14', name=f'Outfit {value}', faction='Human', category='Guns', shield_dps=value)
+      outfit.refresh_from_db()
+      self.assertIsInstance(outfit.shield_dps, float)
+      expected = format_number(decimal_field.to_python(value), field.max_digits, field.decimal_places)
+      self.assertEqual(OutfitSerializer(outfit).data['shield_dps'], expected)
+      self.assertEqual(OutfitSerializer(outfit, context={'native_numbers': True}).data['shield_dps'], float(expected))
+
+
+class SparseAttributesTest(TestCase):
+  def test_only_set_stats_are_stored(self):
+    outfit = Outfit(release='0.9.14', name='Heavy Laser', faction='Human', category='Guns', firing_energy=1 / 3, lifetime=0, cluster=True)
+    # Stats that are not declared (yet) are kept
+    outfit.attributes['new_stat'] = 2
+    outfit.save()
+    outfit.refresh_from_db()
+    self.assertEqual(outfit.attributes, {'firing_energy': 0.33, 'cluster': True, 'new_stat': 2})
+    self.assertEqual((outfit.firing_energy, outfit.lifetime, outfit.stream), (0.33, 0, False))
+
+  def test_serialized_like_columns(self):
+    outfit = Outfit.objects.create(release='0.9.14', name='Heavy Laser', faction='Human', category='Guns', firing_energy=1.5)
+    data = OutfitSerializer(outfit).data
+    self.assertNotIn('attributes', data)
+    self.assertEqual((data['firing_energy'], data['firing_heat'], data['lifetime']), ('1.50', '0.00', 0))
+    self.assertEqual(OutfitSerializer(outfit, context={'native_numbers': True}).data['firing_energy'], 1.5)
+    # Fields keep the order of the model declaration
+    names = list(data)
+    self.assertLess(names.index('cost'), names.index('mass'))
+    self.assertLess(names.index('mass'), names.index('engine_capacity'))
+    self.assertEqual(names[-2:], ['ammo', 'submunition_type'])
+
+
+class SharedAttributeSetTest(TestCase):
+  def create_laser(self, release, **stats):
+    return Outfit.objects.create(release=release, name='Heavy Laser', faction='Human', category='Guns',
+                                 description='A heavy laser.', firing_energy=1.5, **stats)
+
+  def test_unchanged_outfits_share_attributes(self):
+    old = self.create_laser('0.9.14')
+    new = self.create_laser('0.9.16')
+    changed = self.create_laser('continuous', firing_heat=20)
+    self.assertEqual(old.attribute_set_id, new.attribute_set_id)
+    self.assertNotEqual(old.attribute_set_id, changed.attribute_set_id)
+    self.assertEqual(AttributeSet.objects.count(), 2)
+
+    rows = self.client.get('/api/outfits', {'format': 'ndjson'})
+    rows = [json.loads(line) for line in b''.join(rows.streaming_content).splitlines()]
+    self.assertEqual([(row['release'], row['description'], row['firing_heat']) for row in rows],
+                     [('0.9.14', 'A heavy laser.', '0.00'), ('0.9.16', 'A heavy laser.', '0.00'), ('continuous', 'A heavy laser.', '20.00')])
+
+  def test_prune_unused_attribute_sets(self):
+    self.create_laser('0.9.14')
+    self.create_laser('continuous', firing_heat=20).delete()
+    prune_attribute_sets()
+    self.assertEqual(list(AttributeSet.objects.values_list('data', flat=True)),
+                     [{'description': 'A heavy laser.', 'firing_energy': 1.5}])
+
+
+class CompactFormatTest(TestCase):
+  @classmethod
+  def setUpTestData(cls):
+    Outfit.objects.create(release='0.9.14', name='Heavy Laser', faction='Human', category='Guns', shield_dps=decimal.Decimal('49.5'))
+    Outfit.objects.create(release='0.9.14', name='Blaster', faction='Human', category='Guns', shield_dps=decimal.Decimal('30'))
+
+  def test_columnar_outfits(self):
+    response = self.client.get('/api/outfits', {'release': '0.9.14', 'format': 'columns'})
+    data = response.json()
+    self.assertEqual(data['count'], 2)
+    self.assertEqual(data['columns']['name'], ['Heavy Laser', 'Blaster'])
+    self.assertEqual(data['columns']['shield_dps'], [49.5, 30.0])
+
+  def test_msgpack_outfits(self):
+    response = self.client.get('/api/outfits', {'release': '0.9.14'}, HTTP_ACCEPT='application/msgpack')
+    self.assertEqual(response['Content-Type'], 'application/msgpack')
+    rows = msgpack.unpackb(response.content)
+    self.assertEqual(rows[0]['shield_dps'], 49.5)
+
+  def test_json_keeps_decimal_strings(self):
+    response = self.client.get('/api/outfits', {'release': '0.9.14'})
+    self.assertEqual(response.json()[0]['shield_dps'], '49.50')
+
+  def test_json_native_numbers(self):
+    response = self.client.get('/api/outfits', {'release': '0.9.14', 'numbers': 'native'})
+    self.assertEqual(response.json()[0]['shield_dps'], 49.5)
+
+
+class BootstrapBundleTest(TempDirMixin, TestCase):
+  @classmethod
+  def setUpTestData(cls):
+    hull = Hull.objects.create(release='0.9.14', name='Shuttle', faction='Human')
+    Outfit.objects.create(release='0.9.14', name='Hyperdrive', faction='Human', category='Hyperdrive')
+    Build.objects.create(name='Shuttle Default Build', hull=hull)
+    Hull.objects.create(release='continuous', name='Shuttle', faction='Human')
+    mark_ready('0.9.14', '')
+    mark_ready('continuous', '')
+
+  def setUp(self):
+    # The cached catalog would outlive the Release rows rolled back after the test
+    self.addCleanup(invalidate)
+    invalidate()
+    self.temp_dir('RELEASE_DATA_DIR')
+
+  def test_bundle_contents(self):
+    data = self.client.get('/api/bootstrap', {'release': '0.9.14'}).json()
+    self.assertEqual([release['value'] for release in data['Releases']], ['continuous', '0.9.14'])
+    self.assertEqual([hull['name'] for hull in data['hulls']], ['Shuttle'])
+    self.assertEqual(len(data['outfits']), 1)
+    self.assertEqual(len(data['builds']), 1)
+
+  def test_bundle_gzip_and_etag(self):
+    response = self.client.get('/api/bootstrap', {'release': '0.9.14'}, HTTP_ACCEPT_ENCODING='gzip, br')
+    self.assertEqual(response['Content-Encoding'], 'gzip')
+    self.assertEqual(json.loads(gzip.decompress(response.content))['hulls'][0]['name'], 'Shuttle')
+    response = self.client.get('/api/bootstrap', {'release': '0.9.14'}, HTTP_IF_NONE_MATCH=response['ETag'])
+    self.assertEqual(response.status_code, 304)
+
+    for accept_encoding in ['gzip;q=0, identity', 'br', '*;q=0.5, gzip;q=0']:
+      response = self.client.get('/api/bootstrap', {'release': '0.9.14'}, HTTP_ACCEPT_ENCODING=accept_encoding)
+      self.assertFalse(response.has_header('Content-Encoding'))
+    response = self.client.get('/api/bootstrap', {'release': '0.9.14'}, HTTP_ACCEPT_ENCODING='br, *;q=0.1')
+    self.assertEqual(response['Content-Encoding'], 'gzip')
+
+  def test_bundles_are_replaced_whole(self):
+    self.client.get('/api/bootstrap', {'release': '0.9.14'})
+    with mock.patch('data_api.bundles.os.replace', side_effect=OSError):
+      with self.assertRaises(OSError):
+        write_bundle('0.9.14')
+    # The bundle written before is intact, and no temporary file is left behind
+    directory = bundle_path('0.9.14').parent
+    self.assertEqual(sorted(path.name for path in directory.iterdir()), ['bundle.json', 'bundle.json.gz'])
+    self.assertEqual(self.client.get('/api/bootstrap', {'release': '0.9.14'}).json()['hulls'][0]['name'], 'Shuttle')
+
+  def test_ingest_rewrites_bundles(self):
+    self.client.get('/api/bootstrap', {'release': '0.9.14'})
+    Hull.objects.create(release='0.9.14', name='Bulk Freighter', faction='Human')
+    publish_release('0.9.14')
+    data = self.client.get('/api/bootstrap', {'release': '0.9.14'}).json()
+    self.assertEqual([hull['name'] for hull in data['hulls']], ['Shuttle', 'Bulk Freighter'])
+    self.assertEqual(data['content_hash'], Release.objects.get(name='0.9.14').content_hash)
+
+  def test_unknown_release(self):
+    self.assertEqual(self.client.get('/api/bootstrap', {'release': '0.0.1'}).status_code, 404)
+    self.assertEqual(self.client.get('/api/bootstrap', {'release': '../0.9.14'}).status_code, 404)
+
+
+class UpstreamCommitTest(TempDirMixin, SimpleTestCase):
+  def setUp(self):
+    self.temp_dir('RELEASE_DATA_DIR')
+
+  def upstream(self, commit):
+    return mock.patch('data_api.data.requests.get', return_value=mock.Mock(text=f'{commit}\n', raise_for_status=mock.Mock()))
+
+  def test_changes_when_tag_moves(self):
+    with self.upstream('a1b2c3') as get:
+      self.assertTrue(has_upstream_changed('continuous'))
+      record_commit('continuous', 'a1b2c3')
+      self.assertFalse(has_upstream_changed('continuous'))
+    self.assertEqual(get.call_args.args[0], 'https://api.github.com/repos/endless-sky/endless-sky/commits/continuous')
+    with self.upstream('d4e5f6'):
+      self.assertTrue(has_upstream_changed('continuous'))
+
+  def test_unchanged_when_github_is_unreachable(self):
+    with mock.patch('data_api.data.requests.get', side_effect=requests.ConnectionError):
+      self.assertFalse(has_upstream_changed('continuous'))
+
+
+class ReleaseCatalogTest(TestCase):
+  @classmethod
+  def setUpTestData(cls):
+    for release in ['0.9.9', '0.9.16', 'continuous', '0.9.14']:
+      Hull.objects.create(release=release, name='Shuttle', faction='Human')
+      mark_ready(release, 'a' * 64)
+
+  def setUp(self):
+    self.addCleanup(invalidate)
+    invalidate()
+
+  def test_releases_sorted_by_version(self):
+    releases = self.client.get('/api/releases').json()['Releases']
+    self.assertEqual([release['value'] for release in releases], ['continuous', '0.9.16', '0.9.14', '0.9.9'])
+    self.assertEqual(releases[0]['label'], 'Continuous')
+
+  def test_releases_are_cached(self):
+    self.client.get('/api/releases')
+    with self.assertNumQueries(0):
+      self.client.get('/api/releases')
+
+  def test_only_ready_releases_are_listed(self):
+    mark_ingesting('0.9.17')
+    mark_ingesting('0.9.18')
+    mark_failed('0.9.18')
+    releases = self.client.get('/api/releases').json()['Releases']
+    self.assertEqual([release['value'] for release in releases], ['continuous', '0.9.16', '0.9.14', '0.9.9'])
+
+  def test_ready_releases_stay_listed_while_ingested_again(self):
+    mark_ingesting('continuous')
+    self.assertIn('continuous', [release['value'] for release in self.client.get('/api/releases').json()['Releases']])
+    mark_failed('continuous')
+    self.assertIn('continuous', [release['value'] for release in self.client.get('/api/releases').json()['Releases']])
+    release = Release.objects.get(name='continuous')
+    self.assertEqual((release.status, release.ingest_status, release.content_hash), (Release.READY, Release.FAILED, 'a' * 64))
+
+    mark_ready('continuous', 'b' * 64)
+    release.refresh_from_db()
+    self.assertEqual((release.status, release.ingest_status, release.content_hash), (Release.READY, '', 'b' * 64))
+
+  def test_ready_release_has_counts(self):
+    release = Release.objects.get(name='0.9.16')
+    self.assertEqual((release.status, release.hull_count, release.outfit_count), (Release.READY, 1, 0))
+
+
+class KeysetPaginationTest(TestCase):
+  @classmethod
+  def setUpTestData(cls):
+    for index, cost in enumerate([500, 100, 300, 100, 200]):
+      Hull.objects.create(release='0.9.14', name=f'Hull {index}', faction='Human', cost=cost)
+    Hull.objects.create(release='continuous', name='Shuttle', faction='Human', cost=1000)
+
+  def fetch_all(self, params):
+    response = self.client.get('/api/hulls', params)
+    pages = [response.json()]
+    while pages[-1]['next']:
+      pages.append(self.client.get(pages[-1]['next']).json())
+    return pages
+
+  def test_pages_in_order(self):
+    pages = self.fetch_all({'release': '0.9.14', 'ordering': 'cost', 'page_size': 2})
+    self.assertEqual([len(page['results']) for page in pages], [2, 2, 1])
+    costs = [hull['cost'] for page in pages for hull in page['results']]
+    self.assertEqual(costs, [100, 100, 200, 300, 500])
+
+  def test_descending_order(self):
+    pages = self.fetch_all({'release': '0.9.14', 'ordering': '-cost', 'page_size': 3})
+    costs = [hull['cost'] for page in pages for hull in page['results']]
+    self.assertEqual(costs, [500, 300, 200, 100, 100])
+
+  def test_invalid_ordering(self):
+    response = self.client.get('/api/hulls', {'ordering': 'description'})
+    self.assertEqual(response.status_code, 400)
+
+  def test_orderable_by_indexed_attributes(self):
+    self.assertEqual(KeysetPagination(Hull).orderable_fields, {'id', *HULL_SORT_INDEXES})
+    self.assertEqual(KeysetPagination(Outfit).orderable_fields, {'id', *OUTFIT_SORT_INDEXES})
+    # Sparse stats and columns without an index are not
+    for ordering in ['drag', 'spoiler']:
+      self.assertEqual(self.client.get('/api/hulls', {'ordering': ordering}).status_code, 400)
+    self.assertEqual(self.client.get('/api/outfits', {'ordering': '-firing_energy'}).status_code, 400)
+
+  def test_unpaginated_without_parameters(self):
+    self.assertEqual(len(self.client.get('/api/hulls').json()), 6)
+
+
+class BatchAndDeltaTest(TempDirMixin, TestCase):
+  @classmethod
+  def setUpTestData(cls):
+    cls.hull = Hull.objects.create(release='continuous', name='Shuttle', faction='Human')
+    cls.outfits = [Outfit.objects.create(release='continuous', name=name, faction='Human', category='Guns') for name in ['Blaster', 'Heavy Laser', 'Meteor Missile']]
+    build = Build.objects.create(name='Shuttle Default Build', hull=cls.hull)
+    build.outfits.add(cls.outfits[0])
+
+  def setUp(self):
+    self.addCleanup(invalidate)
+    self.temp_dir('RELEASE_DATA_DIR')
+
+  def test_batch_retrieve(self):
+    ids = f"{self.outfits[0].id},{self.outfits[2].id}"
+    names = [outfit['name'] for outfit in self.client.get('/api/outfits', {'ids': ids}).json()]
+    self.assertEqual(names, ['Blaster', 'Meteor Missile'])
+    self.assertEqual(self.client.get('/api/outfits', {'ids': '1,a'}).status_code, 400)
+
+  def test_delta_since_previous_snapshot(self):
+    old_hash = record_snapshot('continuous')
+    mark_ready('continuous', old_hash)
+    Outfit.objects.filter(name='Blaster').update(cost=1000)
+    Outfit.objects.filter(name='Meteor Missile').delete()
+    Outfit.objects.create(release='continuous', name='Plasma Cannon', faction='Human', category='Guns')
+    new_hash = record_snapshot('continuous')
+    mark_ready('continuous', new_hash)
+
+    delta = self.client.get('/api/delta', {'release': 'continuous', 'since': old_hash}).json()
+    self.assertEqual(delta['content_hash'], new_hash)
+    self.assertEqual(sorted(outfit['name'] for outfit in delta['outfits']['upserted']), ['Blaster', 'Plasma Cannon'])
+    self.assertEqual(delta['outfits']['removed'], ['Meteor Missile'])
+    self.assertEqual(delta['hulls'], {'upserted': [], 'removed': []})
+    self.assertEqual(delta['builds'], {'upserted': [], 'removed': []})
+    self.assertFalse(delta['full'])
+
+  def test_delta_after_ids_changed_is_full(self):
+    old_hash = record_snapshot('continuous')
+    mark_ready('continuous', old_hash)
+    # Same content under a new id, as in a rebuilt release shard
+    heavy_laser = Outfit.objects.get(name='Heavy Laser')
+    heavy_laser.delete()
+    heavy_laser.pk = None
+    heavy_laser.save()
+    new_hash = record_snapshot('continuous')
+    mark_ready('continuous', new_hash)
+    self.assertNotEqual(old_hash, new_hash)
+
+    delta = self.client.get('/api/delta', {'release': 'continuous', 'since': old_hash}).json()
+    self.assertTrue(delta['full'])
+    self.assertEqual(sorted(outfit['name'] for outfit in delta['outfits']['upserted']), ['Blaster', 'Heavy Laser', 'Meteor Missile'])
+    self.assertEqual([hull['name'] for hull in delta['hulls']['upserted']], ['Shuttle'])
+    self.assertEqual(len(delta['builds']['upserted']), 1)
+
+  def test_delta_unknown_hash(self):
+    mark_ready('continuous', record_snapshot('continuous'))
+    response = self.client.get('/api/delta', {'release': 'continuous', 'since': '0' * 64})
+    self.assertEqual(response.status_code, 410)
+
+
+class ReleaseDatasetTest(TempDirMixin, TestCase):
+  @classmethod
+  def setUpTestData(cls):
+    Outfit.objects.create(release='0.9.14', name='Heavy Laser', faction='Human', category='Guns', shield_dps=decimal.Decimal('49.5'))
+    Outfit.objects.create(release='0.9.14', name='Ion Cannon', faction='Human', category='Guns', spoiler=1)
+    Outfit.objects.create(release='0.9.14', name='Hyperdrive', faction='Human', category='Hyperdrive')
+    Outfit.objects.create(release='0.9.14', name='Pulse Cannon', faction='Hai', category='Guns')
+
+  def setUp(self):
+    self.addCleanup(invalidate)
+    self.temp_dir('RELEASE_DATA_DIR')
+    mark_ready('0.9.14', record_snapshot('0.9.14'))
+
+  def get_names(self, params):
+    response = self.client.get('/api/outfits', {'release': '0.9.14', **params})
+    self.assertEqual(response.status_code, 200)
+    return [row['name'] for row in json.loads(response.content)]
+
+  def test_rows_match_serializer(self):
+    response = self.client.get('/api/outfits', {'release': '0.9.14'})
+    expected = OutfitSerializer(Outfit.objects.filter(release='0.9.14').order_by('pk'), many=True).data
+    self.assertEqual(json.loads(response.content), json.loads(json.dumps(expected)))
+
+  def test_filters_without_queries(self):
+    self.get_names({})
+    with self.assertNumQueries(0):
+      self.assertEqual(self.get_names({'category': 'Guns', 'spoiler': 0}), ['Heavy Laser', 'Pulse Cannon'])
+      self.assertEqual(self.get_names({'faction': 'Human', 'category': 'Guns'}), ['Heavy Laser', 'Ion Cannon'])
+      self.assertEqual(self.get_names({'faction': 'Korath'}), [])
+
+  def test_reingest_rebuilds_dataset(self):
+    self.assertEqual(len(self.get_names({})), 4)
+    Outfit.objects.create(release='0.9.14', name='Plasma Cannon', faction='Human', category='Guns')
+    release_hash = record_snapshot('0.9.14')
+    # The release is served as it was until the ingest is complete
+    self.assertNotIn('Plasma Cannon', self.get_names({}))
+    mark_ready('0.9.14', release_hash)
+    self.assertIn('Plasma Cannon', self.get_names({}))
+
+
+class AttributeMatrixTest(TempDirMixin, TestCase):
+  @classmethod
+  def setUpTestData(cls):
+    cls.laser = Outfit.objects.create(release='0.9.14', name='Heavy Laser', faction='Human', category='Guns', shield_dps=49.5, firing_energy=1.5)
+    cls.blaster = Outfit.objects.create(release='0.9.14', name='Blaster', faction='Human', category='Guns', shield_dps=30, cluster=True)
+
+  def setUp(self):
+    self.addCleanup(invalidate)
+    self.temp_dir('RELEASE_DATA_DIR')
+    mark_ready('0.9.14', record_snapshot('0.9.14'))
+
+  def test_matrix_holds_columns_and_sparse_stats(self):
+    matrix = get_matrix(Outfit, '0.9.14')
+    self.assertIsInstance(matrix.values, np.memmap)
+    self.assertEqual(matrix.names, ['Heavy Laser', 'Blaster'])
+    self.assertEqual(matrix.column('shield_dps').tolist(), [49.5, 30.0])
+    self.assertEqual(matrix.column('firing_energy').tolist(), [1.5, 0.0])
+    self.assertEqual(matrix.column('cluster').tolist(), [0.0, 1.0])
+    self.assertEqual(matrix.rank('shield_dps', 1), [(self.laser.pk, 'Heavy Laser', 49.5)])
+
+  def test_totals(self):
+    totals = get_matrix(Outfit, '0.9.14').totals({self.laser.pk: 2, self.blaster.pk: 1})
+    self.assertEqual((totals['shield_dps'], totals['firing_energy']), (129.0, 3.0))
+    with self.assertRaises(KeyError):
+      get_matrix(Outfit, '0.9.14').totals({0: 1})
+
+  def test_reingest_writes_new_matrices(self):
+    self.assertEqual(len(get_matrix(Hull, '0.9.14')), 0)
+    Hull.objects.create(release='0.9.14', name='Shuttle', faction='Human', cost=180000)
+    release_hash = record_snapshot('0.9.14')
+    mark_ready('0.9.14', release_hash)
+    write_matrices('0.9.14', release_hash)
+    self.assertEqual(get_matrix(Hull, '0.9.14').column('cost').tolist(), [180000.0])
+    self.assertEqual([path.name for path in (settings.RELEASE_DATA_DIR / '0.9.14' / 'matrices').iterdir()], [release_hash])
+
+
+@override_settings(RELEASE_SHARDS=True)
+class ReleaseShardTest(TempDirMixin, TestCase):
+  def setUp(self):
+    self.temp_dir('RELEASE_DATA_DIR')
+    self.shard_dir = self.temp_dir('RELEASE_SHARD_DIR')
+    for release in ['0.9.14', 'continuous']:
+      self.addCleanup(detach, shard_alias(release))
+
+  def ingest(self, release, *names):
+    with ingest_shard(release):
+      for name in names:
+        hull = Hull.objects.create(release=release, name=name, faction='Human', description=f'The {name}.')
+        Build.objects.create(name=f'{name} Default Build', hull=hull)
+
+  def test_releases_are_stored_in_their_shards(self):
+    self.ingest('0.9.14', 'Shuttle')
+    self.ingest('continuous', 'Shuttle', 'Bulk Freighter')
+    self.assertFalse(Hull.objects.exists())
+    with use_release('continuous'):
+      self.assertEqual(sorted(Hull.objects.values_list('name', flat=True)), ['Bulk Freighter', 'Shuttle'])
+      hull = Hull.objects.get(name='Shuttle')
+      self.assertEqual((hull.description, hull.builds.get().name), ('The Shuttle.', 'Shuttle Default Build'))
+      # Published shards are read-only
+      with self.assertRaises(OperationalError):
+        Hull.objects.filter(pk=hull.pk).update(cost=1)
+
+    response = self.client.get('/api/hulls', {'release': '0.9.14', 'format': 'ndjson'})
+    self.assertEqual([json.loads(line)['name'] for line in b''.join(response.streaming_content).splitlines()], ['Shuttle'])
+
+  def test_requests_without_release_are_rejected(self):
+    self.ingest('0.9.14', 'Shuttle')
+    for path in ['/api/hulls', '/api/outfits', '/api/builds', '/api/hulls/1']:
+      for params in [{}, {'release': '../0.9.14'}]:
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(json.loads(response.content)), ['release'])
+    self.assertEqual(self.client.get('/api/hulls/1', {'release': '0.9.14'}).status_code, 200)
+
+  def test_failed_ingest_keeps_published_shard(self):
+    self.ingest('0.9.14', 'Shuttle')
+    with self.assertRaises(ValueError):
+      with ingest_shard('0.9.14'):
+        Hull.objects.create(release='0.9.14', name='Bulk Freighter', faction='Human')
+        raise ValueError
+    with use_release('0.9.14'):
+      self.assertEqual(list(Hull.objects.values_list('name', flat=True)), ['Shuttle'])
+    self.assertEqual([path.name for path in self.shard_dir.iterdir()], ['0.9.14.sqlite3'])
+
+  def test_shard_connections_are_tuned(self):
+    def pragmas(alias, *names):
+      with connections[alias].cursor() as cursor:
+        return [cursor.execute(f'PRAGMA {name}').fetchone()[0] for name in names]
+
+    with ingest_shard('0.9.14'):
+      Hull.objects.create(release='0.9.14', name='Shuttle', faction='Human')
+      self.assertEqual(pragmas(shard_alias('0.9.14') + '_ingest', 'synchronous', 'locking_mode', 'journal_mode'), [0, 'exclusive', 'memory'])
+    with use_release('0.9.14'):
+      self.assertEqual(pragmas(shard_alias('0.9.14'), 'query_only', 'cache_size'), [1, -64 * 1024])
+      # Analyzed before it was published
+      with connections[shard_alias('0.9.14')].cursor() as cursor:
+        self.assertTrue(cursor.execute("SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()[0])
+
+
+class StagedIngestTest(TempDirMixin, TestCase):
+  def setUp(self):
+    self.temp_dir('RELEASE_SHARD_DIR')
+
+  def ingest(self, descriptions):
+    with staged_ingest('0.9.14'):
+      ammo = Outfit.objects.create(release='0.9.14', name='Meteor Missile', faction='Human', category='Ammunition')
+      launcher = Outfit.objects.create(release='0.9.14', name='Meteor Missile Launcher', faction='Human', category='Secondary Weapons', ammo=ammo)
+      for name, description in descriptions.items():
+        hull = Hull.objects.create(release='0.9.14', name=name, faction='Human', description=description)
+        hull.default_build = Build.objects.create(name=f'{name} Default Build', hull=hull)
+        hull.save()
+        hull.default_build.outfits.add(launcher, through_defaults={'amount': 2})
+    # Foreign keys are checked at commit
+    connection.check_constraints()
+
+  def test_ingest_replaces_rows_of_release(self):
+    Hull.objects.create(release='0.9.14', name='Bulk Freighter', faction='Human', description='Replaced.')
+    other = Hull.objects.create(release='continuous', name='Shuttle', faction='Human', description='The Shuttle.')
+
+    self.ingest({'Shuttle': 'The Shuttle.'})
+
+    hull = Hull.objects.get(release='0.9.14')
+    self.assertEqual((hull.name, hull.description, hull.default_build.hull), ('Shuttle', 'The Shuttle.', hull))
+    details = hull.default_build.outfit_details.get()
+    self.assertEqual((details.outfit.name, details.outfit.ammo.name, details.amount), ('Meteor Missile Launcher', 'Meteor Missile', 2))
+    # Attribute sets are shared with other releases, those of the replaced rows are pruned
+    self.assertEqual(hull.attribute_set, other.attribute_set)
+    self.assertFalse(AttributeSet.objects.filter(data__description='Replaced.').exists())
+
+  def test_reingest_writes_only_changed_rows(self):
+    self.ingest({'Shuttle': 'The Shuttle.', 'Bulk Freighter': 'A freighter.'})
+    ids = dict(Hull.objects.values_list('name', 'pk'))
+
+    with mock.patch('data_api.bulkload.upsert', wraps=upsert) as spy:
+      self.ingest({'Shuttle': 'The Shuttle.', 'Bulk Freighter': 'A freighter.'})
+      spy.assert_not_called()
+      self.ingest({'Shuttle': 'The new Shuttle.', 'Bulk Freighter': 'A freighter.'})
+      self.assertEqual([(call.args[0], len(call.args[3])) for call in spy.call_args_list], [(Hull, 1)])
+
+    self.assertEqual(dict(Hull.objects.values_list('name', 'pk')), ids)
+    self.assertEqual(Hull.objects.get(name='Shuttle').description, 'The new Shuttle.')
+
+  @skipUnless(connection.vendor == 'sqlite', "Optimizes SQLite databases only")
+  def test_served_database_is_not_vacuumed(self):
+    with mock.patch('data_api.bulkload.optimize', wraps=optimize) as spy:
+      self.ingest({'Shuttle': 'The Shuttle.'})
+    spy.assert_called_once_with(DEFAULT_DB_ALIAS)
+
+    # As outside of a test transaction, where VACUUM could run
+    with mock.patch.object(connection, 'in_atomic_block', False), CaptureQueriesContext(connection) as queries:
+      optimize(DEFAULT_DB_ALIAS)
+    self.assertEqual([query['sql'] for query in queries], ['ANALYZE'])
+
+
+@skipUnless(connection.vendor == 'postgresql', "Needs PostgreSQL (DATABASE_ENGINE=postgresql)")
+class PostgresIngestTest(TempDirMixin, TestCase):
+  """
+  Merges through COPY and INSERT ... ON CONFLICT, which only PostgreSQL
+  uses. Runs in CI (see .github/workflows/test.yml), or locally against
+  the db service of docker/docker-compose.dev.yml with:
+
+    DATABASE_ENGINE=postgresql POSTGRES_PASSWORD=es_outfitter python manage.py test data_api.tests.PostgresIngestTest
+  """
+  def test_upsert_copies_new_and_updates_changed_rows(self):
+    stored = Outfit.objects.create(release='0.9.14', name='Heavy Laser', faction='Human', cost=1000)
+    fields = [field for field in Outfit._meta.concrete_fields if not field.primary_key]
+    rows = [
+      tuple(getattr(outfit, field.attname) for field in fields) for outfit in [
+        Outfit(release='0.9.14', name='Heavy Laser', faction='Human', cost=1200),
+        Outfit(release='0.9.14', name='Meteor Missile', faction='Human', cost=500),
+      ]
+    ]
+
+    # Temporary table, COPY, INSERT ... ON CONFLICT and DROP
+    with self.assertNumQueries(4):
+      upsert(Outfit, fields, ['release', 'name'], rows)
+
+    self.assertEqual(dict(Outfit.objects.values_list('name', 'cost')), {'Heavy Laser': 1200, 'Meteor Missile': 500})
+    self.assertEqual(Outfit.objects.get(name='Heavy Laser').pk, stored.pk)
+
+  def test_upsert_without_other_fields_keeps_rows(self):
+    hull = Hull.objects.create(release='0.9.14', name='Shuttle', faction='Human')
+    stored = Build.objects.create(name='Shuttle Default Build', hull=hull)
+    fields = [Build._meta.get_field(name) for name in ['hull', 'name']]
+
+    upsert(Build, fields, ['hull_id', 'name'], [(hull.pk, 'Shuttle Default Build'), (hull.pk, 'Shuttle Cargo Build')])
+
+    self.assertEqual(Build.objects.get(name='Shuttle Default Build').pk, stored.pk)
+    self.assertEqual(Build.objects.filter(hull=hull).count(), 2)
+
+  def test_merge_release_from_shard(self):
+    self.temp_dir('RELEASE_SHARD_DIR')
+    with staging_shard('0.9.14') as (alias, _):
+      ammo = Outfit.objects.create(release='0.9.14', name='Meteor Missile', faction='Human', category='Ammunition')
+      launcher = Outfit.objects.create(release='0.9.14', name='Meteor Missile Launcher', faction='Human', category='Secondary Weapons', ammo=ammo)
+      hull = Hull.objects.create(release='0.9.14', name='Shuttle', faction='Human', description='The Shuttle.')
+      hull.default_build = Build.objects.create(name='Shuttle Default Build', hull=hull)
+      hull.save()
+      hull.default_build.outfits.add(launcher, through_defaults={'amount': 2})
+
+      self.assertEqual(merge_release(alias, '0.9.14')[Outfit], (2, 0))
+      # Merging again writes nothing
+      self.assertEqual(merge_release(alias, '0.9.14')[Outfit], (0, 0))
+    connection.check_constraints()
+
+    hull = Hull.objects.get(release='0.9.14')
+    details = hull.default_build.outfit_details.get()
+    self.assertEqual((hull.default_build.hull, details.outfit.ammo.name, details.amount), (hull, 'Meteor Missile', 2))
+
+
+  def test_long_hull_names_fit_build_names(self):
+    path = self.temp_dir('RELEASE_SHARD_DIR') / 'ships.txt'
+    path.write_text(LONG_NAMED_SHIPS)
+    with staged_ingest('0.9.14'):
+      Outfit.objects.create(release='0.9.14', name='Heavy Laser', faction='Human', category='Guns')
+      parse_ships(path, '0.9.14')
+
+    self.assertEqual(sorted(Build.objects.values_list('name', flat=True)), [
+      'Marauder Leviathan (Engines) Refit Mk II Default Build',
+      'Marauder Leviathan (Weapons) Refit Mk II Default Build',
+    ])
+
+
+# Hull names of the maximum length (40 characters)
+LONG_NAMED_SHIPS = """ship "Marauder Leviathan (Weapons) Refit Mk II"
+\tattributes
+\t\tcategory "Heavy Warship"
+\t\t"mass" 100
+\t\t"drag" 9.6
+\toutfits
+\t\t"Heavy Laser" 2
+
+\tgun -8 -20
+
+ship "Marauder Leviathan (Weapons) Refit Mk II" "Marauder Leviathan (Engines) Refit Mk II"
+\tadd attributes
+\t\t"engine capacity" 10
+
+"""
+
+VARIANT_SHIPS = """ship "Marauder Arrow"
+\tsprite "ship/marrow"
+\tattributes
+\t\tcategory "Light Warship"
+\t\t"mass" 100
+\t\t"drag" 2.1
+\t\t"outfit space" 250
+\t\t"weapon capacity" 80
+\t\t"engine capacity" 60
+\toutfits
+\t\t"Heavy Laser" 2
+
+\tgun -8 -20
+\tdescription "The Arrow is fast."
+
+ship "Marauder Arrow" "Marauder Arrow (Engines)"
+\tsprite "ship/marrow-engines"
+\tadd attributes
+\t\t"engine capacity" 20
+\toutfits
+\t\t"Heavy Laser" 2
+\t\t"Ion Thruster"
+
+\tengine -10 30
+
+ship "Marauder Arrow" "Marauder Arrow (Weapons)"
+\tadd attributes
+\t\t"weapon capacity" 30
+\tdescription "The Arrow, with more guns."
+
+ship "Marauder Arrow (Engines)" "Marauder Arrow (Engines Plus)"
+\tadd attributes
+\t\t"engine capacity" 10
+\tengine -10 30
+
+"""
+
+
+class HullVariantDeltaTest(TempDirMixin, TestCase):
+  def setUp(self):
+    directory = self.temp_dir('RELEASE_SHARD_DIR')
+
+    path = directory / 'ships.txt'
+    path.write_text(VARIANT_SHIPS)
+    with staged_ingest('0.9.14'):
+      for name, category in [('Heavy Laser', 'Guns'), ('Ion Thruster', 'Engines')]:
+        Outfit.objects.create(release='0.9.14', name=name, faction='Human', category=category)
+      parse_ships(path, '0.9.14')
+    self.hulls = {hull.name: hull for hull in Hull.objects.filter(release='0.9.14')}
+
+  def test_variants_store_deltas(self):
+    base = self.hulls['Marauder Arrow']
+    engines = self.hulls['Marauder Arrow (Engines)']
+    engines_plus = self.hulls['Marauder Arrow (Engines Plus)']
+    weapons = self.hulls['Marauder Arrow (Weapons)']
+
+    self.assertIsNone(base.attribute_set.base)
+    self.assertEqual(engines.attribute_set.base, base.attribute_set)
+    self.assertEqual(engines_plus.attribute_set.base, engines.attribute_set)
+    self.assertEqual(weapons.attribute_set.data, {'description': 'The Arrow, with more guns.', 'weapon_capacity': 110})
+
+    self.assertEqual([hull.engine_capacity for hull in [base, engines, engines_plus, weapons]], [60, 80, 90, 60])
+    self.assertEqual((engines_plus.sprite, engines_plus.description), ('0.9.14/ship/marrow-engines.png', 'The Arrow is fast.'))
+
+  def test_variants_without_outfits_copy_default_build(self):
+    base = self.hulls['Marauder Arrow']
+    weapons = self.hulls['Marauder Arrow (Weapons)']
+    self.assertNotEqual(weapons.default_build, base.default_build)
+    self.assertEqual((weapons.default_build.hull, weapons.default_build.name), (weapons, 'Marauder Arrow (Weapons) Default Build'))
+    for hull in [base, weapons]:
+      self.assertEqual(list(hull.default_build.outfit_details.values_list('outfit__name', 'amount')), [('Heavy Laser', 2)])
+    self.assertEqual(self.hulls['Marauder Arrow (Engines Plus)'].default_build.hull, self.hulls['Marauder Arrow (Engines Plus)'])
+
+
+class BuildStatsTest(TempDirMixin, TestCase):
+  def setUp(self):
+    self.temp_dir('RELEASE_SHARD_DIR')
+
+    with staged_ingest('0.9.14'):
+      thruster = Outfit.objects.create(release='0.9.14', name='Ion Thruster', faction='Human', category='Engines',
+                                       thrust=12, engine_capacity=-20, outfit_space=-20, energy_consumption=1)
+      laser = Outfit.objects.create(release='0.9.14', name='Heavy Laser', faction='Human', category='Guns',
+                                    shield_dps=60, hull_dps=40, weapon_capacity=-15, outfit_space=-15)
+      for name, drag, amounts in [('Shuttle', 1, {thruster: 1}), ('Sparrow', 1.5, {thruster: 2, laser: 2}), ('Barge', 1, {})]:
+        hull = Hull.objects.create(release='0.9.14', name=name, faction='Human', mass=100, drag=drag,
+                                   outfit_space=100, engine_capacity=40, weapon_capacity=30)
+        hull.default_build = Build.objects.create(name=f'{name} Default Build', hull=hull)
+        hull.save()
+        for outfit, amount in amounts.items():
+          hull.default_build.outfits.add(outfit, through_defaults={'amount': amount})
+      write_build_stats('0.9.14')
+
+  def test_stats_of_default_builds(self):
+    stats = Hull.objects.get(name='Sparrow').default_build.stats
+    self.assertAlmostEqual(stats.max_speed, 24 / 90)
+    self.assertAlmostEqual(stats.acceleration, 24 / 100)
+    self.assertEqual((stats.average_dps, stats.idle_energy), (100, -2))
+    self.assertEqual((stats.free_outfit_space, stats.free_engine_capacity, stats.free_weapon_capacity), (30, 0, 0))
+
+  def test_hulls_sorted_and_filtered_by_stock_stats(self):
+    response = self.client.get('/api/hulls', {'release': '0.9.14', 'ordering': '-stock_max_speed', 'page_size': 2})
+    self.assertEqual([hull['name'] for hull in response.json()['results']], ['Sparrow', 'Shuttle'])
+    response = self.client.get('/api/hulls', {'release': '0.9.14', 'stock_average_dps__gte': '50'})
+    self.assertEqual([hull['name'] for hull in response.json()], ['Sparrow'])
+    response = self.client.get('/api/hulls', {'release': '0.9.14', 'stock_average_dps__gte': 'fast'})
+    self.assertEqual(response.status_code, 400)
+
+  def test_variants_have_stock_stats_of_their_own(self):
+    path = self.temp_dir() / 'ships.txt'
+    path.write_text(VARIANT_SHIPS)
+    with staged_ingest('0.9.15'):
+      Outfit.objects.create(release='0.9.15', name='Heavy Laser', faction='Human', category='Guns')
+      Outfit.objects.create(release='0.9.15', name='Ion Thruster', faction='Human', category='Engines', thrust=12, engine_capacity=-20)
+      parse_ships(path, '0.9.15')
+      write_build_stats('0.9.15')
+
+    stats = {hull.name: hull.default_build.stats for hull in Hull.objects.filter(release='0.9.15')}
+    self.assertEqual(stats['Marauder Arrow'].max_speed, 0)
+    self.assertAlmostEqual(stats['Marauder Arrow (Engines)'].max_speed, 12 / (2.1 * 60))
+    # A variant without outfits of its own has its own hull stats in the build it copied
+    self.assertEqual(stats['Marauder Arrow (Engines)'].free_engine_capacity, 60)
+    self.assertEqual(stats['Marauder Arrow (Engines Plus)'].free_engine_capacity, 70)
+    response = self.client.get('/api/hulls', {'release': '0.9.15', 'stock_max_speed__gte': '0.05', 'ordering': 'name'})
+    # Sorted here, as the collation of PostgreSQL ignores the parentheses
+    self.assertEqual(sorted(hull['name'] for hull in response.json()['results']), ['Marauder Arrow (Engines Plus)', 'Marauder Arrow (Engines)'])
+
+
+class WarmUpTest(TempDirMixin, TestCase):
+  def setUp(self):
+    self.addCleanup(invalidate)
+    self.temp_dir('RELEASE_DATA_DIR')
+    Outfit.objects.create(release='0.9.14', name='Heavy Laser', faction='Human', category='Guns')
+    Hull.objects.create(release='0.9.14', name='Shuttle', faction='Human')
+    mark_ready('0.9.14', record_snapshot('0.9.14'))
+    mark_ingesting('0.9.15')
+    invalidate()
+
+  def test_ready_releases_are_loaded_before_requests(self):
+    # Connections are closed for the forked workers
+    with mock.patch('data_api.warmup.connections') as connections:
+      self.assertEqual(warm_up(), ['0.9.14'])
+    connections.close_all.assert_called_once()
+
+    with self.assertNumQueries(0):
+      for path in ['/api/hulls', '/api/outfits', '/api/bootstrap']:
+        self.assertEqual(self.client.get(path, {'release': '0.9.14'}).status_code, 200)
+
+  @mock.patch.dict('data_api.warmup._state', ready=False)
+  def test_workers_are_ready_once_warmed_up(self):
+    self.assertEqual(self.client.get('/healthz').status_code, 200)
+    response = self.client.get('/readyz')
+    self.assertEqual(response.status_code, 503)
+    self.assertEqual(response['Cache-Control'], 'no-store')
+
+    # Like the test client, keep the connection of the test open
+    for signal in [request_started, request_finished]:
+      signal.disconnect(close_old_connections)
+      self.addCleanup(signal.connect, close_old_connections)
+    statuses = warm_worker()
+    self.assertEqual(statuses['/api/bootstrap?release=0.9.14'], 200)
+    self.assertEqual(set(statuses.values()), {200})
+    self.assertEqual(self.client.get('/readyz').status_code, 200)
+    # Probes are answered whatever the Host header
+    self.assertEqual(self.client.get('/readyz', HTTP_HOST='127.0.0.1:443').status_code, 200)
+
+
+class TrafficSpikeMiddlewareTest(SimpleTestCase):
+  def test_identical_requests_are_coalesced(self):
+    calls = []
+
+    def get_response(request):
+      calls.append(request)
+      time.sleep(0.2)
+      return HttpResponse(b'[]', content_type='application/json')
+
+    middleware = CoalescingMiddleware(get_response)
+    responses = []
+    requests = [RequestFactory().get('/api/outfits', {'release': '0.9.14', 'spoiler': '0'}) for _ in range(4)]
+    # Same parameters in another order are the same request
+    requests.append(RequestFactory().get('/api/outfits?spoiler=0&release=0.9.14'))
+    threads = [threading.Thread(target=lambda request=request: responses.append(middleware(request))) for request in requests]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    self.assertEqual(len(calls), 1)
+    self.assertEqual([response.content for response in responses], [b'[]'] * 5)
+    self.assertEqual(responses[-1]['Content-Type'], 'application/json')
+    # Once the response is sent, the next request is computed again
+    middleware(RequestFactory().get('/api/outfits', {'release': '0.9.14', 'spoiler': '0'}))
+    self.assertEqual(len(calls), 2)
+
+  @override_settings(SHED_MAX_IN_FLIGHT=1)
+  def test_requests_are_shed_when_saturated(self):
+    middleware = LoadSheddingMiddleware(lambda request: HttpResponse())
+    self.assertEqual(middleware(RequestFactory().get('/api/hulls')).status_code, 200)
+
+    middleware.in_flight = 1
+    response = middleware(RequestFactory().get('/api/hulls'))
+    self.assertEqual(response.status_code, 503)
+    self.assertEqual(response['Retry-After'], str(settings.SHED_RETRY_AFTER))
+    # Only the API is shed
+    self.assertEqual(middleware(RequestFactory().get('/')).status_code, 200)
+
+  @override_settings(SHED_MAX_IN_FLIGHT=2)
+  def test_concurrent_requests_do_not_exceed_limit(self):
+    handled = threading.Semaphore(0)
+    release_requests = threading.Event()
+
+    def get_response(request):
+      handled.release()
+      release_requests.wait(5)
+      return HttpResponse()
+
+    middleware = LoadSheddingMiddleware(get_response)
+    statuses = []
+    start = threading.Barrier(8)
+
+    def send():
+      start.wait()
+      statuses.append(middleware(RequestFactory().get('/api/hulls')).status_code)
+
+    threads = [threading.Thread(target=send) for _ in range(8)]
+    for thread in threads:
+      thread.start()
+    # Both handled requests are in flight, the others are shed meanwhile
+    for _ in range(2):
+      self.assertTrue(handled.acquire(timeout=5))
+    deadline = time.time() + 5
+    while len(statuses) < 6 and time.time() < deadline:
+      time.sleep(0.01)
+    release_requests.set()
+    for thread in threads:
+      thread.join()
+
+    self.assertEqual(sorted(statuses), [200] * 2 + [503] * 6)
+    self.assertEqual(middleware.in_flight, 0)
+
+  def test_in_flight_limit_follows_worker_threads(self):
+    def shed_max_in_flight(**environ):
+      with mock.patch.dict('os.environ'):
+        for name in ('GUNICORN_THREADS', 'SERVE_ASGI', 'SHED_MAX_IN_FLIGHT'):
+          os.environ.pop(name, None)
+        os.environ.update(environ)
+        return runpy.run_path(str(settings.BASE_DIR / 'es_outfitter' / 'settings.py'))['SHED_MAX_IN_FLIGHT']
+
+    self.assertEqual(shed_max_in_flight(GUNICORN_THREADS='6'), 6)
+    # Outside of gunicorn, and under ASGI, the thread pool of the server limits it
+    self.assertEqual(shed_max_in_flight(), min(32, os.cpu_count() + 4))
+    self.assertEqual(shed_max_in_flight(GUNICORN_THREADS='1', SERVE_ASGI='True'), min(32, os.cpu_count() + 4))
+
+  def test_requests_queued_too_long_are_shed(self):
+    middleware = LoadSheddingMiddleware(lambda request: HttpResponse())
+    queued = time.time() - settings.SHED_MAX_QUEUE_TIME - 1
+    response = middleware(RequestFactory().get('/api/hulls', HTTP_X_REQUEST_START=f't={queued:.3f}'))
+    self.assertEqual(response.status_code, 503)
+    response = middleware(RequestFactory().get('/api/hulls', HTTP_X_REQUEST_START=f't={time.time():.3f}'))
+    self.assertEqual(response.status_code, 200)
+
+
+class WorkerSettingsTest(SimpleTestCase):
+  def setUp(self):
+    # The config sets GUNICORN_THREADS when it is first imported
+    with mock.patch.dict('os.environ'):
+      from es_outfitter import gunicorn_conf
+    self.conf = gunicorn_conf
+
+  def test_wsgi_workers_are_threaded(self):
+    # Load shedding and coalescing only apply to requests handled at once by a worker
+    for memory in [256 + 64, 1024, 16384]:
+      workers, worker_class, threads = self.conf.worker_settings(4, memory, asgi=False)
+      self.assertEqual(worker_class, 'gthread')
+      self.assertGreaterEqual(threads, self.conf.MIN_THREADS)
+    self.assertEqual(self.conf.worker_settings(4, 16384, asgi=False)[0], 9)
+    self.assertEqual(self.conf.worker_settings(4, 256 + 64, asgi=False), (1, 'gthread', 9))
+
+
+class IncrementalStaticFilesTest(TempDirMixin, SimpleTestCase):
+  def setUp(self):
+    self.source = FileSystemStorage(location=self.temp_dir())
+    self.static_root = self.temp_dir()
+    self.source.save('ship/shuttle.png', ContentFile(b'shuttle'))
+    self.source.save('ship/sparrow.png', ContentFile(b'sparrow'))
+    self.source.save('styles.css', ContentFile(b'body { background: url("ship/shuttle.png"); }'))
+
+  def collect(self):
+    # What collectstatic does: copy the files, then post-process them
+    storage = IncrementalManifestStaticFilesStorage(location=self.static_root)
+    paths = {}
+    for name in ['ship/shuttle.png', 'ship/sparrow.png', 'styles.css']:
+      if storage.exists(name):
+        storage.delete(name)
+      with self.source.open(name) as file:
+        storage.save(name, file)
+      paths[name] = (self.source, name)
+    processed = [name for name, _, _ in storage.post_process(paths)]
+    return sorted(processed), IncrementalManifestStaticFilesStorage(location=self.static_root)
+
+  def test_only_changed_files_are_hashed(self):
+    processed, storage = self.collect()
+    self.assertEqual(processed, ['ship/shuttle.png', 'ship/sparrow.png', 'styles.css'])
+    shuttle = storage.stored_name('ship/shuttle.png')
+    self.assertRegex(shuttle, r'^ship/shuttle\.[0-9a-f]{12}\.png$')
+
+    processed, storage = self.collect()
+    self.assertEqual(processed, [])
+    self.assertEqual(storage.stored_name('ship/shuttle.png'), shuttle)
+
+    self.source.delete('ship/sparrow.png')
+    self.source.save('ship/sparrow.png', ContentFile(b'sparrow mk. ii'))
+    processed, storage = self.collect()
+    # Stylesheets are hashed again whenever a file changed
+    self.assertEqual(processed, ['ship/sparrow.png', 'styles.css'])
+    self.assertEqual(storage.stored_name('ship/shuttle.png'), shuttle)
+    with storage.open(storage.stored_name('styles.css')) as file:
+      self.assertIn(shuttle.split('/')[-1], file.read().decode())
+
+  def test_files_not_collected_keep_their_name(self):
+    storage = IncrementalManifestStaticFilesStorage(location=self.static_root)
+    self.assertEqual(storage.url('frontend/main.js'), '/static/frontend/main.js')
+
+
+class ProductionSettingsTest(TestCase):
+  def test_requests_skip_sessions_and_authentication(self):
+    from es_outfitter import settings_production as production
+    self.assertNotIn('django_browser_reload', production.INSTALLED_APPS)
+    self.assertNotIn('django.contrib.admin', production.INSTALLED_APPS)
+
+    with override_settings(MIDDLEWARE=production.MIDDLEWARE, TEMPLATES=production.TEMPLATES, REST_FRAMEWORK=production.REST_FRAMEWORK):
+      for path in ['/api/releases', '/api/hulls', '/']:
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(response.wsgi_request, 'session'))
+        self.assertNotIn('Cookie', response.get('Vary', ''))
@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import OutfitViewSet, HullViewSet, BuildViewSet, getReleases
+from .async_views import as_async_urls
+from .views import OutfitViewSet, HullViewSet, BuildViewSet, getReleases, getBootstrap, getDelta
 
 router = DefaultRouter(trailing_slash=False)
 router.register('hulls', HullViewSet, basename='hull')
@@ -10,6 +12,11 @@ router.register('builds', BuildViewSet, basename='build')
 
 urlpatterns = [
   path('releases', getReleases),
+  path('bootstrap', getBootstrap),
+  path('delta', getDelta),
 ]
 
 urlpatterns += router.urls
+
+if settings.SERVE_ASGI:
+  urlpatterns = as_async_urls(urlpatterns)
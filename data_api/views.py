@@ -1,21 +1,235 @@
 import logging
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
-from .models import Hull, Outfit, Build
+from .async_views import in_thread_pool, is_asgi_request
+from .bundles import get_bundle
+from .catalog import release_options
+from .datasets import get_dataset
+from .models import Hull, Outfit, Build, BuildStats
+from .pagination import KeysetPagination
+from .renderers import ColumnarJSONRenderer, MessagePackRenderer, NDJSONRenderer, ORJSONRenderer, encode_ndjson
 from .serializers import HullSerializer, OutfitSerializer, BuildSerializer
+from .snapshots import current_hash, is_release_name, release_delta
 
 
 logger = logging.getLogger(__name__)
 
+# Number of rows fetched from the database per query while streaming
+STREAM_CHUNK_SIZE = 500
+
+# Renderers available to the viewsets (default renderers + export formats)
+api_renderer_classes = [
+  *api_settings.DEFAULT_RENDERER_CLASSES,
+  NDJSONRenderer,
+  ColumnarJSONRenderer,
+  MessagePackRenderer,
+]
+
+
+def serializer_context(request):
+  """
+  Returns the serializer context for the format negotiated by the request.
+  Binary and columnar formats always get decimals as native numbers, the
+  JSON formats when the request asks for it with '?numbers=native'.
+  """
+  native_numbers = getattr(request.accepted_renderer, 'native_numbers', False) \
+    or request.query_params.get('numbers') == 'native'
+  return {'native_numbers': native_numbers}
+
+
+def parse_ids(params):
+  """
+  Parses the primary keys in the 'ids' parameter (e.g. '?ids=1,5,9'), or returns None
+  """
+  ids = params.get('ids')
+  if not ids:
+    return None
+  try:
+    return [int(pk) for pk in ids.split(',') if pk]
+  except ValueError:
+    raise ValidationError({'ids': "Must be a comma separated list of integers."})
+
+
+def filter_ids(queryset, params):
+  """
+  Restricts a queryset to the primary keys in the 'ids' parameter (e.g. '?ids=1,5,9')
+  """
+  pks = parse_ids(params)
+  if pks is None:
+    return queryset
+  return queryset.filter(pk__in=pks)
+
+
+def stock_stats():
+  """
+  Returns the stats of the default build of a hull as annotations
+  ('stock_<stat>', e.g. 'stock_max_speed'), see models.BuildStats.
+  Hulls without default build (or stats) count as 0.
+  """
+  return {
+    f'stock_{field.name}': Coalesce(F(f'default_build__stats__{field.name}'), Value(0.0))
+    for field in BuildStats._meta.concrete_fields if isinstance(field, models.FloatField)
+  }
+
+
+def filter_stock_stats(queryset, params):
+  """
+  Annotates hulls with the stats of their default build, if the request
+  filters by them (e.g. '?stock_max_speed__gte=3') or orders by them (e.g.
+  '?ordering=-stock_average_dps')
+
+  Returns:
+      QuerySet: Queryset, or None if the request uses no stock stats
+  """
+  annotations = stock_stats()
+  ordering = params.get(KeysetPagination.ordering_query_param, '').lstrip('-')
+  filters = {}
+  for param, value in params.items():
+    name, _, lookup = param.partition('__')
+    if name in annotations and lookup in ('gte', 'lte'):
+      try:
+        filters[param] = float(value)
+      except ValueError:
+        raise ValidationError({param: "Must be a number."})
+  if not filters and ordering not in annotations:
+    return None
+  return queryset.annotate(**annotations).filter(**filters)
+
+
+def accepts_gzip(request):
+  """
+  Whether the Accept-Encoding header of a request accepts gzip, honouring
+  q-values (e.g. 'gzip;q=0' refuses it, '*' accepts it unless listed)
+  """
+  qualities = {}
+  for coding in request.headers.get('Accept-Encoding', '').split(','):
+    name, _, params = coding.partition(';')
+    quality = 1.0
+    for param in params.split(';'):
+      key, _, value = param.strip().partition('=')
+      if key == 'q':
+        try:
+          quality = float(value)
+        except ValueError:
+          quality = 0.0
+    qualities[name.strip().lower()] = quality
+  return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def serve_from_dataset(model, request):
+  """
+  Serves a plain JSON hull or outfit list of a release from the release's
+  in-memory dataset, without touching the database.
+
+  Returns:
+      HttpResponse: Pre-encoded list, or None if the request needs the
+                    database (other formats, pagination, no release, ...)
+  """
+  params = request.query_params
+  release = params.get('release')
+  if not release or request.accepted_renderer.format != 'json' or params.get('numbers') == 'native':
+    return None
+  if KeysetPagination(model).is_requested(request):
+    return None
+  dataset = get_dataset(model, release)
+  if dataset is None:
+    return None
+
+  spoiler = params.get('spoiler')
+  body = dataset.select(
+    spoiler=int(spoiler) if spoiler else None,
+    faction=params.get('faction') or None,
+    category=params.get('category') or None,
+    ids=parse_ids(params),
+  )
+  return HttpResponse(body, content_type='application/json')
+
+
+def stream_ndjson(queryset, serializer_class, context=None, asynchronous=False):
+  """
+  Streams a queryset as newline-delimited JSON.
+
+  Rows are fetched in chunks of STREAM_CHUNK_SIZE, paging over the primary
+  key, so only one chunk is held in memory at any time. Paging by primary
+  key (instead of using .iterator()) keeps any prefetch_related() of the
+  queryset working for each chunk.
+
+  Args:
+      queryset (QuerySet): Filtered queryset to export
+      serializer_class (Serializer): Serializer used for each row
+      context (dict) (optional): Serializer context
+      asynchronous (bool) (optional): Stream through an async iterator, fetching
+          and encoding each chunk in the thread pool (for ASGI requests)
+
+  Returns:
+      StreamingHttpResponse: Response streaming one JSON object per line
+  """
+  # Chunks are fetched after the view returned, from the database (shard) the view would read
+  queryset = queryset.using(queryset.db)
+
+  def encode_chunk(last_pk):
+    chunk = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:STREAM_CHUNK_SIZE])
+    if not chunk:
+      return None, last_pk
+    return encode_ndjson(serializer_class(chunk, many=True, context=context).data), chunk[-1].pk
+
+  def rows():
+    last_pk = 0
+    while True:
+      data, last_pk = encode_chunk(last_pk)
+      if data is None:
+        return
+      yield data
+
+  async def async_rows():
+    encode = in_thread_pool(encode_chunk)
+    last_pk = 0
+    while True:
+      data, last_pk = await encode(last_pk)
+      if data is None:
+        return
+      yield data
+
+  return StreamingHttpResponse(async_rows() if asynchronous else rows(), content_type=NDJSONRenderer.media_type)
+
+
+class ReleaseViewSet(viewsets.ViewSet):
+  """
+  Viewset of a model stored per release. With sharded releases
+  (settings.RELEASE_SHARDS) its rows are only in the shard of the release
+  named by the 'release' parameter, so requests without one are rejected
+  instead of reading from the default database, which has none.
+  """
+  renderer_classes = api_renderer_classes
+
+  def initial(self, request, *args, **kwargs):
+    super().initial(request, *args, **kwargs)
+    if settings.RELEASE_SHARDS and not is_release_name(request.query_params.get('release', '')):
+      raise ValidationError({'release': "This parameter is required."})
+
+
 # Hull views
-class HullViewSet(viewsets.ViewSet):
+class HullViewSet(ReleaseViewSet):
+
   def list(self, request):
     params = request.query_params
-    queryset = Hull.objects.all()
+    # Stock stats are not in the datasets
+    queryset = filter_stock_stats(Hull.objects.order_by('pk'), params)
+    if queryset is None:
+      response = serve_from_dataset(Hull, request)
+      if response is not None:
+        return response
+      queryset = Hull.objects.order_by('pk')
 
     # Adjust viewset based on query parameters
     if params:
@@ -32,21 +246,34 @@ class HullViewSet(viewsets.ViewSet):
         queryset = queryset.filter(faction=faction)
       if category:
         queryset = queryset.filter(category=category)
-    serializer = HullSerializer(queryset, many=True)
+      queryset = filter_ids(queryset, params)
+    if request.accepted_renderer.format == 'ndjson':
+      return stream_ndjson(queryset, HullSerializer, serializer_context(request), is_asgi_request(request))
+    paginator = KeysetPagination(Hull, stock_stats())
+    if paginator.is_requested(request):
+      page = paginator.paginate_queryset(queryset, request, view=self)
+      serializer = HullSerializer(page, many=True, context=serializer_context(request))
+      return paginator.get_paginated_response(serializer.data)
+    serializer = HullSerializer(queryset, many=True, context=serializer_context(request))
     return Response(serializer.data)
 
   def retrieve(self, request, pk=None):
     queryset = Hull.objects.all()
     hull = get_object_or_404(queryset, pk=pk)
-    serializer = HullSerializer(hull)
+    serializer = HullSerializer(hull, context=serializer_context(request))
     return Response(serializer.data)
 
 
 # Outfit views
-class OutfitViewSet(viewsets.ViewSet):
+class OutfitViewSet(ReleaseViewSet):
+
   def list(self, request):
+    response = serve_from_dataset(Outfit, request)
+    if response is not None:
+      return response
+
     params = request.query_params
-    queryset = Outfit.objects.all()
+    queryset = Outfit.objects.order_by('pk')
 
     # Adjust viewset based on query parameters
     if params:
@@ -63,21 +290,30 @@ class OutfitViewSet(viewsets.ViewSet):
         queryset = queryset.filter(faction=faction)
       if category:
         queryset = queryset.filter(category=category)
-    serializer = OutfitSerializer(queryset, many=True)
+      queryset = filter_ids(queryset, params)
+    if request.accepted_renderer.format == 'ndjson':
+      return stream_ndjson(queryset, OutfitSerializer, serializer_context(request), is_asgi_request(request))
+    paginator = KeysetPagination(Outfit)
+    if paginator.is_requested(request):
+      page = paginator.paginate_queryset(queryset, request, view=self)
+      serializer = OutfitSerializer(page, many=True, context=serializer_context(request))
+      return paginator.get_paginated_response(serializer.data)
+    serializer = OutfitSerializer(queryset, many=True, context=serializer_context(request))
     return Response(serializer.data)
 
   def retrieve(self, request, pk=None):
     queryset = Outfit.objects.all()
     outfit = get_object_or_404(queryset, pk=pk)
-    serializer = OutfitSerializer(outfit)
+    serializer = OutfitSerializer(outfit, context=serializer_context(request))
     return Response(serializer.data)
 
 
 # Build views
-class BuildViewSet(viewsets.ViewSet):
+class BuildViewSet(ReleaseViewSet):
+
   def list(self, request):
     params = request.query_params
-    queryset = Build.objects.all()
+    queryset = Build.objects.order_by('pk')
 
     # Adjust viewset based on query parameter
     if params:
@@ -85,18 +321,63 @@ class BuildViewSet(viewsets.ViewSet):
       release = params.get('release')
       if release:
         queryset = queryset.filter(hull__release=release)
-    serializer = BuildSerializer(queryset, many=True)
+      queryset = filter_ids(queryset, params)
+    if request.accepted_renderer.format == 'ndjson':
+      queryset = queryset.prefetch_related('outfit_details')
+      return stream_ndjson(queryset, BuildSerializer, serializer_context(request), is_asgi_request(request))
+    serializer = BuildSerializer(queryset, many=True, context=serializer_context(request))
     return Response(serializer.data)
 
   def retrieve(self, request, pk=None):
     queryset = Build.objects.all()
     build = get_object_or_404(queryset, pk=pk)
-    serializer = BuildSerializer(build)
+    serializer = BuildSerializer(build, context=serializer_context(request))
     return Response(serializer.data)
 
 
 # Returns array of release options for the react-select module
 def getReleases(request):
-  releases = Hull.objects.all().values_list('release', flat=True).distinct().order_by('-release')
-  release_options = { "Releases": [{"value": release, "label": release.capitalize()} for release in releases]}    
-  return JsonResponse(release_options)
+  return JsonResponse({ "Releases": release_options() })
+
+
+# Returns releases, hulls, outfits and builds of a release in one (gzipped) response
+def getBootstrap(request):
+  bundle = get_bundle(request.GET.get('release', ''))
+  if bundle is None:
+    return JsonResponse({"detail": "Not found."}, status=404)
+  etag, body, gzipped = bundle
+
+  if request.headers.get('If-None-Match') == etag:
+    response = HttpResponseNotModified()
+  elif accepts_gzip(request):
+    response = HttpResponse(gzipped, content_type='application/json')
+    response['Content-Encoding'] = 'gzip'
+  else:
+    response = HttpResponse(body, content_type='application/json')
+
+  response['ETag'] = etag
+  response['Vary'] = 'Accept-Encoding'
+  # Continuous changes with every upstream update, the other releases never do
+  max_age = 300 if request.GET['release'] == 'continuous' else 86400
+  response['Cache-Control'] = f'public, max-age={max_age}'
+  return response
+
+
+# Returns the current content hash of a release and, given the content hash
+# held by the client in 'since', the hulls, outfits and builds that were
+# added, changed or removed since then (all of them if their ids changed)
+def getDelta(request):
+  release = request.GET.get('release', '')
+  release_hash = current_hash(release) if is_release_name(release) else None
+  if release_hash is None:
+    return JsonResponse({"detail": "Not found."}, status=404)
+
+  delta = {"release": release, "content_hash": release_hash}
+  since = request.GET.get('since')
+  if since:
+    changes = release_delta(release, since)
+    if changes is None:
+      return JsonResponse({"detail": "Unknown content hash, fetch the full release instead."}, status=410)
+    delta.update(since=since, **changes)
+
+  return HttpResponse(ORJSONRenderer().render(delta), content_type='application/json')
@@ -0,0 +1,115 @@
+"""
+Loads the read-only data the API serves from memory ahead of the first
+request: the release catalog (see catalog.ready_releases()), the hull and
+outfit datasets (see datasets.get_dataset()), the bootstrap bundles (see
+bundles.get_bundle()) and the attribute matrices (see
+matrices.get_matrix()) of every ready release.
+
+Gunicorn runs it in the master process before forking the workers (see
+es_outfitter/gunicorn_conf.py), so all workers start out sharing a single
+copy of that data, copy-on-write, instead of each loading their own.
+
+Each worker then sends the requests of a client opening the site (see
+HOT_PATHS) for the newest release through the app, before it accepts any
+(see warm_worker()): this loads the rest of the code, opens a database
+connection and reads the pages of the hot queries into the page cache.
+The worker only reports ready at /readyz once this is done (see
+middleware.HealthCheckMiddleware).
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from wsgiref.util import setup_testing_defaults
+
+from .bundles import get_bundle
+from .catalog import ready_releases
+from .datasets import get_dataset
+from .matrices import get_matrix
+from .models import Hull, Outfit
+
+logger = logging.getLogger(__name__)
+
+# Requests of a client opening the site, sent by warm_worker()
+HOT_PATHS = [
+    '/',
+    '/api/releases',
+    '/api/bootstrap?release={release}',
+    '/api/hulls?release={release}',
+    '/api/outfits?release={release}',
+    '/api/builds?release={release}',
+]
+
+# Whether this process has been warmed up by warm_worker()
+_state = {'ready': False}
+
+
+def warm_up():
+    """
+    Loads the data served from memory for all ready releases, then closes
+    all database connections (a forked process must not reuse them)
+
+    Returns:
+        list: Names of the releases loaded
+    """
+    started = time.monotonic()
+    releases = [release.name for release in ready_releases()]
+    for release in releases:
+        for model in [Hull, Outfit]:
+            get_dataset(model, release)
+            get_matrix(model, release)
+        get_bundle(release)
+    connections.close_all()
+    logger.info(f"Loaded {len(releases)} releases in {time.monotonic() - started:.2f}s")
+    return releases
+
+
+def is_ready():
+    """
+    Returns whether this process has been warmed up (see warm_worker())
+    """
+    return _state['ready']
+
+
+def warm_up_host():
+    """
+    Returns a host name the warm-up requests can be sent to, i.e. one that
+    settings.ALLOWED_HOSTS accepts
+    """
+    for host in settings.ALLOWED_HOSTS:
+        return 'localhost' if host == '*' else host.lstrip('.')
+    return 'localhost'
+
+
+def warm_worker():
+    """
+    Sends the hot requests (see HOT_PATHS) for the newest ready release
+    through the app in this process, then marks the process as ready. A
+    request that fails is logged and does not keep the process from
+    becoming ready.
+
+    Returns:
+        dict: {path: response status}
+    """
+    started = time.monotonic()
+    releases = ready_releases()
+    handler = WSGIHandler()
+    statuses = {}
+    for hot_path in HOT_PATHS:
+        if '{release}' in hot_path and not releases:
+            continue
+        url = hot_path.format(release=releases[0].name if releases else '')
+        path, _, query = url.partition('?')
+        environ = {'PATH_INFO': path, 'QUERY_STRING': query, 'HTTP_HOST': warm_up_host(), 'HTTP_ACCEPT_ENCODING': 'gzip'}
+        setup_testing_defaults(environ)
+        try:
+            response = handler(environ, lambda status, headers: statuses.update({url: int(status.split()[0])}))
+            b''.join(response)
+            response.close()
+        except Exception:
+            logger.exception(f"Warm-up request to {url} failed")
+    _state['ready'] = True
+    logger.info(f"Warmed up in {time.monotonic() - started:.2f}s: {statuses}")
+    return statuses
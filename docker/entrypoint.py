@@ -1,58 +1,135 @@
 import django
+import hashlib
+import logging
+import os
+import signal
 import subprocess
+import sys
+import time
 
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 from django.core.management import call_command
 from pathlib import Path
 
 stable_releases = ['0.9.14', '0.9.15', '0.9.16']
 
-fixture = 'data_api/raw_data/stable_releases_fixture'
 db = 'db/db.sqlite3'
 
-def build_db(releases: list[str]) -> None:
-  for release in releases:
-    data.get_release(release)
-    data.parse_raw(release)
+logger = logging.getLogger('entrypoint')
+
+# Boot stages:
+#   migrate        (skipped without unapplied migrations)
+#   collectstatic  (in parallel with migrate, skipped if no static file changed)
+#   gunicorn       (serves the releases published so far)
+#   refresh        (in the background: ingests missing releases, skipped for releases that are ready,
+#                   then collects the images of the releases ingested; releases that were ready stay
+#                   listed while they are ingested again, and if that fails)
+
+def stage(name: str, function, *args):
+  """
+  Runs a boot stage, logging how long it took
+  """
+  started = time.monotonic()
+  result = function(*args)
+  logger.info(f"Boot stage '{name}' took {time.monotonic() - started:.1f}s")
+  return result
+
+def migrate() -> None:
+  # Loading the migration graph is much faster than running the migrate command
+  from django.db import connection
+  from django.db.migrations.executor import MigrationExecutor
+  executor = MigrationExecutor(connection)
+  if not executor.migration_plan(executor.loader.graph.leaf_nodes()):
+    logger.info("No migrations to apply")
+    return
+  call_command('migrate', verbosity=0)
 
-def save_fixture() -> None:
-  call_command('dumpdata', '--exclude=auth', output=fixture)
+def static_fingerprint() -> str:
+  # Hash of the path, size and modification time of every static file collectstatic would copy
+  from django.contrib.staticfiles.finders import get_finders
+  fingerprint = hashlib.sha1()
+  for finder in get_finders():
+    for path, storage in finder.list(['CVS', '.*', '*~']):
+      stat = os.stat(storage.path(path))
+      fingerprint.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+  return fingerprint.hexdigest()
+
+def collect_static() -> None:
+  # Only new and changed files are copied and hashed (see es_outfitter/storage.py)
+  marker = Path(settings.STATIC_ROOT) / '.fingerprint'
+  fingerprint = static_fingerprint()
+  if marker.exists() and marker.read_text() == fingerprint:
+    logger.info("No static files changed")
+    return
+  call_command('collectstatic', verbosity=0, interactive=False)
+  marker.write_text(fingerprint)
 
 def has_continous_changed() -> bool:
-  # TODO
-  return False
+  # The 'continuous' tag moved to another commit since it was ingested
+  from data_api.data import has_upstream_changed
+  return has_upstream_changed('continuous')
+
+def has_stale_builds(release: str) -> bool:
+  # Ingested before every hull variant had a default build (and build stats) of its own
+  from django.db.models import F
+  from data_api.models import Build, Hull
+  from data_api.shards import use_release
+  with use_release(release):
+    shared = Hull.objects.filter(release=release, default_build__isnull=False).exclude(default_build__hull=F('pk'))
+    return shared.exists() or Build.objects.filter(hull__release=release, stats=None).exists()
+
+def outdated_releases() -> list[str]:
+  # Releases that are ready (i.e. have a recorded content hash) are not ingested again
+  from data_api.models import Release
+  ready = set(Release.objects.filter(status=Release.READY).values_list('name', flat=True))
+  ready = {release for release in ready if not has_stale_builds(release)}
+  releases = [r for r in stable_releases if r not in ready]
+  if 'continuous' not in ready or has_continous_changed():
+    releases.append('continuous')
+  return releases
+
+def refresh_releases() -> None:
+  # Each ingest replaces the rows of its own release only once it completes: the other releases, and
+  # the release itself if it was ready before, are served and listed meanwhile (see data_api/catalog.py)
+  from data_api import data
+  releases = outdated_releases()
+  for release in releases:
+    # Looked up before the download: if the tag moves meanwhile, the release is ingested again on the next boot
+    commit = data.upstream_commit(release)
+    try:
+      data.get_release(release)
+      data.parse_raw(release)
+    except Exception:
+      # A release that was ready before keeps being served as it was, and is ingested again on the next boot
+      logger.exception(f"Refreshing release '{release}' failed")
+      continue
+    data.record_commit(release, commit)
+  if releases:
+    stage('collectstatic', collect_static)
+
+def start_server() -> subprocess.Popen:
+  # Preloaded app, worker count and class are set up in es_outfitter/gunicorn_conf.py
+  app = 'es_outfitter.asgi' if settings.SERVE_ASGI else 'es_outfitter.wsgi'
+  server = subprocess.Popen(['gunicorn', app, '--config=python:es_outfitter.gunicorn_conf'])
+  # Stop gunicorn along with the container
+  signal.signal(signal.SIGTERM, lambda signum, frame: server.terminate())
+  return server
 
 if __name__=="__main__":
-  # Start Django and set up database
+  # Start Django, migrate the database and collect the static files at the same time
   django.setup()
-  call_command('migrate', verbosity=0)
+  with ThreadPoolExecutor(max_workers=1) as executor:
+    static = executor.submit(stage, 'collectstatic', collect_static)
+    stage('migrate', migrate)
+    static.result()
 
-  # Import data handling functions
-  from data_api import data
-  
-  # Import model and check for any releases present in the database
-  from data_api.models import Hull
-  db_releases = Hull.objects.all().values_list('release', flat=True).distinct()
-  missing_releases = [r for r in stable_releases if r not in db_releases]
-  
-  # If a release is missing or if there is no fixture, rebuild database
-  if not Path(settings.BASE_DIR / fixture).exists() or missing_releases:
-    call_command('flush', verbosity=0, interactive=False)
-    build_db(stable_releases)
-    save_fixture()
-    data.get_release('continuous')
-    data.parse_raw('continuous')
-  # If database is in order, check if continuous has changed
-  else:
-    if (has_continous_changed()):
-    # if yes:
-      # flush db
-      call_command('flush', verbosity=0, interactive=False)
-      # load fixture
-      call_command('loaddata', fixture, verbosity=0)
-      # get and parse continuous
-      data.get_release('continuous')
-      data.parse_raw('continuous')
+  server = start_server()
 
-  call_command('collectstatic', verbosity=0, interactive=False)
-  subprocess.call(['gunicorn', 'es_outfitter.wsgi', '--bind=0.0.0.0:443'])
\ No newline at end of file
+  try:
+    stage('refresh', refresh_releases)
+  except Exception:
+    # The releases published before keep being served
+    logger.exception("Refreshing releases failed")
+
+  sys.exit(server.wait())
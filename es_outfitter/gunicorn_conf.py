@@ -0,0 +1,146 @@
+"""
+Gunicorn settings, used by docker/entrypoint.py
+('gunicorn es_outfitter.wsgi --config=python:es_outfitter.gunicorn_conf').
+
+The app is loaded in the master process before the workers are forked
+(preload_app), and so is the read-only data the API serves from memory
+(see data_api.warmup). The workers share those pages with the master
+copy-on-write, so each additional worker costs its own working memory
+only, not another copy of Django and the release data. Each worker warms
+up before it accepts requests (see post_worker_init()): until then,
+connections wait in the listen backlog instead of hitting a cold worker.
+
+Unless set with WEB_CONCURRENCY (and GUNICORN_THREADS), the number of
+workers is derived from the CPUs and the memory available to the container
+(see worker_count()).
+WSGI workers are threaded (gthread), with more threads when fewer workers
+fit in memory. The load shedding and request coalescing middlewares (see
+data_api.middleware) work on the requests a worker handles at once, so a
+sync worker, which handles one request at a time, would never shed nor
+coalesce any. SERVE_ASGI=True always uses uvicorn workers.
+"""
+import gc
+import math
+import os
+
+from pathlib import Path
+
+# Memory of the master process with the app and the release data loaded,
+# and what each worker adds to it (in MiB)
+SHARED_MEMORY = int(os.environ.get("GUNICORN_SHARED_MEMORY", default=256))
+WORKER_MEMORY = int(os.environ.get("GUNICORN_WORKER_MEMORY", default=64))
+
+# Requests handled at once per CPU (gunicorn's rule of thumb: 2 workers per CPU + 1)
+WORKERS_PER_CPU = 2
+# Threads per gthread worker
+MIN_THREADS = 4
+MAX_THREADS = 16
+
+
+def read_cgroup(*paths: str):
+    """
+    Returns the content of the first cgroup file that exists, or None
+    """
+    for path in paths:
+        try:
+            return Path('/sys/fs/cgroup', path).read_text().strip()
+        except OSError:
+            continue
+    return None
+
+
+def available_cpus():
+    """
+    Returns the number of CPUs the process may use: its CPU affinity,
+    capped by the CPU quota of its cgroup (e.g. 'docker run --cpus')
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    quota = read_cgroup('cpu.max')
+    if quota:
+        limit, period = quota.split()
+        if limit != 'max':
+            cpus = min(cpus, math.ceil(int(limit) / int(period)))
+    else:
+        limit, period = read_cgroup('cpu/cpu.cfs_quota_us'), read_cgroup('cpu/cpu.cfs_period_us')
+        if limit and period and int(limit) > 0:
+            cpus = min(cpus, math.ceil(int(limit) / int(period)))
+    return max(1, cpus)
+
+
+def available_memory():
+    """
+    Returns the memory the process may use in MiB: the memory limit of its
+    cgroup (e.g. 'docker run --memory'), or the physical memory
+    """
+    memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    limit = read_cgroup('memory.max', 'memory/memory.limit_in_bytes')
+    if limit and limit.isdigit():
+        memory = min(memory, int(limit))
+    return memory // (1024 * 1024)
+
+
+def worker_count(cpus: int, memory: int):
+    """
+    Returns the number of workers for the given resources: 2 per CPU + 1,
+    as many as fit in memory
+
+    Args:
+        cpus (int): Available CPUs
+        memory (int): Available memory in MiB
+    """
+    return max(1, min(WORKERS_PER_CPU * cpus + 1, (memory - SHARED_MEMORY) // WORKER_MEMORY))
+
+
+def worker_settings(cpus: int, memory: int, asgi: bool):
+    """
+    Returns the number of workers, their class and the number of threads
+    per worker. Workers that do not fit in memory are made up for with
+    more threads, so that as many requests can be handled at once.
+
+    Returns:
+        tuple: (workers, worker class, threads)
+    """
+    workers = worker_count(cpus, memory)
+    if asgi:
+        return workers, 'uvicorn.workers.UvicornWorker', 1
+    wanted = WORKERS_PER_CPU * cpus + 1
+    return workers, 'gthread', min(MAX_THREADS, max(MIN_THREADS, math.ceil(wanted / workers)))
+
+
+bind = os.environ.get("GUNICORN_BIND", default='0.0.0.0:443')
+preload_app = True
+
+workers, worker_class, threads = worker_settings(
+    available_cpus(), available_memory(), os.environ.get("SERVE_ASGI", default=False) == 'True'
+)
+if os.environ.get("WEB_CONCURRENCY"):
+    workers = int(os.environ["WEB_CONCURRENCY"])
+if os.environ.get("GUNICORN_THREADS"):
+    threads = int(os.environ["GUNICORN_THREADS"])
+# Read by the settings of the app, loaded after this file (see SHED_MAX_IN_FLIGHT)
+os.environ["GUNICORN_THREADS"] = str(threads)
+
+
+def when_ready(server):
+    """
+    Loads the release data in the master, once the app is loaded and
+    before any worker is forked
+    """
+    from data_api.warmup import warm_up
+
+    releases = warm_up()
+    # Objects that exist now are never collected, so the garbage collector
+    # of a worker does not write to (and thereby copy) the pages they are on
+    gc.freeze()
+    server.log.info(f"Preloaded {len(releases)} releases for {workers} {worker_class} workers ({threads} threads)")
+
+
+def post_worker_init(worker):
+    """
+    Sends the hot requests through the app in a new worker, before it
+    accepts any (see data_api.warmup.warm_worker())
+    """
+    from data_api.warmup import warm_worker
+
+    statuses = warm_worker()
+    worker.log.info(f"Worker {worker.pid} warmed up with {len(statuses)} requests")
@@ -28,6 +28,27 @@ DEBUG = os.environ.get("DEBUG", default=False) == 'True'
 
 ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS").split(" ") if os.environ.get("DJANGO_ALLOWED_HOSTS") else []
 
+# Serve through ASGI (gunicorn with uvicorn workers) with async API views,
+# instead of WSGI with sync workers
+SERVE_ASGI = os.environ.get("SERVE_ASGI", default=False) == 'True'
+
+# Threads handling requests in each worker (set by es_outfitter.gunicorn_conf,
+# 0 outside of gunicorn)
+WORKER_THREADS = int(os.environ.get("GUNICORN_THREADS", default=0))
+
+# Load shedding of API requests (see data_api.middleware): requests get a 503
+# when a worker handles SHED_MAX_IN_FLIGHT requests already, or when they
+# waited longer than SHED_MAX_QUEUE_TIME seconds for a worker. By default, a
+# worker takes as many requests as it has threads to handle them: those of
+# the worker under WSGI, those of the thread pool the async views run their
+# queries in under ASGI (see data_api.async_views). Servers with a thread
+# per request (e.g. runserver) get the limit of the thread pool too.
+SHED_MAX_IN_FLIGHT = int(os.environ.get(
+    "SHED_MAX_IN_FLIGHT", default=WORKER_THREADS if WORKER_THREADS and not SERVE_ASGI else min(32, (os.cpu_count() or 1) + 4)
+))
+SHED_MAX_QUEUE_TIME = float(os.environ.get("SHED_MAX_QUEUE_TIME", default=2))
+SHED_RETRY_AFTER = 5
+
 
 # Application definition
 
@@ -48,8 +69,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'data_api.middleware.HealthCheckMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'data_api.middleware.LoadSheddingMiddleware',
+    'data_api.middleware.CoalescingMiddleware',
+    'data_api.shards.ReleaseShardMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -97,12 +122,45 @@ INTERNAL_IPS = [
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db' / 'db.sqlite3',
+# DATABASE_ENGINE=postgresql runs against a PostgreSQL server (shared by
+# all replicas of the app), configured by the POSTGRES_* variables
+
+DATABASE_ENGINE = os.environ.get("DATABASE_ENGINE", default='sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get("POSTGRES_DB", default='es_outfitter'),
+            'USER': os.environ.get("POSTGRES_USER", default='es_outfitter'),
+            'PASSWORD': os.environ.get("POSTGRES_PASSWORD", default=''),
+            'HOST': os.environ.get("POSTGRES_HOST", default='localhost'),
+            'PORT': os.environ.get("POSTGRES_PORT", default='5432'),
+            # Persistent connections, one per worker thread, checked before reuse
+            'CONN_MAX_AGE': int(os.environ.get("CONN_MAX_AGE", default=60)),
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db' / 'db.sqlite3',
+        }
+    }
+
+
+# Per-release files generated at ingest (bootstrap bundles etc.)
+
+RELEASE_DATA_DIR = BASE_DIR / 'db' / 'releases'
+
+# Store the hulls, outfits and builds of each release in a SQLite file of
+# its own in RELEASE_SHARD_DIR (see data_api.shards)
+
+RELEASE_SHARDS = os.environ.get("RELEASE_SHARDS", default=False) == 'True'
+RELEASE_SHARD_DIR = BASE_DIR / 'db' / 'shards'
+
+DATABASE_ROUTERS = ['data_api.shards.ReleaseShardRouter']
 
 
 # Password validation
@@ -133,8 +191,6 @@ TIME_ZONE = 'UTC'
 
 USE_I18N = True
 
-USE_L10N = True
-
 USE_TZ = True
 
 
@@ -151,7 +207,15 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = 'es_outfitter/static'
 
-STATICFILE_STORAGE = [ 'django.contrib.staticfiles.storage.ManifestStaticFileStorage']
+# Collected under content-hashed names, only new and changed files are processed
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'es_outfitter.storage.IncrementalManifestStaticFilesStorage',
+    },
+}
 
 
 # Name of the tailwind app
@@ -198,6 +262,11 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django Restframework Settings
 
-# REST_FRAMEWORK = {
-#     'COERCE_DECIMAL_TO_STRING': False,
-# }
+REST_FRAMEWORK = {
+    # orjson based renderer, decimals can be requested as numbers with '?numbers=native'
+    'DEFAULT_RENDERER_CLASSES': [
+        'data_api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # 'COERCE_DECIMAL_TO_STRING': False,
+}
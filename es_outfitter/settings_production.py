@@ -0,0 +1,49 @@
+"""
+Django settings for es_outfitter in production (see docker/.env.prod).
+
+The settings of es_outfitter.settings, with only the apps and middleware
+that the API and the frontend (SPA) use. The development tools (tailwind's
+browser reload) and the admin are not loaded, and neither are sessions
+and messages, which only the admin used. The API is read-only and does not
+authenticate requests, so requests go without session, authentication,
+message and CSRF middleware.
+"""
+from .settings import *
+
+# Development and admin apps, not used by the API or the frontend
+DEVELOPMENT_APPS = [
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django_browser_reload',
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEVELOPMENT_APPS]
+
+MIDDLEWARE = [
+    'data_api.middleware.HealthCheckMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'data_api.middleware.LoadSheddingMiddleware',
+    'data_api.middleware.CoalescingMiddleware',
+    'data_api.shards.ReleaseShardMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'OPTIONS': {
+        'context_processors': [
+            'django.template.context_processors.debug',
+            'django.template.context_processors.request',
+        ],
+    },
+}]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    # Requests are anonymous, without looking up a user per request
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
@@ -0,0 +1,95 @@
+"""
+Storage of the collected static files (see STORAGES in settings.py).
+
+Static files are collected under content-hashed names (e.g.
+'main.3f2a9c1b4e7d.js') next to the original names, so that nginx can
+serve them as immutable (see docker/nginx/default.conf.template), and
+templates refer to them by the hashed name ({% static %}).
+
+Django's manifest storage reads and hashes every collected file on every
+collectstatic, which grows with each release's image tree. This storage
+also records the size and modification time of the source of every file
+in the manifest, and reuses the hashed name of files whose source did not
+change since, so that only new and changed files are read, hashed and
+copied.
+"""
+import json
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.contrib.staticfiles.utils import matches_patterns
+from django.core.files.base import ContentFile
+
+
+class IncrementalManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # Files that were not collected (e.g. in development or tests) are
+    # served under their original name
+    manifest_strict = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sources = self.load_sources()
+        self.reused_files = {}
+
+    def load_sources(self):
+        """
+        Returns the fingerprints of the sources of the files collected
+        before: {name: [size, modification time in ns]}
+        """
+        content = self.read_manifest()
+        if content is None:
+            return {}
+        return json.loads(content).get("sources", {})
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Neither in the manifest nor in STATIC_ROOT
+            return name
+
+    @staticmethod
+    def fingerprint(storage, path):
+        """
+        Returns the size and modification time of a source file
+        """
+        stat = os.stat(storage.path(path))
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def post_process(self, paths, dry_run=False, **options):
+        """
+        Hashes the files whose source changed since the last collectstatic,
+        and reuses the hashed names of the others
+        """
+        if dry_run:
+            return
+        previous = dict(self.hashed_files)
+        sources = {name: self.fingerprint(storage, path) for name, (storage, path) in paths.items()}
+        unchanged = {
+            name for name in paths
+            if name in previous and self.sources.get(name) == sources[name] and self.exists(previous[name])
+        }
+        # Files referring to other files are hashed again if any file changed,
+        # as the hashed names they refer to may have
+        adjustable = {name for name in paths if matches_patterns(name, self._patterns)}
+        if unchanged != set(paths):
+            unchanged -= adjustable
+        self.reused_files = {name: previous[name] for name in unchanged}
+        self.sources = sources
+        changed = {name: source for name, source in paths.items() if name not in self.reused_files}
+        yield from super().post_process(changed, dry_run, **options)
+
+    def save_manifest(self):
+        self.hashed_files.update(self.reused_files)
+        self.manifest_hash = self.file_hash(
+            None, ContentFile(json.dumps(sorted(self.hashed_files.items())).encode())
+        )
+        payload = {
+            "paths": self.hashed_files,
+            "sources": self.sources,
+            "version": self.manifest_version,
+            "hash": self.manifest_hash,
+        }
+        if self.manifest_storage.exists(self.manifest_name):
+            self.manifest_storage.delete(self.manifest_name)
+        self.manifest_storage._save(self.manifest_name, ContentFile(json.dumps(payload).encode()))
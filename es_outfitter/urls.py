@@ -13,14 +13,18 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
 
-from es_outfitter.settings import STATIC_URL
-
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include('data_api.urls')),
     path('', include('frontend.urls'),),
-    path('__reload__/', include('django_browser_reload.urls')),
 ]
+
+# Not installed in production (see es_outfitter/settings_production.py)
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
+if apps.is_installed('django_browser_reload'):
+    urlpatterns.append(path('__reload__/', include('django_browser_reload.urls')))
@@ -2,7 +2,7 @@ import React, { useEffect, useReducer } from 'react';
 import ReactDOM from 'react-dom';
 
 import ReactTooltip from 'react-tooltip';
-import { Toaster } from 'react-hot-toast';
+import toast, { Toaster } from 'react-hot-toast';
 
 import reducer from './Reducers';
 import initialState from './Store';
@@ -17,57 +17,35 @@ export const DispatchContext = React.createContext()
 const App = () => {
   const [state, dispatch] = useReducer(reducer, initialState)
 
-  // Load all hulls for default release on page load
+  // Load releases, hulls, outfits and builds for the selected release
+  // in a single request
   useEffect(() => {
-    const getHulls = async () => {
-      const hullsFromServer = await fetchHulls()
-      dispatch({ type: 'getHulls', payload: hullsFromServer })
-    }
-
-    getHulls()
-  }, [state.release])
-
-  // Fetch hulls
-  const fetchHulls = async () => {
-
-    const params = {
-      "release": state.release.value,
-    };
-    const url = new URL(`${window.location.origin}/api/hulls`)
-    for (let k in params) { 
-      if (params[k]) {
-        url.searchParams.append(k, params[k])
+    const getBootstrap = async () => {
+      const bundle = await fetchBootstrap()
+      dispatch({ type: 'getReleases', payload: bundle.Releases })
+      // Switch to the newest release if the selected one is not available
+      if (bundle.Releases.length && !bundle.Releases.some(release => release.value === state.release.value)) {
+        dispatch({ type: 'filterRelease', payload: bundle.Releases[0] })
+        return
       }
-    }
-    let res
-    try {
-      res = await fetch(url)
-    } catch (e) {
-      console.log("Could not fetch hulls for release '" + state.release.value + "':", e)
-    }
-    const data = await res.json()
-
-    return data
-  }
-
-  // Load all outfits for default release on page load
-  useEffect(() => {
-    const getOutfits = async () => {
-      const outfitsFromServer = await fetchOutfits()
-      dispatch({ type: 'getOutfits', payload: outfitsFromServer })
+      if (bundle.unavailable) {
+        toast.error(<p>Release <span className="font-bold">{state.release.label}</span> is not available yet, please try again later.</p>)
+      }
+      dispatch({ type: 'getHulls', payload: bundle.hulls })
+      dispatch({ type: 'getOutfits', payload: bundle.outfits })
+      dispatch({ type: 'getBuilds', payload: bundle.builds })
     }
 
-    getOutfits()
+    getBootstrap()
   }, [state.release])
 
-
-  // Fetch outifts
-  const fetchOutfits = async () => {
+  // Fetch bootstrap bundle
+  const fetchBootstrap = async () => {
 
     const params = {
       "release": state.release.value,
     };
-    const url = new URL(`${window.location.origin}/api/outfits`)
+    const url = new URL(`${window.location.origin}/api/bootstrap`)
     for (let k in params) { 
       if (params[k]) {
         url.searchParams.append(k, params[k])
@@ -77,45 +55,30 @@ const App = () => {
     try {
       res = await fetch(url)
     } catch (e) {
-      console.log("Could not fetch outfits for release '" + state.release.value + "':", e)
+      console.error("Could not fetch data for release '" + state.release.value + "':", e)
+    }
+    // The release is not available (yet), e.g. while the server ingests
+    // the releases after its first start
+    if (!res || !res.ok) {
+      return { Releases: await fetchReleases(), hulls: [], outfits: [], builds: [], unavailable: true }
     }
     const data = await res.json()
 
     return data
   }
 
-  // Load all builds for default release on page load
-  useEffect(() => {
-    const getBuilds = async () => {
-      const buildsFromServer = await fetchBuilds()
-      dispatch({ type: 'getBuilds', payload: buildsFromServer })
-    }
-
-    getBuilds()
-  }, [state.release])
-
-
-  // Fetch builds
-  const fetchBuilds = async () => {
-
-    const params = {
-      "release": state.release.value,
-    };
-    const url = new URL(`${window.location.origin}/api/builds`)
-    for (let k in params) { 
-      if (params[k]) {
-        url.searchParams.append(k, params[k])
-      }
-    }
-    let res
+  // Fetch release options (if the bootstrap bundle is not available)
+  const fetchReleases = async () => {
     try {
-      res = await fetch(url)
+      const res = await fetch(`${window.location.origin}/api/releases`)
+      if (res.ok) {
+        const data = await res.json()
+        return data.Releases
+      }
     } catch (e) {
-      console.error("Could not fetch builds for release '" + state.release.value + "':", e)
+      console.error("Could not fetch releases:", e)
     }
-    const data = await res.json()
-
-    return data
+    return []
   }
 
 
@@ -1,5 +1,4 @@
 import React, { useContext } from 'react'
-import AsyncSelect from 'react-select/async'
 import Select from 'react-select'
 
 import { DispatchContext, StateContext } from '../App'
@@ -8,13 +7,7 @@ const SelectMenu = () => {
   const state = useContext(StateContext)
   const dispatch = useContext(DispatchContext)
 
-  // Handles release select
-  const getReleases = async () => {
-    const res = await fetch(`${window.location.origin}/api/releases`)
-    const data = await res.json()
-    return(data.Releases)
-  }
-  
+  // Handles release select (options are loaded with the release data)
   const defaultRelease = { value: '0.9.14', label: '0.9.14' }
 
   const changeRelease = e => {
@@ -100,12 +93,10 @@ const SelectMenu = () => {
     >
       <div>
         <label htmlFor="releaseSelect" className="text-gray-300 pl-1 hidden sm:block">Select release</label>
-        <AsyncSelect
+        <Select
           id="releaseSelect"
-          cacheOptions
-          loadOptions={getReleases}
+          options={state.releases}
           value={state.release}
-          defaultOptions
           onChange={changeRelease}
         />
       </div>
@@ -41,6 +41,8 @@ const reducer = (state, action) => {
         currentBuild: {},
         hullSearchQuery: '',
       }
+    case 'getReleases':
+      return { ...state, releases: action.payload }
     case 'getHulls': 
       return { ...state, allHulls: action.payload }
     case 'filterHulls':
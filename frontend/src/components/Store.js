@@ -11,6 +11,8 @@ const initialState = {
   // Subset of currentHulls/hullSearchResults containing the first page
   // (12 results). Next 12 are added when you scroll to bottom.
   displayedHulls: [],
+  // All available releases (options for the release select)
+  releases: [],
   // Currently selected release (shared with outfits)
   release: { value: '0.9.14', label: '0.9.14' },
   // Currently selected spoiler level (shared with outfits)